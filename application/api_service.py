@@ -4,9 +4,8 @@ from application.crawler_service import CrawlerService
 from ports.chatbot_port import ChatbotPort
 from ports.knowledge_base_port import KnowledgeBasePort
 from ports.crawler_port import CrawlerPort
-from domain.models import SearchQuery, SearchResult
+from domain.models import ChatResult
 from infrastructure.config import config
-import asyncio
 
 
 class SignaChatbotService:
@@ -22,8 +21,9 @@ class SignaChatbotService:
             return
             
         data = await self.knowledge_base.get_all_data()
-        if data['total_products'] == 0:
-            config.log_debug("Base de conhecimento vazia. Iniciando crawling...")
+        if data['total_products'] == 0 or self.crawler_service.has_unfinished_crawl():
+            # A crawl interrupted last time resumes from its checkpoint
+            config.log_debug("Base de conhecimento vazia ou crawling interrompido. Iniciando crawling...")
             try:
                 await self.crawler_service.crawl_and_index()
             except Exception as e:
@@ -31,47 +31,11 @@ class SignaChatbotService:
         
         self._initialized = True
     
-    async def process_query_text(self, query_text: str):
+    async def process_query_text(self, query_text: str) -> ChatResult:
         await self.initialize()
         
-        response_text = await self.chatbot_service.chat(query_text)
-        
-        # Try to extract products and links from the response  
-        products = []
-        search_link = None
-        
-        if hasattr(self.chatbot, 'search_products'):
-            try:
-                # Use the chatbot's own analysis method
-                if hasattr(self.chatbot, '_analyze_and_correct_query'):
-                    query_info = await self.chatbot._analyze_and_correct_query(query_text)
-                    
-                    if query_info.get('type') == 'product_search':
-                        search_query = SearchQuery(
-                            text=query_info.get('product'),
-                            category=query_info.get('category'),
-                            color=query_info.get('color'),
-                            price_min=query_info.get('price_min'),
-                            price_max=query_info.get('price_max')
-                        )
-                        
-                        search_result = await self.chatbot.search_products(search_query)
-                        products = search_result.products or []
-                        search_link = search_result.filter_url
-                        
-            except Exception as e:
-                config.log_debug(f"Erro na pesquisa de produtos: {e}")
-        
-        # Create a simple response object that works with both API formats
-        class SimpleResponse:
-            def __init__(self, text, products=None, metadata=None):
-                self.text = text
-                self.products = products or []
-                self.metadata = metadata or {}
-                if search_link:
-                    self.metadata['search_link'] = search_link
-        
-        return SimpleResponse(response_text, products, {'search_link': search_link} if search_link else {})
+        # The chatbot's result already carries the products and link it found
+        return await self.chatbot_service.chat(query_text)
     
     async def get_stats(self) -> Dict[str, Any]:
         return await self.chatbot_service.get_stats()
@@ -79,5 +43,8 @@ class SignaChatbotService:
     def clear_history(self):
         self.chatbot_service.clear_history()
     
-    async def crawl_site(self):
-        return await self.crawler_service.crawl_and_index()
\ No newline at end of file
+    async def crawl_site(self, incremental: bool = False):
+        return await self.crawler_service.crawl_and_index(incremental=incremental)
+    
+    async def enrich_products(self, limit: Optional[int] = None):
+        return await self.crawler_service.enrich_products(limit)
\ No newline at end of file
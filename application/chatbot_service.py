@@ -1,7 +1,7 @@
 from typing import List, Optional
 from ports.chatbot_port import ChatbotPort
 from ports.knowledge_base_port import KnowledgeBasePort
-from domain.models import ChatMessage
+from domain.models import ChatMessage, ChatResult
 from infrastructure.config import config
 
 class ChatbotService:
@@ -10,27 +10,30 @@ class ChatbotService:
         self.knowledge_base = knowledge_base
         self.conversation_history: List[ChatMessage] = []
         
-    async def chat(self, user_message: str) -> str:
+    async def chat(self, user_message: str) -> ChatResult:
         config.log_debug(f"User message: {user_message}")
         
         self.conversation_history.append(ChatMessage(role="user", content=user_message))
         
-        response = await self.chatbot.process_message(
+        result = await self.chatbot.process_message(
             user_message, 
             context=self.conversation_history[-10:]
         )
         
-        self.conversation_history.append(ChatMessage(role="assistant", content=response))
+        self.conversation_history.append(ChatMessage(role="assistant", content=result.text))
         
-        config.log_debug(f"Assistant response: {response}")
-        return response
+        config.log_debug(f"Assistant response: {result.text}")
+        return result
     
     async def get_stats(self) -> dict:
         data = await self.knowledge_base.get_all_data()
         return {
             'total_products': data['total_products'],
             'total_categories': data['total_categories'],
-            'conversation_length': len(self.conversation_history)
+            'conversation_length': len(self.conversation_history),
+            'search_cache': await self.knowledge_base.get_cache_stats(),
+            'intent_cache': await self.chatbot.get_cache_stats(),
+            'intent_parser': await self.chatbot.get_intent_stats()
         }
     
     def clear_history(self):
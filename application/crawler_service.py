@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ports.crawler_port import CrawlerPort
 from ports.knowledge_base_port import KnowledgeBasePort
 from infrastructure.config import config
@@ -8,42 +8,129 @@ class CrawlerService:
     def __init__(self, crawler: CrawlerPort, knowledge_base: KnowledgeBasePort):
         self.crawler = crawler
         self.knowledge_base = knowledge_base
+        self._enrichment: Optional[asyncio.Task] = None
         
-    async def crawl_and_index(self, base_url: str = "https://www.signa.pt") -> Dict[str, Any]:
+    async def crawl_and_index(self, base_url: str = "https://www.signa.pt", incremental: bool = False) -> Dict[str, Any]:
         config.log_debug("Starting crawl and index process")
         
-        crawl_result = await self.crawler.crawl_site(base_url)
+        # Without a catalog there is nothing to diff against
+        data = await self.knowledge_base.get_all_data()
+        if data['total_products'] == 0:
+            incremental = False
+        
+        # Products are written batch by batch while the crawl is still running,
+        # so an interrupted crawl resumes from its last stored batch
+        totals = {'added': 0, 'updated': 0, 'removed': 0}
+        
+        async def store_batch(products):
+            diff = await self.knowledge_base.apply_product_diff(products, [])
+            for key in totals:
+                totals[key] += diff[key]
+        
+        crawl_result = await self.crawler.crawl_site(base_url, incremental=incremental, on_batch=store_batch)
         
         await self.knowledge_base.store_categories(crawl_result['categories'])
-        await self.knowledge_base.store_products(crawl_result['products'])
+        # Removals are only known once every page has been seen
+        diff = await self.knowledge_base.apply_product_diff(
+            crawl_result['products'], crawl_result.get('removed_ids', [])
+        )
+        for key in totals:
+            totals[key] += diff[key]
+        await self.crawler.commit_crawl(crawl_result)
         
         stats = {
             'categories_crawled': len(crawl_result['categories']),
-            'products_crawled': len(crawl_result['products']),
+            'products_crawled': crawl_result.get('products_crawled', len(crawl_result['products'])),
+            'products_added': totals['added'],
+            'products_updated': totals['updated'],
+            'products_removed': totals['removed'],
+            'pages_unchanged': crawl_result.get('unchanged_pages', 0),
+            'pages_resumed': crawl_result.get('resumed_pages', 0),
+            'incremental': incremental,
             'base_url': base_url
         }
         
         config.log_debug(f"Crawl completed: {stats}")
         return stats
     
-    async def update_category(self, category_name: str) -> Dict[str, Any]:
+    def has_unfinished_crawl(self) -> bool:
+        return self.crawler.has_unfinished_crawl()
+    
+    async def enrich_products(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Add detail-page data to the products that do not have it yet.
+        
+        Products are marked with 'enriched_at' as their batch is stored, so an
+        interrupted run resumes where it stopped.
+        """
+        data = await self.knowledge_base.get_all_data()
+        pending = [product['id'] for product in data['products'] if 'enriched_at' not in product]
+        if limit is not None:
+            pending = pending[:limit]
+        config.log_debug(f"Enriching {len(pending)} products")
+        
+        totals = {'updated': 0}
+        
+        async def store_batch(records):
+            diff = await self.knowledge_base.apply_product_diff(records, [])
+            totals['updated'] += diff['updated']
+        
+        result = await self.crawler.enrich_products(pending, store_batch)
+        return {
+            'products_pending': len(pending),
+            'products_enriched': result['enriched'],
+            'products_failed': result['failed'],
+            'products_updated': totals['updated']
+        }
+    
+    def start_enrichment(self) -> asyncio.Task:
+        """Run `enrich_products` in the background; at most one run at a time"""
+        if self._enrichment is None or self._enrichment.done():
+            self._enrichment = asyncio.create_task(self._run_enrichment())
+        return self._enrichment
+    
+    async def _run_enrichment(self) -> None:
+        try:
+            stats = await self.enrich_products()
+            config.log_debug(f"Enrichment completed: {stats}")
+        except Exception as e:
+            config.log_debug(f"Error during enrichment: {e}")
+    
+    async def stop_enrichment(self) -> None:
+        if self._enrichment is not None and not self._enrichment.done():
+            self._enrichment.cancel()
+            try:
+                await self._enrichment
+            except asyncio.CancelledError:
+                pass
+        self._enrichment = None
+    
+    async def update_category(self, category_name: str, base_url: str = "https://www.signa.pt") -> Dict[str, Any]:
+        """Recrawl every page of one (sub)category and apply what changed.
+        
+        Pages whose content is unchanged since the last crawl are skipped, so
+        a quiet listing costs one request per page and leaves the catalog,
+        and its version, as they were.
+        """
         config.log_debug(f"Updating category: {category_name}")
         
         category_info = await self.knowledge_base.get_category_info(category_name)
-        if not category_info:
+        if not category_info or 'id' not in category_info:
             return {'error': f'Category {category_name} not found'}
-            
-        category_url = f"https://www.signa.pt{category_info['url']}"
-        html = await self.crawler.crawl_page(category_url)
-        products = await self.crawler.extract_products(html)
         
-        for product in products:
-            product['category'] = category_info['name']
-            product['category_id'] = category_info.get('id')
-            
-        await self.knowledge_base.store_products(products)
+        subcategory = category_info.get('subcategory')
+        listing = (category_info['id'], subcategory.get('id') if subcategory else None)
+        crawl_result = await self.crawler.crawl_site(base_url, incremental=True, listings=[listing])
+        
+        diff = await self.knowledge_base.apply_product_diff(
+            crawl_result['products'], crawl_result.get('removed_ids', [])
+        )
+        await self.crawler.commit_crawl(crawl_result)
         
         return {
             'category': category_name,
-            'products_updated': len(products)
+            'products_crawled': crawl_result.get('products_crawled', len(crawl_result['products'])),
+            'products_added': diff['added'],
+            'products_updated': diff['updated'],
+            'products_removed': diff['removed'],
+            'pages_unchanged': crawl_result.get('unchanged_pages', 0)
         }
\ No newline at end of file
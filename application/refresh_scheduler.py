@@ -0,0 +1,129 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from application.crawler_service import CrawlerService
+from ports.knowledge_base_port import KnowledgeBasePort
+from infrastructure.config import config
+
+
+class RefreshScheduler:
+    """Refreshes catalog categories in the background of the API process.
+    
+    Each listing (a subcategory, or a category without any) is due again
+    somewhere between REFRESH_MIN_INTERVAL and REFRESH_MAX_INTERVAL after its
+    last refresh: the more it is searched for, relative to the most searched
+    one, the sooner. Due times carry +/- REFRESH_JITTER so listings drift apart
+    instead of refreshing in lockstep, and at most REFRESH_CONCURRENCY run at
+    once. Refreshes only await I/O and the knowledge base's own writes, so
+    /chat is never kept waiting on them.
+    """
+    
+    def __init__(self, crawler_service: CrawlerService, knowledge_base: KnowledgeBasePort):
+        self.crawler_service = crawler_service
+        self.knowledge_base = knowledge_base
+        self.min_interval = config.refresh_min_interval
+        self.max_interval = max(config.refresh_max_interval, self.min_interval)
+        self.jitter = config.refresh_jitter
+        self.tick = config.refresh_tick
+        self._slots = asyncio.Semaphore(max(1, config.refresh_concurrency))
+        self._due: Dict[str, float] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.failed = 0
+    
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        tasks = list(self._running.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'listings': len(self._due),
+            'running': len(self._running),
+            'refreshed': self.refreshed,
+            'failed': self.failed,
+            'next_refresh_in': round(min(self._due.values()) - now, 1) if self._due else None
+        }
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._schedule_due()
+            except Exception as e:
+                config.log_debug(f"Refresh scheduler error: {e}")
+            await asyncio.sleep(self.tick)
+    
+    async def _schedule_due(self) -> None:
+        listings = await self._listings()
+        popularity = await self.knowledge_base.get_category_popularity()
+        now = time.time()
+        
+        weights = {}
+        for name, parent in listings:
+            weights[name] = popularity.get(name.lower(), 0)
+            if parent != name:
+                weights[name] += popularity.get(parent.lower(), 0)
+        top = max(weights.values(), default=0)
+        for name, weight in weights.items():
+            interval = self._interval(weight, top)
+            due = self._due.get(name)
+            if due is None:
+                # Spread the first round over a whole interval rather than all at startup
+                self._due[name] = now + random.uniform(0, interval)
+            elif due - now > interval * (1 + self.jitter):
+                # Became popular: do not wait out the longer interval it was given
+                self._due[name] = now + self._jittered(interval)
+            elif due <= now and name not in self._running:
+                self._due[name] = now + self._jittered(interval)
+                self._running[name] = asyncio.create_task(self._refresh(name))
+        
+        for name in set(self._due) - set(weights):
+            del self._due[name]
+    
+    async def _refresh(self, name: str) -> None:
+        try:
+            async with self._slots:
+                result = await self.crawler_service.update_category(name)
+            if 'error' in result:
+                self.failed += 1
+                config.log_debug(f"Refresh of {name} failed: {result['error']}")
+            else:
+                self.refreshed += 1
+                config.log_debug(f"Refreshed {name}: {result['products_added']} added, "
+                                 f"{result['products_updated']} updated, {result['products_removed']} removed")
+        except Exception as e:
+            self.failed += 1
+            config.log_debug(f"Refresh of {name} failed: {e}")
+        finally:
+            self._running.pop(name, None)
+    
+    async def _listings(self) -> List[Tuple[str, str]]:
+        """(listing name, category name) for every listing page the crawl walks"""
+        data = await self.knowledge_base.get_all_data()
+        listings = []
+        for category in data['categories']:
+            subcategories = category.get('subcategories') or []
+            for subcategory in subcategories:
+                listings.append((subcategory['name'], category['name']))
+            if not subcategories:
+                listings.append((category['name'], category['name']))
+        return listings
+    
+    def _interval(self, weight: int, top: int) -> float:
+        share = weight / top if top else 0.0
+        return self.max_interval - (self.max_interval - self.min_interval) * share
+    
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
@@ -0,0 +1,88 @@
+"""Cold-start time and RSS: legacy pickle vs SQLite store vs mmap snapshot.
+
+Usage: python -m benchmarks.catalog_snapshot [count ...]
+"""
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_catalog import make_products
+
+
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode: str, directory: str) -> None:
+    """Runs in a fresh interpreter so RSS only reflects the load being measured"""
+    from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+    from infrastructure.utils.catalog_snapshot import CatalogSnapshot
+    os.chdir(directory)
+    before = rss_mb()
+    start = time.perf_counter()
+
+    if mode == 'pickle':
+        with open('knowledge_base.pkl', 'rb') as f:
+            products = pickle.load(f)['products']
+        product_map = {p['id']: p for p in products}
+    elif mode == 'snapshot':
+        products = list(CatalogSnapshot('knowledge_base.snapshot'))
+        product_map = {p['id']: p for p in products}
+    else:
+        if mode == 'kb-sqlite' and os.path.exists('knowledge_base.snapshot'):
+            os.rename('knowledge_base.snapshot', 'knowledge_base.snapshot.off')
+        if mode == 'kb-snapshot' and os.path.exists('knowledge_base.snapshot.off'):
+            os.rename('knowledge_base.snapshot.off', 'knowledge_base.snapshot')
+        kb = InMemoryKnowledgeBase()
+        products = kb.products
+
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.3f} {rss_mb() - before:.1f} {len(products)}")
+
+
+def run(count: int) -> None:
+    from infrastructure.utils.catalog_snapshot import convert
+    from infrastructure.utils.catalog_store import CatalogStore
+
+    with tempfile.TemporaryDirectory() as directory:
+        products = make_products(count)
+        pkl = os.path.join(directory, 'knowledge_base.pkl')
+        with open(pkl, 'wb') as f:
+            pickle.dump({'products': products, 'categories': [], 'category_map': {},
+                         'product_map': {p['id']: p for p in products}}, f)
+        store = CatalogStore(os.path.join(directory, 'knowledge_base.db'))
+        store.upsert_products(products)
+        store.close()
+        convert(os.path.join(directory, 'knowledge_base.db'), os.path.join(directory, 'knowledge_base.snapshot'))
+
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) / 2 ** 20
+                 for name in ('knowledge_base.pkl', 'knowledge_base.snapshot')}
+        print(f"\n{count} products (pickle {sizes['knowledge_base.pkl']:.1f} MB, "
+              f"snapshot {sizes['knowledge_base.snapshot']:.1f} MB)")
+        print(f"{'load path':<28}{'seconds':>10}{'RSS MB':>10}")
+        for mode, label in (('pickle', 'pickle.load + product_map'), ('snapshot', 'snapshot open + product_map'),
+                            ('kb-sqlite', 'InMemoryKnowledgeBase (db)'), ('kb-snapshot', 'InMemoryKnowledgeBase (snap)')):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.catalog_snapshot', '--measure', mode, directory],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            print(f"{label:<28}{float(output[0]):>10.3f}{float(output[1]):>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        for count in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+            run(count)
@@ -0,0 +1,157 @@
+"""Crawl throughput of ComprehensiveCrawlerAdapter against the local stand-in catalog.
+
+Starts benchmarks.standin_server in a child process (or uses --url), runs
+crawl_site against it with a throwaway HTTP cache and crawl state, and
+reports pages/s, products/s, p50/p99 fetch latency and the crawler
+process's peak RSS. Fetch latency is measured around the crawler's fetch,
+so it includes waiting on the rate limiter. With --recrawl an incremental
+crawl follows on the warm HTTP cache and crawl state.
+
+Usage: python -m benchmarks.crawl_benchmark [--products 5000] [--per-page 24]
+           [--latency 0.05] [--error-rate 0.0] [--fixtures DIR] [--concurrency 8]
+           [--parse-workers N] [--rate 5] [--max-rate 50] [--recrawl] [--url URL]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crawl benchmark against the stand-in catalog")
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=24)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures')
+    parser.add_argument('--concurrency', type=int, help="CRAWL_CONCURRENCY")
+    parser.add_argument('--parse-workers', type=int, help="PARSE_WORKERS")
+    parser.add_argument('--rate', type=float, help="CRAWL_RATE_LIMIT")
+    parser.add_argument('--max-rate', type=float, help="CRAWL_MAX_RATE")
+    parser.add_argument('--recrawl', action='store_true', help="follow with an incremental crawl")
+    parser.add_argument('--url', help="benchmark an already running stand-in server instead")
+    return parser.parse_args(argv)
+
+
+def configure(args: argparse.Namespace, directory: str) -> None:
+    """Settings are read when infrastructure.config is imported, so this runs first"""
+    os.environ['CACHE_ENABLED'] = 'True'
+    os.environ['HTTP_CACHE_FILE'] = os.path.join(directory, 'http_cache.db')
+    os.environ['CRAWL_STATE_FILE'] = os.path.join(directory, 'crawl_state.json')
+    for option, name in (('concurrency', 'CRAWL_CONCURRENCY'), ('parse_workers', 'PARSE_WORKERS'),
+                         ('rate', 'CRAWL_RATE_LIMIT'), ('max_rate', 'CRAWL_MAX_RATE')):
+        if getattr(args, option) is not None:
+            os.environ[name] = str(getattr(args, option))
+
+
+def start_standin(args: argparse.Namespace) -> tuple:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    command = [sys.executable, '-m', 'benchmarks.standin_server', '--port', str(port),
+               '--products', str(args.products), '--per-page', str(args.per_page),
+               '--latency', str(args.latency), '--error-rate', str(args.error_rate)]
+    if args.fixtures:
+        command += ['--fixtures', args.fixtures]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    # The server prints one line once it is listening
+    print(server.stdout.readline().strip())
+    return server, f"http://127.0.0.1:{port}"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_mb() -> str:
+    if resource is None:
+        return "n/a"
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale:.0f} MB"
+
+
+async def run_crawl(crawler, base_url: str, incremental: bool) -> Dict[str, Any]:
+    crawler.latencies = []
+    counted = {'products': 0}
+
+    async def on_batch(products):
+        counted['products'] += len(products)
+
+    started = time.perf_counter()
+    result = await crawler.crawl_site(base_url, incremental=incremental, on_batch=on_batch)
+    elapsed = time.perf_counter() - started
+    await crawler.commit_crawl(result)
+    return {
+        'elapsed': elapsed,
+        'pages': len(crawler.latencies),
+        'products': counted['products'],
+        'unchanged': result.get('unchanged_pages', 0),
+        'p50': percentile(crawler.latencies, 0.50),
+        'p99': percentile(crawler.latencies, 0.99),
+    }
+
+
+async def benchmark(args: argparse.Namespace, base_url: str) -> None:
+    from infrastructure.adapters.comprehensive_crawler import ComprehensiveCrawlerAdapter
+    from infrastructure.config import config
+
+    class TimedCrawler(ComprehensiveCrawlerAdapter):
+        async def _fetch(self, url):
+            started = time.perf_counter()
+            try:
+                return await super()._fetch(url)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+
+    print(f"concurrency={config.crawl_concurrency} parse_workers={config.parse_workers} "
+          f"rate={config.crawl_rate_limit}->{config.crawl_max_rate}/s batch={config.crawl_batch_size}")
+    crawler = TimedCrawler()
+    try:
+        runs = [('full crawl', await run_crawl(crawler, base_url, incremental=False))]
+        if args.recrawl:
+            runs.append(('incremental recrawl', await run_crawl(crawler, base_url, incremental=True)))
+        limiter = crawler.rate_limiter.stats()
+    finally:
+        await crawler.close()
+
+    print(f"{'run':<22}{'pages':>7}{'products':>10}{'pages/s':>10}{'products/s':>12}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, run in runs:
+        print(f"{name:<22}{run['pages']:>7}{run['products']:>10}{run['pages'] / run['elapsed']:>10.1f}"
+              f"{run['products'] / run['elapsed']:>12.1f}{run['p50'] * 1000:>9.1f}{run['p99'] * 1000:>9.1f}"
+              + (f"  ({run['unchanged']} unchanged)" if run['unchanged'] else ""))
+    print(f"peak RSS (crawler process, parse workers excluded): {peak_rss_mb()}")
+    print(f"rate limiter: {limiter}")
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        configure(args, directory)
+        server = None
+        base_url = args.url
+        if base_url is None:
+            server, base_url = start_standin(args)
+        try:
+            asyncio.run(benchmark(args, base_url.rstrip('/')))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Listing-page extraction speed: BeautifulSoup scan vs the lxml/XPath fast path.
+
+Runs both extractors over the same pages, checks they agree, and reports
+pages/second. Pass a directory of saved category pages (*.html) to measure
+real markup; otherwise synthetic signa.pt-like pages are generated.
+
+Usage: python -m benchmarks.extract_products [pages_dir]
+"""
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic_catalog import make_listing_page, make_products
+from infrastructure.utils import listing_parser
+
+BASE_URL = "https://www.signa.pt"
+PAGE_URL = f"{BASE_URL}/brindes/categoria.asp?idCategoria=30&idSubCategoria=164"
+
+
+def soup_extractor(html: str):
+    soup = BeautifulSoup(html, 'lxml')
+    return listing_parser.products_from_soup(soup, BASE_URL), listing_parser.next_page_url(soup, PAGE_URL)
+
+
+def fast_extractor(html: str):
+    return listing_parser.parse_listing(html, PAGE_URL, BASE_URL)
+
+
+def load_pages(directory: str = None):
+    if directory:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+            with open(path, 'rb') as f:
+                content = f.read()
+            try:
+                pages.append(content.decode('utf-8'))
+            except UnicodeDecodeError:
+                pages.append(content.decode('iso-8859-1'))
+        return pages
+    products = make_products(40 * 60)
+    return [make_listing_page(products[i:i + 60], f"{PAGE_URL}&pagina={i // 60 + 2}")
+            for i in range(0, len(products), 60)]
+
+
+def pages_per_second(extract, pages, rounds: int = 3) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for html in pages:
+            extract(html)
+        best = min(best, time.perf_counter() - started)
+    return len(pages) / best
+
+
+def main(directory: str = None) -> None:
+    pages = load_pages(directory)
+    if not pages:
+        sys.exit(f"No *.html pages found in {directory}")
+
+    mismatches = sum(soup_extractor(html) != fast_extractor(html) for html in pages)
+    products = sum(len(fast_extractor(html)[0]) for html in pages)
+
+    soup_rate = pages_per_second(soup_extractor, pages)
+    fast_rate = pages_per_second(fast_extractor, pages)
+    print(f"{len(pages)} pages, {products} products, {mismatches} pages where the extractors disagree")
+    print(f"{'extractor':<24}{'pages/s':>10}")
+    print(f"{'BeautifulSoup find_all':<24}{soup_rate:>10.1f}")
+    print(f"{'lxml XPath fast path':<24}{fast_rate:>10.1f}  ({fast_rate / soup_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
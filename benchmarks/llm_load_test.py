@@ -0,0 +1,145 @@
+"""Chat throughput of IntelligentChatbotAdapter against a local stand-in LLM server.
+
+Serves POST /v1/chat/completions in-process with a fixed mean latency and
+points the adapter's OpenAI client at it, then sends the same number of
+messages at increasing concurrency. While the LLM calls are awaited rather
+than blocking the event loop, messages/s grows with concurrency up to
+OPENAI_MAX_CONCURRENCY; a blocking client stays at 1 / (round-trip time).
+
+Usage: python -m benchmarks.llm_load_test [--messages 64] [--latency 0.2]
+           [--concurrency 1 4 16 64] [--max-concurrency 16]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+STATS = web.AppKey('stats', dict)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chat load test against a stand-in LLM server")
+    parser.add_argument('--messages', type=int, default=64, help="messages sent per concurrency level")
+    parser.add_argument('--latency', type=float, default=0.2, help="mean completion delay in seconds")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--max-concurrency', type=int, help="OPENAI_MAX_CONCURRENCY")
+    return parser.parse_args(argv)
+
+
+def make_llm_app(latency: float) -> web.Application:
+    """Answers every completion after `latency` seconds; JSON-mode requests get a 'general' intent"""
+    stats = {'requests': 0, 'in_flight': 0, 'peak_in_flight': 0}
+
+    async def completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        stats['requests'] += 1
+        stats['in_flight'] += 1
+        stats['peak_in_flight'] = max(stats['peak_in_flight'], stats['in_flight'])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats['in_flight'] -= 1
+        if (body.get('response_format') or {}).get('type') == 'json_object':
+            content = json.dumps({'type': 'general', 'corrected_message': body['messages'][-1]['content'][:40]})
+        else:
+            content = "Olá! Em que posso ajudar com os brindes da Signa?"
+        return web.json_response({
+            'id': f"chatcmpl-{stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stand-in'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        })
+
+    app = web.Application()
+    app[STATS] = stats
+    app.router.add_post('/v1/chat/completions', completions)
+    return app
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_level(adapter, messages: int, concurrency: int) -> Dict[str, Any]:
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send(i: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            await adapter.process_message(f"olá, pergunta número {i}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(messages)))
+    elapsed = time.perf_counter() - started
+    return {
+        'elapsed': elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99)
+    }
+
+
+async def benchmark(args: argparse.Namespace, port: int) -> None:
+    app = make_llm_app(args.latency)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+
+    from infrastructure.adapters.intelligent_chatbot_adapter import IntelligentChatbotAdapter
+    from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+    from infrastructure.config import config
+
+    adapter = IntelligentChatbotAdapter(InMemoryKnowledgeBase())
+    print(f"stand-in LLM latency={args.latency * 1000:.0f} ms, "
+          f"OPENAI_MAX_CONCURRENCY={config.openai_max_concurrency}, {args.messages} messages per level "
+          f"(2 completions each)")
+    try:
+        print(f"{'concurrency':>12}{'msgs/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak in flight':>16}")
+        for concurrency in args.concurrency:
+            app[STATS]['peak_in_flight'] = 0
+            run = await run_level(adapter, args.messages, concurrency)
+            print(f"{concurrency:>12}{args.messages / run['elapsed']:>10.1f}{run['p50'] * 1000:>10.1f}"
+                  f"{run['p99'] * 1000:>10.1f}{app[STATS]['peak_in_flight']:>16}")
+        print(f"llm client: {adapter.llm.stats()}")
+    finally:
+        await adapter.close()
+        await runner.cleanup()
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    # Settings are read when infrastructure.config is imported, so this runs first
+    os.environ['OPENAI_API_KEY'] = 'stand-in'
+    os.environ['OPENAI_BASE_URL'] = f"http://127.0.0.1:{port}/v1"
+    os.environ['CACHE_ENABLED'] = 'False'
+    os.environ.setdefault('DEBUG_MODE', 'False')
+    if args.max_concurrency is not None:
+        os.environ['OPENAI_MAX_CONCURRENCY'] = str(args.max_concurrency)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # The knowledge base keeps its files in the working directory
+        os.chdir(directory)
+        try:
+            asyncio.run(benchmark(args, port))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Memory held by the catalog: per-product dicts vs Product records vs snapshot views.
+
+Products go through a JSON round trip first, the way they come out of the
+SQLite store, so the dict baseline does not share strings by accident.
+
+Usage: python -m benchmarks.product_memory [count]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic_catalog import make_products
+from domain.models import Product
+from infrastructure.utils.catalog_snapshot import CatalogSnapshot, write_snapshot
+
+
+def measure(build) -> float:
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current / 2 ** 20
+
+
+def main(count: int) -> None:
+    rows = [json.dumps(product, ensure_ascii=False) for product in make_products(count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'catalog.snapshot')
+        write_snapshot(path, (json.loads(row) for row in rows))
+        snapshot = CatalogSnapshot(path)
+
+        results = [
+            ('dict per product', measure(lambda: [json.loads(row) for row in rows])),
+            ('Product (slots, interned)', measure(lambda: [Product.from_dict(json.loads(row)) for row in rows])),
+            ('SnapshotProduct views', measure(lambda: list(snapshot))),
+        ]
+        del snapshot
+
+    baseline = results[0][1]
+    print(f"{count} products")
+    print(f"{'representation':<28}{'MB':>8}{'vs dict':>10}")
+    for label, megabytes in results:
+        print(f"{label:<28}{megabytes:>8.1f}{megabytes / baseline:>9.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,207 @@
+"""Local stand-in for signa.pt, for crawl benchmarks that must not touch the live site.
+
+Serves category listings (/brindes/categoria.asp, paginated with
+&pagina=N) and product pages (/brindes/brinde.asp?id=) for the categories
+in infrastructure.utils.signa_catalog. Pages come from a directory of
+recorded fixtures when one is given, and are generated from a synthetic
+catalog otherwise. Responses carry an ETag and honour If-None-Match, and can be
+slowed down or failed with 503s to see how the crawler copes.
+
+Fixture names: categoria-<idCategoria>-<idSubCategoria>-<pagina>.html and
+brinde-<id>.html. `--record` saves the first page of each live listing and
+a few of its product pages under those names.
+
+Usage: python -m benchmarks.standin_server [--port 8765] [--products 5000]
+           [--per-page 24] [--latency 0.05] [--error-rate 0.0] [--fixtures DIR]
+       python -m benchmarks.standin_server --record DIR [--record-products 5]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from aiohttp import ClientSession, web
+
+from benchmarks.synthetic_catalog import _price_label, make_listing_page, make_products, subcategories
+from infrastructure.utils import listing_parser
+
+STATS = web.AppKey('stats', dict)
+
+LIVE_URL = "https://www.signa.pt"
+
+
+def fixture_name(query) -> Optional[str]:
+    if 'id' in query:
+        return f"brinde-{query['id']}.html"
+    if 'idCategoria' in query:
+        return (f"categoria-{query['idCategoria']}-{query.get('idSubCategoria') or 0}"
+                f"-{query.get('pagina') or 1}.html")
+    return None
+
+
+def make_detail_page(product: Dict[str, Any]) -> str:
+    """A product page with the blocks detail_parser reads: colors, description, price tiers"""
+    swatches = ''.join(f'<span class="cor" title="{color}"></span>' for color in product['colors'])
+    price = product['price'] or 1.0
+    tiers = ''.join(
+        f'<tr><td>{quantity} un.</td><td>{_price_label(price * factor)} €</td></tr>'
+        for quantity, factor in ((100, 1.0), (250, 0.9), (500, 0.8), (1000, 0.7))
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f'<title>{product["name"]}</title></head><body>'
+        f'<h1>{product["name"]}</h1><div class="cores">{swatches}</div>'
+        f'<div id="descricao"><h2>Descrição</h2><p>{product["name"]}, referência {product["reference"]}, '
+        f'da categoria {product["subcategory"]}. Personalizável com o logótipo da sua empresa.</p></div>'
+        f'<table class="precos">{tiers}</table></body></html>'
+    )
+
+
+class StandinCatalog:
+    """Synthetic catalog laid out as paginated listings per (category, subcategory)"""
+
+    def __init__(self, product_count: int = 5000, per_page: int = 24, seed: int = 42):
+        self.per_page = max(1, per_page)
+        self.products = {product['id']: product for product in make_products(product_count, seed)}
+        self.listings: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for cat_id, _, sub_id, _ in subcategories():
+            self.listings[(cat_id, sub_id)]
+        for product in self.products.values():
+            self.listings[(product['category_id'], product['subcategory_id'])].append(product)
+
+    @property
+    def page_count(self) -> int:
+        return sum(max(1, -(-len(products) // self.per_page)) for products in self.listings.values())
+
+    def listing_page(self, cat_id: int, sub_id: int, page: int) -> Optional[str]:
+        if (cat_id, sub_id) not in self.listings:
+            return None
+        products = self.listings[(cat_id, sub_id)]
+        chunk = products[(page - 1) * self.per_page:page * self.per_page]
+        if page > 1 and not chunk:
+            return None
+        next_href = None
+        if page * self.per_page < len(products):
+            next_href = f"/brindes/categoria.asp?idCategoria={cat_id}&idSubCategoria={sub_id}&pagina={page + 1}"
+        return make_listing_page(chunk, next_href)
+
+    def detail_page(self, product_id: str) -> Optional[str]:
+        product = self.products.get(product_id)
+        return make_detail_page(product) if product else None
+
+
+def make_app(catalog: StandinCatalog, latency: float = 0.0, error_rate: float = 0.0,
+             fixtures: Optional[str] = None, seed: int = 0) -> web.Application:
+    rnd = random.Random(seed)
+    stats = {'requests': 0, 'errors': 0, 'not_modified': 0}
+
+    async def respond(request: web.Request, render) -> web.Response:
+        stats['requests'] += 1
+        if latency:
+            await asyncio.sleep(latency * rnd.uniform(0.5, 1.5))
+        if error_rate and rnd.random() < error_rate:
+            stats['errors'] += 1
+            return web.Response(status=503, headers={'Retry-After': '1'})
+
+        body = None
+        name = fixture_name(request.query) if fixtures else None
+        if name and os.path.exists(os.path.join(fixtures, name)):
+            with open(os.path.join(fixtures, name), 'rb') as f:
+                body = f.read()
+        if body is None:
+            html = render()
+            if html is None:
+                raise web.HTTPNotFound()
+            body = html.encode('utf-8')
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            stats['not_modified'] += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='text/html', charset='utf-8', headers={'ETag': etag})
+
+    async def listing(request: web.Request) -> web.Response:
+        try:
+            cat_id = int(request.query['idCategoria'])
+            sub_id = int(request.query.get('idSubCategoria') or 0)
+            page = int(request.query.get('pagina') or 1)
+        except (KeyError, ValueError):
+            raise web.HTTPBadRequest()
+        return await respond(request, lambda: catalog.listing_page(cat_id, sub_id, page))
+
+    async def detail(request: web.Request) -> web.Response:
+        return await respond(request, lambda: catalog.detail_page(request.query.get('id', '')))
+
+    app = web.Application()
+    app[STATS] = stats
+    app.router.add_get('/brindes/categoria.asp', listing)
+    app.router.add_get('/brindes/brinde.asp', detail)
+    return app
+
+
+async def start_server(app: web.Application, host: str = '127.0.0.1', port: int = 8765) -> web.AppRunner:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def record(directory: str, products_per_listing: int) -> None:
+    """Save the first page of every listing, and some of its products, from the live site"""
+    os.makedirs(directory, exist_ok=True)
+    async with ClientSession(headers={'User-Agent': 'Mozilla/5.0'}) as session:
+        async def save(path: str, query: Dict[str, str]) -> Optional[str]:
+            url = f"{LIVE_URL}{path}?" + '&'.join(f"{key}={value}" for key, value in query.items())
+            async with session.get(url) as response:
+                if response.status != 200:
+                    print(f"{response.status} {url}")
+                    return None
+                body = await response.read()
+            with open(os.path.join(directory, fixture_name(query)), 'wb') as f:
+                f.write(body)
+            return body.decode('utf-8', errors='ignore')
+
+        for cat_id, _, sub_id, sub_name in subcategories():
+            html = await save('/brindes/categoria.asp', {'idCategoria': str(cat_id), 'idSubCategoria': str(sub_id)})
+            if not html:
+                continue
+            for product in listing_parser.extract_products(html, LIVE_URL)[:products_per_listing]:
+                await save('/brindes/brinde.asp', {'id': product['id']})
+            print(f"recorded {sub_name}")
+
+
+async def serve(args) -> None:
+    catalog = StandinCatalog(args.products, args.per_page)
+    app = make_app(catalog, args.latency, args.error_rate, args.fixtures)
+    runner = await start_server(app, args.host, args.port)
+    print(f"Stand-in catalog on http://{args.host}:{args.port}: {len(catalog.products)} products, "
+          f"{catalog.page_count} listing pages", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for signa.pt")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--products', type=int, default=5000, help="synthetic catalog size")
+    parser.add_argument('--per-page', type=int, default=24, help="products per listing page")
+    parser.add_argument('--latency', type=float, default=0.05, help="mean response delay in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--fixtures', help="directory of recorded pages to serve instead of synthetic ones")
+    parser.add_argument('--record', metavar='DIR', help="record live pages into DIR and exit")
+    parser.add_argument('--record-products', type=int, default=5, help="product pages to record per listing")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    try:
+        asyncio.run(record(arguments.record, arguments.record_products) if arguments.record else serve(arguments))
+    except KeyboardInterrupt:
+        pass
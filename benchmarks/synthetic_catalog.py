@@ -0,0 +1,65 @@
+import random
+from typing import Any, Dict, List, Optional
+from infrastructure.utils.signa_catalog import CATEGORIES_STRUCTURE
+
+COLORS = ['Azul', 'Azul Marinho', 'Vermelho', 'Preto', 'Branco', 'Verde', 'Amarelo',
+          'Cinzento', 'Rosa', 'Laranja', 'Roxo', 'Castanho', 'Natural', 'Prateado', 'Dourado']
+ADJECTIVES = ['Personalizada', 'Térmica', 'Cerâmica', 'Eco', 'Premium', 'Reciclado', 'Mini',
+              'Clássico', 'Metálico', 'Desportivo', 'Dobrável', 'Bambu', 'Algodão']
+
+
+def subcategories() -> List[tuple]:
+    return [(cat_id, cat['name'], sub['id'], sub['name'])
+            for cat_id, cat in CATEGORIES_STRUCTURE.items() for sub in cat['subcategories']]
+
+
+def make_products(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Products shaped like ComprehensiveCrawlerAdapter output, plus colors"""
+    rnd = random.Random(seed)
+    subcats = subcategories()
+    products = []
+    for i in range(count):
+        cat_id, cat_name, sub_id, sub_name = rnd.choice(subcats)
+        product_id = str(10000 + i)
+        noun = sub_name.split()[0].rstrip('s')
+        products.append({
+            'id': product_id,
+            'name': f"{noun} {rnd.choice(ADJECTIVES)} {rnd.randint(1, 9999)}",
+            'url': f"https://www.signa.pt/brindes/brinde.asp?id={product_id}",
+            'price': round(rnd.uniform(0.15, 80), 2) if rnd.random() > 0.05 else None,
+            'reference': f"SG{rnd.randint(1000, 99999)}",
+            'category': cat_name,
+            'category_id': cat_id,
+            'subcategory': sub_name,
+            'subcategory_id': sub_id,
+            'colors': rnd.sample(COLORS, rnd.randint(0, 4)),
+        })
+    return products
+
+
+def make_listing_page(products: List[Dict[str, Any]], next_href: Optional[str] = None) -> str:
+    """A category listing page laid out like signa.pt: menus full of <li>, then product cards"""
+    menu = ''.join(
+        f'<li><a href="/brindes/categoria.asp?idCategoria={cat_id}&amp;idSubCategoria={sub_id}">{sub_name}</a></li>'
+        for cat_id, _, sub_id, sub_name in subcategories()
+    )
+    cards = ''.join(
+        f'<li class="produto"><div class="imagem"><a href="/brindes/brinde.asp?id={p["id"]}">'
+        f'<img src="/fotos/{p["id"]}.jpg" alt="{p["name"]}"></a></div>'
+        f'<div class="info"><a href="/brindes/brinde.asp?id={p["id"]}">{p["name"]}</a>'
+        f'<span class="ref">{p["reference"]}</span>'
+        f'<span class="preco">Desde {_price_label(p["price"])} €</span></div></li>'
+        for p in products
+    )
+    pager = f'<div class="paginacao"><a href="{next_href}">Seguinte</a></div>' if next_href else ''
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Signa</title></head><body>'
+        f'<nav><ul class="menu">{menu}</ul></nav>'
+        f'<ul class="produtos">{cards}</ul>{pager}'
+        '<footer><ul><li><a href="/empresa.asp">Empresa</a></li><li><a href="/contactos.asp">Contactos</a></li></ul></footer>'
+        '</body></html>'
+    )
+
+
+def _price_label(price) -> str:
+    return f"{price or 0:.2f}".replace('.', ',')
@@ -1,5 +1,7 @@
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from enum import Enum
 
 class ProductCategory(Enum):
@@ -17,16 +19,123 @@ class ProductCategory(Enum):
     VERAO = 12
     VESTUARIO = 13
 
-@dataclass
-class Product:
+@dataclass(frozen=True, slots=True, eq=False)
+class Product(Mapping):
+    """Immutable, slotted product record.
+
+    It also reads like the product dicts the crawlers produce (product['name'],
+    product.get('price')), so it can replace them without touching consumers.
+    Fields left as None are treated as missing keys, and anything without a
+    field of its own is kept in `extra`.
+    """
     id: str
     name: str
-    category: str
-    subcategory: Optional[str]
-    price: Optional[float]
-    colors: List[str]
-    url: str
-    description: Optional[str]
+    category: Optional[str] = None
+    subcategory: Optional[str] = None
+    price: Optional[float] = None
+    colors: Tuple[str, ...] = ()
+    url: str = ""
+    description: Optional[str] = None
+    category_id: Optional[int] = None
+    subcategory_id: Optional[int] = None
+    reference: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Product':
+        # Category and color names repeat across the catalog; interning them
+        # keeps one string object per distinct value
+        extra = {key: value for key, value in data.items() if key not in _PRODUCT_FIELDS}
+        return cls(
+            id=str(data['id']),
+            name=data.get('name') or '',
+            category=_intern(data.get('category')),
+            subcategory=_intern(data.get('subcategory')),
+            price=data.get('price'),
+            colors=tuple(_intern(color) for color in data.get('colors') or ()),
+            url=data.get('url') or '',
+            description=data.get('description'),
+            category_id=data.get('category_id'),
+            subcategory_id=data.get('subcategory_id'),
+            reference=data.get('reference'),
+            extra=extra or None
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: self[key] for key in self}
+        if 'colors' in data:
+            data['colors'] = list(data['colors'])
+        return data
+    
+    def copy(self) -> Dict[str, Any]:
+        return self.to_dict()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in _PRODUCT_FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+    
+    def __contains__(self, key: object) -> bool:
+        if key in _PRODUCT_FIELDS:
+            return _has_value(getattr(self, key))
+        return bool(self.extra) and key in self.extra
+    
+    def __iter__(self) -> Iterator[str]:
+        for key in _PRODUCT_FIELDS:
+            if _has_value(getattr(self, key)):
+                yield key
+        if self.extra:
+            yield from self.extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ScoredProduct(Mapping):
+    """Search hit: a product plus its match score, without copying the product"""
+    product: Mapping
+    match_score: int
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'match_score':
+            return self.match_score
+        return self.product[key]
+    
+    def __contains__(self, key: object) -> bool:
+        return key == 'match_score' or key in self.product
+    
+    def __iter__(self) -> Iterator[str]:
+        yield from self.product
+        yield 'match_score'
+    
+    def __len__(self) -> int:
+        return len(self.product) + 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.product.copy()
+        data['match_score'] = self.match_score
+        return data
+    
+    copy = to_dict
+
+
+_PRODUCT_FIELDS = ('id', 'name', 'category', 'subcategory', 'price', 'colors', 'url',
+                   'description', 'category_id', 'subcategory_id', 'reference')
+
+
+def _has_value(value: Any) -> bool:
+    return value is not None and value != ()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
     
 @dataclass
 class CategoryInfo:
@@ -53,4 +162,12 @@ class SearchResult:
     products: List[Product]
     category_url: Optional[str]
     filter_url: Optional[str]
-    message: str
\ No newline at end of file
+    message: str
+    
+@dataclass
+class ChatResult:
+    """Answer to one chat message, with what it was understood as and what it found"""
+    text: str
+    intent: Dict[str, Any] = field(default_factory=dict)
+    products: List[Product] = field(default_factory=list)
+    filter_url: Optional[str] = None
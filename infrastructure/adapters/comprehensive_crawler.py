@@ -1,453 +1,502 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, Iterable
 from ports.crawler_port import CrawlerPort
 from infrastructure.config import config
-from bs4 import BeautifulSoup
+from infrastructure.utils.colors import COLOR_MAP
+from infrastructure.utils.rate_limiter import AdaptiveRateLimiter
+from infrastructure.utils.http_cache import HttpCache
+from infrastructure.utils.crawl_state import CrawlState
+from infrastructure.utils import listing_parser, detail_parser, signa_catalog
 import aiohttp
-import re
-import json
-from urllib.parse import urlencode, urlparse, parse_qs
 
 class ComprehensiveCrawlerAdapter(CrawlerPort):
     def __init__(self):
-        self.base_url = "https://www.signa.pt"
+        self.base_url = signa_catalog.BASE_URL
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
        
-        self.color_map = {
-            'preto': '72',
-            'preta': '72',
-            'pretos': '72',
-            'pretas': '72',
-            'black': '72',
-            'cinzento': '259',
-            'cinza': '259',
-            'cinzentos': '259',
-            'cinzas': '259',
-            'grey': '259',
-            'gray': '259',
-            'prata': '325',
-            'prateado': '325',
-            'prateada': '325',
-            'prateados': '325',
-            'prateadas': '325',
-            'silver': '325',
-            'roxo': '108',
-            'roxa': '108',
-            'roxos': '108',
-            'roxas': '108',
-            'purple': '108',
-            'violeta': '108',
-            'azul': '117',
-            'azuis': '117',
-            'blue': '117',
-            'rosa': '106',
-            'rosas': '106',
-            'pink': '106',
-            'verde': '96',
-            'verdes': '96',
-            'green': '96',
-            'vermelho': '103',
-            'vermelha': '103',
-            'vermelhos': '103',
-            'vermelhas': '103',
-            'red': '103',
-            'laranja': '87',
-            'laranjas': '87',
-            'orange': '87',
-            'castanho': '91',
-            'castanha': '91',
-            'marrom': '91',
-            'brown': '91',
-            'amarelo': '82',
-            'amarela': '82',
-            'amarelos': '82',
-            'amarelas': '82',
-            'yellow': '82',
-            'bege': '321',
-            'beges': '321',
-            'natural': '321',
-            'branco': '62',
-            'branca': '62',
-            'brancos': '62',
-            'brancas': '62',
-            'white': '62'
-        }
+        self.color_map = dict(COLOR_MAP)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._crawl_state: Optional[CrawlState] = None
+        self._http_cache: Optional[HttpCache] = None
+        self.rate_limiter = AdaptiveRateLimiter(
+            config.crawl_rate_limit, config.crawl_max_rate, config.crawl_concurrency
+        )
+    
+    @property
+    def crawl_state(self) -> CrawlState:
+        """Page hashes and checkpoint, read from disk on first use"""
+        if self._crawl_state is None:
+            self._crawl_state = CrawlState(config.crawl_state_file)
+        return self._crawl_state
+    
+    @property
+    def http_cache(self) -> Optional[HttpCache]:
+        """Response cache, opened on the first fetch so building the adapter opens no database"""
+        if self._http_cache is None and config.cache_enabled:
+            self._http_cache = HttpCache(config.http_cache_file)
+        return self._http_cache
+    
+    async def crawl_site(self, base_url: str, incremental: bool = False,
+                         on_batch: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+                         listings: Optional[Iterable[Tuple[int, Optional[int]]]] = None
+                         ) -> Dict[str, Any]:
+        """Crawl every listing page of every category, following pagination.
         
-        self.categories_structure = {
-            44: {"name": "Beleza & Saúde", "subcategories": [
-                {"id": 359, "name": "Bálsamos Labial"},
-                {"id": 262, "name": "Caixas de Comprimidos"},
-                {"id": 258, "name": "Cuidado Pessoal"},
-                {"id": 360, "name": "Escovas & Escovas de Dentes"},
-                {"id": 263, "name": "Espelhos"},
-                {"id": 265, "name": "Massajadores"}
-            ]},
-            32: {"name": "Bricolage & Auto", "subcategories": [
-                {"id": 201, "name": "Acessórios de Viatura"},
-                {"id": 194, "name": "Canivetes & Navalhas"},
-                {"id": 193, "name": "Ferramentas"},
-                {"id": 195, "name": "Fitas Métricas"},
-                {"id": 199, "name": "Jardinagem"},
-                {"id": 196, "name": "Lanternas & Luzes"},
-                {"id": 202, "name": "Lupas Conta-fios & Escalímetros"},
-                {"id": 323, "name": "Para-Sol para Automóveis"},
-                {"id": 198, "name": "Pilhas & Carregadores"},
-                {"id": 197, "name": "X-actos"}
-            ]},
-            30: {"name": "Casa & Lar", "subcategories": [
-                {"id": 175, "name": "Abre-cápsulas & Saca-rolhas"},
-                {"id": 173, "name": "Acessórios p/ Bebidas"},
-                {"id": 164, "name": "Canecas Personalizadas"},
-                {"id": 171, "name": "Chávenas de Chá & Café"},
-                {"id": 172, "name": "Copos & Pratos"},
-                {"id": 312, "name": "Decorações & Enfeites"},
-                {"id": 168, "name": "Kits Emergência & Sobrevivência"},
-                {"id": 301, "name": "Lancheiras & Frascos"},
-                {"id": 178, "name": "Luvas & Pegas"},
-                {"id": 176, "name": "Mantas"},
-                {"id": 300, "name": "Mealheiros"},
-                {"id": 356, "name": "Tábuas de Servir"},
-                {"id": 307, "name": "Toalhas & Panos"},
-                {"id": 170, "name": "Utilidades"},
-                {"id": 166, "name": "Velas & Ambientadores"}
-            ]},
-            34: {"name": "Doces", "subcategories": [
-                {"id": 215, "name": "Caixinhas & Potes"},
-                {"id": 212, "name": "Chocolates Personalizados"},
-                {"id": 217, "name": "Chupa-chupas"},
-                {"id": 214, "name": "Gomas"},
-                {"id": 213, "name": "Rebuçados & Caramelos"}
-            ]},
-            35: {"name": "Escrita & Escritório", "subcategories": [
-                {"id": 222, "name": "Agendas Personalizadas"},
-                {"id": 221, "name": "Blocos de Notas"},
-                {"id": 313, "name": "Borrachas & Afias"},
-                {"id": 289, "name": "Calculadoras"},
-                {"id": 223, "name": "Calendários & Relógios"},
-                {"id": 304, "name": "Clips & Molas"},
-                {"id": 236, "name": "Conjuntos de Escrita"},
-                {"id": 219, "name": "Esferográficas"},
-                {"id": 232, "name": "Estojos & Porta-Lápis"},
-                {"id": 220, "name": "Lápis & Lapiseiras"},
-                {"id": 225, "name": "Luzes, Lâmpadas & Lasers"},
-                {"id": 306, "name": "Marcadores"},
-                {"id": 233, "name": "Material de Secretária"},
-                {"id": 224, "name": "Notas Adesivas & Lembretes"},
-                {"id": 229, "name": "Pastas & Porta-documentos"},
-                {"id": 243, "name": "Pastas e Mochilas para Portáteis"},
-                {"id": 325, "name": "Réguas"},
-                {"id": 227, "name": "Tapetes de Rato"}
-            ]},
-            33: {"name": "Identificadores", "subcategories": [
-                {"id": 209, "name": "Crachás"},
-                {"id": 207, "name": "Fitas Lanyard"},
-                {"id": 302, "name": "Ímans"},
-                {"id": 208, "name": "Pins Personalizados"},
-                {"id": 206, "name": "Pulseiras Personalizadas"}
-            ]},
-            39: {"name": "Lazer", "subcategories": [
-                {"id": 309, "name": "Animais"},
-                {"id": 299, "name": "Ar Livre"},
-                {"id": 342, "name": "Bolas"},
-                {"id": 361, "name": "Desporto"},
-                {"id": 177, "name": "Garrafas Personalizadas"},
-                {"id": 275, "name": "Insufláveis"},
-                {"id": 269, "name": "Jogos & Puzzles"},
-                {"id": 297, "name": "Leques"},
-                {"id": 358, "name": "Mundo da Criança"},
-                {"id": 328, "name": "Peluches"},
-                {"id": 272, "name": "Verão & Praia"},
-                {"id": 357, "name": "Viagens"}
-            ]},
-            38: {"name": "Pessoais", "subcategories": [
-                {"id": 260, "name": "Anti-stress"},
-                {"id": 261, "name": "Carteiras & Porta-Cartões"},
-                {"id": 256, "name": "Isqueiros"},
-                {"id": 324, "name": "Medalhas & Troféus"},
-                {"id": 242, "name": "Necessaires"},
-                {"id": 257, "name": "Óculos"},
-                {"id": 255, "name": "Porta-Chaves Personalizados"},
-                {"id": 259, "name": "Relógios"}
-            ]},
-            37: {"name": "Sacos & Mochilas", "subcategories": [
-                {"id": 238, "name": "Bolsas"},
-                {"id": 253, "name": "Caixas"},
-                {"id": 254, "name": "Carrinhos de Compras"},
-                {"id": 237, "name": "Malas & Trolleys"},
-                {"id": 241, "name": "Mochilas"},
-                {"id": 349, "name": "Sacos de Algodão"},
-                {"id": 251, "name": "Sacos de Compras"},
-                {"id": 250, "name": "Sacos de Pano"},
-                {"id": 248, "name": "Sacos de Papel"},
-                {"id": 244, "name": "Sacos Desporto"},
-                {"id": 239, "name": "Sacos Dobráveis"},
-                {"id": 298, "name": "Sacos e Lancheiras Térmicas"},
-                {"id": 315, "name": "Sacos em Non Woven"},
-                {"id": 362, "name": "Sacos para Garrafas"},
-                {"id": 350, "name": "Sacos Tipo Mochila"}
-            ]},
-            40: {"name": "Suportes Publicitários", "subcategories": [
-                {"id": 284, "name": "Acrílicos Porta-Folhas"},
-                {"id": 278, "name": "Balcões"},
-                {"id": 277, "name": "Bandeiras de Publicidade"},
-                {"id": 281, "name": "Banners"},
-                {"id": 347, "name": "Cartões de Visita, Flyers & Outros"},
-                {"id": 285, "name": "Cavaletes & Expositores de Exterior"},
-                {"id": 288, "name": "Gestores de Fila"},
-                {"id": 282, "name": "Muros Pop-Up e Tecido"},
-                {"id": 348, "name": "Packs Promocionais"},
-                {"id": 286, "name": "Porta-catálogos"},
-                {"id": 283, "name": "Roll-Ups"},
-                {"id": 346, "name": "Snap Frames"},
-                {"id": 279, "name": "Tendas"}
-            ]},
-            41: {"name": "Tecnologia", "subcategories": [
-                {"id": 234, "name": "Acessórios p/ Telemóveis & Tabletes"},
-                {"id": 296, "name": "Adaptadores"},
-                {"id": 351, "name": "Carregadores & Powerbanks"},
-                {"id": 294, "name": "Cartões de Memórias"},
-                {"id": 345, "name": "Colunas & Auriculares"},
-                {"id": 226, "name": "Extensões & Acessórios USB"},
-                {"id": 310, "name": "Máquinas Fotográficas"},
-                {"id": 293, "name": "Pens USB Personalizadas"},
-                {"id": 316, "name": "Ratos"},
-                {"id": 290, "name": "Web Cam"}
-            ]},
-            31: {"name": "Vestuário", "subcategories": [
-                {"id": 191, "name": "Acessórios"},
-                {"id": 188, "name": "Aventais"},
-                {"id": 179, "name": "Bonés, Chapéus & Panamás"},
-                {"id": 318, "name": "Calçado"},
-                {"id": 185, "name": "Calças e Calções"},
-                {"id": 334, "name": "Camisas"},
-                {"id": 184, "name": "Camisolas & Sweatshirts"},
-                {"id": 190, "name": "Capas & Ponchos"},
-                {"id": 187, "name": "Casacos & Blusões"},
-                {"id": 192, "name": "Chinelos Personalizados"},
-                {"id": 183, "name": "Coletes"},
-                {"id": 333, "name": "Fatos Treino"},
-                {"id": 343, "name": "Gorros e Luvas"},
-                {"id": 180, "name": "Gravatas, Lenços & Cachecóis"},
-                {"id": 189, "name": "Guarda-chuvas"},
-                {"id": 332, "name": "Polares"},
-                {"id": 182, "name": "Polos Personalizados"},
-                {"id": 247, "name": "Porta-fatos e gravatas"},
-                {"id": 181, "name": "T-Shirts Personalizadas"},
-                {"id": 321, "name": "Vestuário de Alta Visibilidade"},
-                {"id": 186, "name": "Vestuário de Trabalho"}
-            ]}
-        }
+        Fetchers, the parser and the writer run as a pipeline joined by bounded
+        queues, so a slow stage throttles the ones before it and memory stays
+        flat however large the catalog is. With `on_batch` the products are
+        handed over in batches of CRAWL_BATCH_SIZE as they are parsed and the
+        result carries none; without it they are returned in 'products'.
+        
+        With `on_batch` the crawl is also checkpointed: once a batch has been
+        handed over, its pages are recorded as visited along with the pages
+        still queued. A crawl of the same site that was interrupted less than
+        CRAWL_RESUME_MAX_AGE ago resumes from there, refetching at most the
+        pages of the batch that was in flight.
+        
+        The result also says what each page yielded ('pages'), which pages of
+        the last crawl were not reached this time ('vanished_pages') and which
+        ids are gone from pages seen before, including those ('removed_ids'). In incremental mode
+        pages whose content hash matches the last committed crawl are not
+        parsed and contribute no products.
+        
+        With `listings`, only those (category id, subcategory id or None)
+        listings are walked, all their pages. Such a partial crawl is not
+        checkpointed, leaves an interrupted full crawl's checkpoint alone and
+        does not count an id as removed while another recorded page lists it.
+        """
+        config.log_debug(f"Starting {'incremental' if incremental else 'comprehensive'} crawl for {base_url}")
+        self.base_url = base_url.rstrip('/')
+        
+        categories = signa_catalog.categories()
+        category_by_id = {category['id']: category for category in categories}
         
-    async def crawl_site(self, base_url: str) -> Dict[str, Any]:
-        config.log_debug(f"Starting comprehensive crawl for {base_url}")
-        
-        # Build categories list from structure
-        categories = []
-        for cat_id, cat_info in self.categories_structure.items():
-            category = {
-                "id": cat_id,
-                "name": cat_info["name"],
-                "url": f"/brindes/categoria.asp?idCategoria={cat_id}",
-                "subcategories": cat_info["subcategories"]
-            }
-            categories.append(category)
-        
-        # Crawl products from ALL categories
         all_products = []
-        total_limit = 500  # Limit total products to avoid timeout
-        
-        for category in categories:
-            if len(all_products) >= total_limit:
-                break
-                
-            if category.get('subcategories'):
-                # Crawl each subcategory
-                for subcat in category['subcategories']:
-                    if len(all_products) >= total_limit:
-                        break
-                        
-                    url = f"{self.base_url}/brindes/categoria.asp?idCategoria={category['id']}&idSubCategoria={subcat['id']}"
-                    config.log_debug(f"Crawling: {category['name']} - {subcat['name']}")
-                    
-                    products = await self._crawl_category_page(url)
-                    for product in products[:30]:  # 30 products per subcategory
-                        product['category'] = category['name']
-                        product['category_id'] = category['id']
-                        product['subcategory'] = subcat['name']
-                        product['subcategory_id'] = subcat['id']
-                        all_products.append(product)
-                        
-                    config.log_debug(f"Added {len(products[:30])} products from {subcat['name']}")
+        page_states = {}
+        current_ids = set()
+        previous_ids = set()
+        totals = {'products': 0, 'pages': 0, 'unchanged_pages': 0}
+        
+        workers = max(1, config.crawl_concurrency)
+        url_queue: asyncio.Queue = asyncio.Queue()
+        html_queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        product_queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        enqueued = set()
+        
+        scope = set(listings) if listings is not None else None
+        starts = []
+        
+        checkpoint = None
+        if on_batch is not None and scope is None:
+            checkpoint = self.crawl_state.start_checkpoint(self.base_url, config.crawl_resume_max_age)
+        visited = checkpoint['visited'] if checkpoint else {}
+        pending = checkpoint['pending'] if checkpoint else {}
+        
+        def start(url: str, category: Dict[str, Any], subcat: Optional[Dict[str, Any]]) -> None:
+            if scope is None or (category['id'], subcat['id'] if subcat else None) in scope:
+                starts.append(url)
+                enqueue(url, category, subcat, 1)
+        
+        def in_scope(url: str) -> bool:
+            if scope is None:
+                return url.startswith(self.base_url + '/')
+            return any(url == first or url.startswith(first + '&') for first in starts)
+        
+        def enqueue(url: str, category: Dict[str, Any], subcat: Optional[Dict[str, Any]], page_number: int) -> None:
+            if url not in enqueued and page_number <= config.crawl_max_pages:
+                enqueued.add(url)
+                pending[url] = [category['id'], subcat['id'] if subcat else None, page_number]
+                url_queue.put_nowait((url, category, subcat, page_number))
+        
+        def record_visit(url: str, visit: Dict[str, Any]) -> None:
+            """Account for a page whose products are stored"""
+            totals['pages'] += 1
+            if 'hash' in visit:
+                page_states[url] = visit
+                previous_ids.update(self.crawl_state.product_ids(url))
+                current_ids.update(visit['product_ids'])
+                totals['products'] += len(visit['product_ids'])
             else:
-                # Crawl main category
-                url = f"{self.base_url}/brindes/categoria.asp?idCategoria={category['id']}"
-                config.log_debug(f"Crawling: {category['name']}")
-                
-                products = await self._crawl_category_page(url)
-                for product in products[:50]:  # 50 products per main category
-                    product['category'] = category['name']
-                    product['category_id'] = category['id']
-                    all_products.append(product)
-                    
-                config.log_debug(f"Added {len(products[:50])} products from {category['name']}")
-        
-        config.log_debug(f"Total products crawled: {len(all_products)}")
+                # Unchanged, or failed to load: it keeps what it had last time
+                current_ids.update(self.crawl_state.product_ids(url))
+                totals['unchanged_pages'] += visit.get('unchanged', False)
+        
+        resumed_pages = len(visited)
+        if visited or pending:
+            config.log_debug(f"Resuming crawl: {len(visited)} pages done, {len(pending)} pending")
+            for url, visit in visited.items():
+                enqueued.add(url)
+                record_visit(url, visit)
+            for url, (category_id, subcat_id, page_number) in list(pending.items()):
+                category = category_by_id.get(category_id)
+                if category is None:
+                    pending.pop(url)
+                    continue
+                subcat = next((sub for sub in category['subcategories'] if sub['id'] == subcat_id), None)
+                enqueue(url, category, subcat, page_number)
+        else:
+            for category in categories:
+                if category.get('subcategories'):
+                    for subcat in category['subcategories']:
+                        start(f"{self.base_url}/brindes/categoria.asp?idCategoria={category['id']}&idSubCategoria={subcat['id']}",
+                              category, subcat)
+                else:
+                    start(f"{self.base_url}/brindes/categoria.asp?idCategoria={category['id']}", category, None)
+        
+        async def fetch_pages():
+            while True:
+                page = await url_queue.get()
+                try:
+                    html, cache_entry = await self._fetch(page[0])
+                except Exception as e:
+                    config.log_debug(f"Error fetching {page[0]}: {e}")
+                    html, cache_entry = "", None
+                await html_queue.put((page, html, cache_entry))
+        
+        async def parse_pages():
+            while True:
+                page, html, cache_entry = await html_queue.get()
+                try:
+                    await process_page(page, html, cache_entry)
+                except Exception as e:
+                    config.log_debug(f"Error processing {page[0]}: {e}")
+                finally:
+                    # Follow-up pages are queued before this one is marked done
+                    url_queue.task_done()
+        
+        async def process_page(page, html: str, cache_entry) -> None:
+            url, category, subcat, page_number = page
+            known_hash = self.crawl_state.page_hash(url) if incremental else None
+            
+            page_hash = hashlib.sha1(html.encode('utf-8')).hexdigest() if html else None
+            if page_hash is None or page_hash == known_hash:
+                next_url = self.crawl_state.next_page(url)
+                if next_url:
+                    enqueue(next_url, category, subcat, page_number + 1)
+                await product_queue.put((url, [], {'unchanged': page_hash is not None}))
+                return
+            
+            products, next_url = await self._parse_listing(url, html, cache_entry)
+            if next_url:
+                enqueue(next_url, category, subcat, page_number + 1)
+            
+            for product in products:
+                product['category'] = category['name']
+                product['category_id'] = category['id']
+                if subcat:
+                    product['subcategory'] = subcat['name']
+                    product['subcategory_id'] = subcat['id']
+            
+            product_ids = [str(product['id']) for product in products]
+            config.log_debug(f"Added {len(products)} products from {subcat['name'] if subcat else category['name']} (page {page_number})")
+            await product_queue.put((url, products, {'hash': page_hash, 'product_ids': product_ids, 'next': next_url}))
+        
+        async def write_batches():
+            batch, batch_pages = [], {}
+            while True:
+                item = await product_queue.get()
+                if item is not None:
+                    url, products, visit = item
+                    batch.extend(products)
+                    batch_pages[url] = visit
+                flushed = bool(batch) and (item is None or len(batch) >= config.crawl_batch_size)
+                if flushed:
+                    if on_batch is not None:
+                        await on_batch(batch)
+                    else:
+                        all_products.extend(batch)
+                    batch = []
+                if not batch:
+                    # Every page seen so far has its products stored
+                    for url, visit in batch_pages.items():
+                        record_visit(url, visit)
+                        visited[url] = visit
+                        pending.pop(url, None)
+                    batch_pages = {}
+                    if checkpoint is not None and (flushed or item is None):
+                        await asyncio.to_thread(self.crawl_state.write, self.crawl_state.snapshot())
+                if item is None:
+                    return
+        
+        writer = asyncio.create_task(write_batches())
+        stages = [asyncio.create_task(fetch_pages()) for _ in range(workers)]
+        stages += [asyncio.create_task(parse_pages()) for _ in range(max(1, config.parse_workers))]
+        crawled = asyncio.create_task(url_queue.join())
+        try:
+            # A writer that fails (the store is down) ends the crawl instead of stalling it
+            await asyncio.wait([crawled, writer], return_when=asyncio.FIRST_COMPLETED)
+            if writer.done():
+                writer.result()
+        except BaseException:
+            writer.cancel()
+            raise
+        finally:
+            for task in stages + [crawled]:
+                task.cancel()
+            await asyncio.gather(*stages, crawled, return_exceptions=True)
+        await product_queue.put(None)
+        await writer
+        
+        # Pages of earlier crawls that nothing links to any more (a category's
+        # pagination shrank): everything they listed is gone
+        vanished = [url for url in self.crawl_state.pages if in_scope(url) and url not in enqueued]
+        for url in vanished:
+            previous_ids.update(self.crawl_state.product_ids(url))
+        removed_ids = previous_ids - current_ids
+        if scope is not None:
+            # A product that moved to a listing this crawl did not walk is not gone
+            for url in self.crawl_state.pages:
+                if not in_scope(url):
+                    removed_ids.difference_update(self.crawl_state.product_ids(url))
+        
+        config.log_debug(f"Total products crawled: {totals['products']} from {totals['pages']} pages "
+                         f"({totals['unchanged_pages']} unchanged)")
+        config.log_debug(f"Rate limiter: {self.rate_limiter.stats()}")
         
         return {
             "categories": categories,
             "products": all_products,
+            "products_crawled": totals['products'],
+            "removed_ids": sorted(removed_ids),
+            "pages": page_states,
+            "vanished_pages": vanished,
+            "unchanged_pages": totals['unchanged_pages'],
+            "resumed_pages": resumed_pages,
+            "partial": scope is not None,
             "base_url": base_url,
             "color_map": self.color_map
         }
     
-    async def _crawl_category_page(self, url: str) -> List[Dict[str, Any]]:
-        """Crawl a single category page and extract products"""
-        html = await self.crawl_page(url)
-        if html:
-            return await self.extract_products(html)
-        return []
+    def has_unfinished_crawl(self) -> bool:
+        return self.crawl_state.has_checkpoint(config.crawl_resume_max_age)
     
-    async def crawl_page(self, url: str) -> str:
-        config.log_debug(f"Crawling page: {url}")
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=self.headers, timeout=30) as response:
-                    content = await response.read()
-                    try:
-                        return content.decode('utf-8')
-                    except:
-                        try:
-                            return content.decode('iso-8859-1')
-                        except:
-                            return content.decode('windows-1252', errors='ignore')
-            except Exception as e:
-                config.log_debug(f"Error crawling page: {e}")
-                return ""
+    async def commit_crawl(self, crawl_result: Dict[str, Any]) -> None:
+        """Remember page hashes once the crawl's products are safely stored; the crawl is done"""
+        self.crawl_state.update(crawl_result.get('pages', {}))
+        self.crawl_state.forget(crawl_result.get('vanished_pages', []))
+        if not crawl_result.get('partial'):
+            self.crawl_state.clear_checkpoint()
+        await asyncio.to_thread(self.crawl_state.write, self.crawl_state.snapshot())
     
-    async def extract_products(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, 'lxml')
-        products = []
+    async def enrich_products(self, product_ids: Iterable[str],
+                              on_batch: Callable[[List[Dict[str, Any]]], Awaitable[None]]) -> Dict[str, Any]:
+        """Fetch each product's detail page for its colors, description and price tiers.
         
-        # Look for product items
-        product_items = soup.find_all('li')
+        Ids go through a bounded queue that drops duplicates, to ENRICH_CONCURRENCY
+        fetchers sharing the crawl's rate limiter, so enrichment can run next to
+        the API without crowding out the site or the loop. Detail pages bypass
+        the HTTP cache: each is read once per product.
+        Records ({'id', ...details, 'enriched_at'}) reach `on_batch` in batches
+        of CRAWL_BATCH_SIZE; pages that fail to load produce no record, so the
+        next run picks them up again.
+        """
+        workers = max(1, config.enrich_concurrency)
+        id_queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        record_queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        totals = {'requested': 0, 'enriched': 0, 'failed': 0}
         
-        for item in product_items:
-            # Check if this is a product by looking for product link
-            product_link = item.find('a', href=re.compile(r'/brindes/brinde\.asp\?id=\d+'))
-            if product_link:
+        async def feed():
+            seen = set()
+            for product_id in product_ids:
+                product_id = str(product_id)
+                if product_id not in seen:
+                    seen.add(product_id)
+                    totals['requested'] += 1
+                    await id_queue.put(product_id)
+            for _ in range(workers):
+                await id_queue.put(None)
+        
+        async def fetch_details():
+            while True:
+                product_id = await id_queue.get()
+                if product_id is None:
+                    return
+                url = f"{self.base_url}/brindes/brinde.asp?id={product_id}"
                 try:
-                    product = self._extract_product_info(item)
-                    if product:
-                        products.append(product)
+                    html, _ = await self._fetch(url, cached=False)
+                    if not html:
+                        totals['failed'] += 1
+                        continue
+                    details = await self._run_parser(detail_parser.parse_product_detail, html)
                 except Exception as e:
-                    config.log_debug(f"Error extracting product: {e}")
+                    config.log_debug(f"Error enriching product {product_id}: {e}")
+                    totals['failed'] += 1
+                    continue
+                totals['enriched'] += 1
+                await record_queue.put({'id': product_id, **details, 'enriched_at': time.time()})
+        
+        async def write_batches():
+            batch = []
+            while True:
+                record = await record_queue.get()
+                if record is not None:
+                    batch.append(record)
+                if batch and (record is None or len(batch) >= config.crawl_batch_size):
+                    await on_batch(batch)
+                    batch = []
+                if record is None:
+                    return
         
-        config.log_debug(f"Extracted {len(products)} products from page")
-        return products
+        async def fetch_all():
+            await asyncio.gather(*stages)
+            await record_queue.put(None)
+        
+        stages = [asyncio.create_task(fetch_details()) for _ in range(workers)]
+        tasks = stages + [asyncio.create_task(feed()), asyncio.create_task(write_batches())]
+        try:
+            # A failing writer must not leave the fetchers blocked on a full queue
+            await asyncio.gather(fetch_all(), tasks[-2], tasks[-1])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        config.log_debug(f"Enrichment finished: {totals}")
+        return totals
     
-    async def extract_categories(self, html: str) -> List[Dict[str, Any]]:
-        # Return pre-defined categories
-        categories = []
-        for cat_id, cat_info in self.categories_structure.items():
-            categories.append({
-                "id": cat_id,
-                "name": cat_info["name"],
-                "url": f"/brindes/categoria.asp?idCategoria={cat_id}",
-                "subcategories": cat_info["subcategories"]
-            })
-        return categories
+    async def _parse_listing(self, url: str, html: str, cache_entry: Optional[Dict[str, Any]]
+                             ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Products on a listing page and the url of its next page"""
+        # An unchanged page comes with what was parsed from it last time
+        if cache_entry is not None and cache_entry.get('products') is not None and 'next' in cache_entry:
+            return cache_entry['products'], cache_entry['next']
+        
+        products, next_url = await self._run_parser(listing_parser.parse_listing, html, url, self.base_url)
+        if self.http_cache is not None:
+            await asyncio.to_thread(self.http_cache.store_products, url, products, next_url)
+        return products, next_url
     
-    def _extract_product_info(self, item) -> Optional[Dict[str, Any]]:
-        try:
-            # Find all product links
-            links = item.find_all('a', href=re.compile(r'/brindes/brinde\.asp\?id=\d+'))
-            if not links:
-                return None
-            
-            # Extract product ID
-            href = links[0].get('href', '')
-            id_match = re.search(r'id=(\d+)', href)
-            if not id_match:
-                return None
-            
-            product_id = id_match.group(1)
-            
-            # Extract name
-            name_text = ""
-            for link in links:
-                text = link.get_text(strip=True)
-                if text and not text.startswith('http'):
-                    name_text = text
-                    break
-            
-            if not name_text:
-                return None
-            
-            # Extract price
-            price = None
-            price_text = item.get_text()
-            price_patterns = [
-                r'Desde\s+(\d+[.,]\d+)\s*€',
-                r'(\d+[.,]\d+)\s*€',
-                r'€\s*(\d+[.,]\d+)'
-            ]
-            
-            for pattern in price_patterns:
-                price_match = re.search(pattern, price_text)
-                if price_match:
-                    price = float(price_match.group(1).replace(',', '.'))
-                    break
-            
-            # Extract reference
-            ref_match = re.search(r'[A-Z]{2,}\d{3,}', price_text)
-            reference = ref_match.group(0) if ref_match else None
-            
-            return {
-                'id': product_id,
-                'name': name_text,
-                'url': f"{self.base_url}/brindes/brinde.asp?id={product_id}",
-                'price': price,
-                'reference': reference
-            }
-        except Exception as e:
-            config.log_debug(f"Error extracting product info: {e}")
-            return None
+    async def crawl_page(self, url: str) -> str:
+        html, _ = await self._fetch(url)
+        return html
     
-    def build_filter_url(self, category_id: int, subcategory_id: Optional[int] = None, 
-                        color: Optional[str] = None, price_min: Optional[float] = None,
-                        price_max: Optional[float] = None, search_query: Optional[str] = None) -> str:
-        """Build a proper filter URL for Signa website"""
-        
-        params = {
-            'q': search_query or '',
-            't': '',
-            'idCategoria': str(category_id),
-            'idSubCategoria': str(subcategory_id) if subcategory_id else '',
-            'idOcasiao': '',
-            'idSector': '',
-            'idCorPrincipal': '',
-            'precoDe': str(price_min) if price_min else '',
-            'precoAte': str(price_max) if price_max else '',
-            'idMaterial': '',
-            'idDimensao': '',
-            'idGramagem': '',
-            'idCapacidade': '',
-            'idCapacidadePB': '',
-            'corDaEscrita': '',
-            'order': '',
-            'prodPorPagina': '25'
-        }
+    async def _fetch(self, url: str, cached: bool = True) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Page html plus its cache entry when the cached copy is still current.
+        
+        With the cache enabled, entries younger than CACHE_TTL are served without
+        touching the network and older ones are revalidated with a conditional
+        GET, so an unchanged page costs a 304 with no body. With `cached` false
+        the page is neither looked up nor stored.
+        """
+        config.log_debug(f"Crawling page: {url}")
         
-        # Map color name to ID
-        if color:
-            color_lower = color.lower()
-            if color_lower in self.color_map:
-                params['idCorPrincipal'] = self.color_map[color_lower]
+        http_cache = self.http_cache if cached else None
+        entry = None
+        if http_cache is not None:
+            entry = await asyncio.to_thread(http_cache.get, url)
+            if entry is not None and http_cache.is_fresh(entry, config.cache_ttl):
+                body = await asyncio.to_thread(http_cache.body, url)
+                if body is not None:
+                    return self._decode(body), entry
+                entry = None
         
-        # Build URL
-        query_string = '&'.join(f"{k}={v}" for k, v in params.items())
-        return f"{self.base_url}/brindes/categoria.asp?{query_string}"
\ No newline at end of file
+        session = self._get_session()
+        for attempt in range(1, config.max_retries + 1):
+            try:
+                async with self.rate_limiter.request(url) as outcome:
+                    async with session.get(url, headers=HttpCache.conditional_headers(entry)) as response:
+                        if response.status == 429 or response.status >= 500:
+                            outcome.fail(self._retry_after(response.headers.get('Retry-After')))
+                            config.log_debug(f"HTTP {response.status} for {url} (attempt {attempt})")
+                            continue
+                        status = response.status
+                        headers = response.headers
+                        content = await response.read() if status != 304 else None
+            except Exception as e:
+                config.log_debug(f"Error crawling page: {e} (attempt {attempt})")
+                continue
+            
+            if status == 304 and entry is not None:
+                body = await asyncio.to_thread(http_cache.body, url)
+                if body is not None:
+                    await asyncio.to_thread(http_cache.revalidated, url, entry)
+                    return self._decode(body), entry
+                # The body file went missing; fetch it again unconditionally
+                entry = None
+                continue
+
+            if status != 200:
+                # 403, 404...: not worth retrying, and its body is no listing
+                config.log_debug(f"HTTP {status} for {url}")
+                return "", None
+            if http_cache is not None:
+                await asyncio.to_thread(
+                    http_cache.store, url, content, headers.get('ETag'), headers.get('Last-Modified')
+                )
+            return self._decode(content or b""), None
+        return "", None
+    
+    @staticmethod
+    def _decode(content: bytes) -> str:
+        try:
+            return content.decode('utf-8')
+        except:
+            try:
+                return content.decode('iso-8859-1')
+            except:
+                return content.decode('windows-1252', errors='ignore')
+    
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+        if self._http_cache is not None:
+            self._http_cache.close()
+            self._http_cache = None
+    
+    async def _run_parser(self, parse, *args):
+        """Run a listing_parser function off the event loop.
+        
+        Parsing is CPU-bound, so it goes to a pool of PARSE_WORKERS processes;
+        with PARSE_WORKERS=0 it runs in a thread, which still keeps the loop
+        responsive but shares the GIL.
+        """
+        if config.parse_workers <= 0:
+            return await asyncio.to_thread(parse, *args)
+        if self._parse_pool is None:
+            # spawn, not fork: the parent has sqlite and snapshot threads running
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=config.parse_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._parse_pool, parse, *args)
+    
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[float]:
+        try:
+            return min(float(value), 60.0) if value else None
+        except ValueError:
+            return None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session, so pages reuse pooled keep-alive connections"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.crawl_concurrency,
+                limit_per_host=config.crawl_concurrency,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=config.crawl_timeout)
+            )
+        return self._session
+    
+    async def extract_products(self, html: str) -> List[Dict[str, Any]]:
+        return await self._run_parser(listing_parser.extract_products, html, self.base_url)
+    
+    async def extract_categories(self, html: str) -> List[Dict[str, Any]]:
+        # Return pre-defined categories
+        return signa_catalog.categories()
+
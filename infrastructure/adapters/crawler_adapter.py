@@ -1,9 +1,11 @@
 import asyncio
-from typing import List, Dict, Any, Optional
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+import time
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable, AsyncIterator, Tuple
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, MemoryAdaptiveDispatcher
 from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
 from ports.crawler_port import CrawlerPort
 from infrastructure.config import config
+from infrastructure.utils.detail_parser import parse_product_detail
 from bs4 import BeautifulSoup
 import re
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -14,21 +16,47 @@ class SignaCrawlerAdapter(CrawlerPort):
         self.browser_config = BrowserConfig(
             headless=True
         )
+        # One browser for the adapter's whole life, started on first use
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._crawler_lock = asyncio.Lock()
+        self._pages = asyncio.Semaphore(max(1, config.browser_pool_size))
         
-    async def crawl_site(self, base_url: str) -> Dict[str, Any]:
+    async def crawl_site(self, base_url: str, incremental: bool = False,
+                         on_batch: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+                         listings: Optional[Iterable[Tuple[int, Optional[int]]]] = None
+                         ) -> Dict[str, Any]:
+        # Browser-rendered pages are not hashed, so every crawl is a full one
         config.log_debug(f"Starting site crawl for {base_url}")
         
         categories = await self._crawl_categories()
+        if listings is not None:
+            # Only whole category pages are rendered, so a subcategory refreshes its category
+            wanted = {category_id for category_id, _ in listings}
+            categories = [category for category in categories if category.get('id') in wanted]
         products = []
+        products_crawled = 0
         
-        for category in categories[:5] if config.debug_mode else categories:
-            config.log_debug(f"Crawling category: {category['name']}")
-            category_products = await self._crawl_category(category)
+        # Categories are rendered BROWSER_POOL_SIZE at a time in the shared browser
+        by_url = {self._absolute(category['url']): category
+                  for category in (categories[:5] if config.debug_mode else categories)}
+        async for url, html in self._crawl_many(list(by_url)):
+            category = by_url[url]
+            config.log_debug(f"Crawled category: {category['name']}")
+            category_products = await self._category_products(category, html)
+            products_crawled += len(category_products)
             products.extend(category_products)
+            if on_batch is not None and len(products) >= config.crawl_batch_size:
+                await on_batch(products)
+                products = []
+        
+        if on_batch is not None and products:
+            await on_batch(products)
+            products = []
             
         return {
             "categories": categories,
             "products": products,
+            "products_crawled": products_crawled,
             "base_url": base_url
         }
     
@@ -36,15 +64,83 @@ class SignaCrawlerAdapter(CrawlerPort):
     async def crawl_page(self, url: str) -> str:
         config.log_debug(f"Crawling page: {url}")
         
-        async with AsyncWebCrawler(browser_config=self.browser_config) as crawler:
-            result = await crawler.arun(
-                url=url,
-                config=CrawlerRunConfig(
-                    cache_mode=CacheMode.ENABLED if config.cache_enabled else CacheMode.DISABLED,
-                    wait_for_network_idle=True
-                )
-            )
-            return result.html
+        crawler = await self._get_crawler()
+        async with self._pages:
+            result = await crawler.arun(url=url, config=self._run_config())
+        return result.html
+    
+    async def _crawl_many(self, urls: List[str]) -> AsyncIterator[Tuple[str, str]]:
+        """(url, html) for each of `urls` as it finishes rendering; failed pages yield ''
+        
+        Each of `urls` is yielded once, also for a page that redirected; a
+        result that cannot be matched to the url asked for counts as failed.
+        """
+        if not urls:
+            return
+        requested = set(urls)
+        crawler = await self._get_crawler()
+        # The dispatcher keeps up to BROWSER_POOL_SIZE pages open, fewer under memory pressure
+        dispatcher = MemoryAdaptiveDispatcher(max_session_permit=max(1, config.browser_pool_size))
+        results = await crawler.arun_many(urls, config=self._run_config(stream=True), dispatcher=dispatcher)
+        async for result in results:
+            url = next((candidate for candidate in (result.url, getattr(result, 'redirected_url', None))
+                        if candidate in requested), None)
+            if url is None:
+                config.log_debug(f"Ignoring result for unrequested url {result.url}")
+                continue
+            requested.discard(url)
+            if not result.success:
+                config.log_debug(f"Error crawling {url}: {result.error_message}")
+            yield url, (result.html or '') if result.success else ''
+        for url in urls:
+            if url in requested:
+                yield url, ''
+    
+    def _run_config(self, stream: bool = False) -> CrawlerRunConfig:
+        return CrawlerRunConfig(
+            cache_mode=CacheMode.ENABLED if config.cache_enabled else CacheMode.DISABLED,
+            wait_until="networkidle",
+            stream=stream
+        )
+    
+    async def _get_crawler(self) -> AsyncWebCrawler:
+        async with self._crawler_lock:
+            if self._crawler is None:
+                crawler = AsyncWebCrawler(config=self.browser_config)
+                await crawler.start()
+                self._crawler = crawler
+        return self._crawler
+    
+    async def commit_crawl(self, crawl_result: Dict[str, Any]) -> None:
+        pass
+    
+    async def enrich_products(self, product_ids: Iterable[str],
+                              on_batch: Callable[[List[Dict[str, Any]]], Awaitable[None]]) -> Dict[str, Any]:
+        totals = {'requested': 0, 'enriched': 0, 'failed': 0}
+        by_url = {f"{self.base_url}/brindes/brinde.asp?id={product_id}": product_id
+                  for product_id in dict.fromkeys(str(product_id) for product_id in product_ids)}
+        totals['requested'] = len(by_url)
+        batch = []
+        async for url, html in self._crawl_many(list(by_url)):
+            if not html:
+                totals['failed'] += 1
+                continue
+            # Parsing is CPU-bound; keep it off the event loop the browser runs on
+            details = await asyncio.to_thread(parse_product_detail, html)
+            batch.append({'id': by_url[url], **details, 'enriched_at': time.time()})
+            totals['enriched'] += 1
+            if len(batch) >= config.crawl_batch_size:
+                await on_batch(batch)
+                batch = []
+        if batch:
+            await on_batch(batch)
+        return totals
+    
+    async def close(self) -> None:
+        async with self._crawler_lock:
+            if self._crawler is not None:
+                await self._crawler.close()
+                self._crawler = None
     
     async def extract_products(self, html: str) -> List[Dict[str, Any]]:
         soup = BeautifulSoup(html, 'lxml')
@@ -76,12 +172,12 @@ class SignaCrawlerAdapter(CrawlerPort):
         html = await self.crawl_page(self.base_url)
         return await self.extract_categories(html)
     
-    async def _crawl_category(self, category: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _absolute(self, url: str) -> str:
+        return url if url.startswith('http') else f"{self.base_url}{url}"
+    
+    async def _category_products(self, category: Dict[str, Any], html: str) -> List[Dict[str, Any]]:
         products = []
-        category_url = f"{self.base_url}{category['url']}" if not category['url'].startswith('http') else category['url']
-        
-        html = await self.crawl_page(category_url)
-        category_products = await self.extract_products(html)
+        category_products = await self.extract_products(html) if html else []
         
         for product in category_products:
             product['category'] = category['name']
@@ -1,52 +1,69 @@
-import openai
 from typing import List, Optional, Dict, Any
 from ports.chatbot_port import ChatbotPort
 from ports.knowledge_base_port import KnowledgeBasePort
-from domain.models import ChatMessage, SearchResult, SearchQuery
+from domain.models import ChatMessage, ChatResult, SearchResult, SearchQuery
 from infrastructure.config import config
-from infrastructure.adapters.comprehensive_crawler import ComprehensiveCrawlerAdapter
+from infrastructure.utils.llm_client import shared_llm_client
+from infrastructure.utils.intent_cache import IntentCache
+from infrastructure.utils.intent_parser import IntentParser
+from infrastructure.utils.product_mappings import PRODUCT_MAPPINGS, match_product
+from infrastructure.utils.signa_catalog import CATEGORIES_STRUCTURE, build_filter_url
+from infrastructure.utils.spell_corrector import SpellCorrector
+import asyncio
 import re
 import json
+import time
 
 class IntelligentChatbotAdapter(ChatbotPort):
     def __init__(self, knowledge_base: KnowledgeBasePort):
         self.knowledge_base = knowledge_base
-        openai.api_key = config.openai_api_key
+        self.llm = shared_llm_client()
         self.model = config.openai_model
-        self.crawler = ComprehensiveCrawlerAdapter()
+        self.intent_cache = IntentCache(
+            config.intent_cache_file, config.intent_cache_size, config.intent_cache_ttl
+        ) if config.cache_enabled else None
+        self.intent_parser = IntentParser(config.intent_local_threshold, config.intent_cheap_price_max)
+        self.corrector: Optional[SpellCorrector] = None
+        self._corrector_version = None
+        self._corrector_build: Optional[asyncio.Task] = None
         
-    async def process_message(self, message: str, context: Optional[List[ChatMessage]] = None) -> str:
+    async def process_message(self, message: str, context: Optional[List[ChatMessage]] = None) -> ChatResult:
         config.log_debug(f"Processing message: {message}")
         
-        # Analyze and correct typos using LLM
-        query_info = await self._analyze_and_correct_query(message)
+        # Fix typos against the catalog vocabulary first, so both the local
+        # parser and the search see the corrected words
+        corrected = await self._correct(message)
+        if corrected != message:
+            config.log_debug(f"Corrected '{message}' to '{corrected}'")
         
-        if query_info['type'] == 'product_search':
-            return await self._handle_product_search(query_info['corrected_message'], query_info)
-        elif query_info['type'] == 'company_info':
-            return await self._get_company_info(message)
+        # Queries made only of known product, color and price words skip the LLM
+        query_info = self.intent_parser.parse(corrected)
+        handled = query_info['confidence'] >= self.intent_parser.threshold
+        self.intent_parser.record(handled)
+        if handled:
+            config.log_debug(f"Parsed locally ({query_info['confidence']}): {query_info}")
         else:
-            return await self._general_response(message, context)
+            query_info = await self._analyze_and_correct_query(corrected)
+        
+        if query_info.get('type') == 'product_search':
+            return await self._handle_product_search(query_info.get('corrected_message') or message, query_info)
+        elif query_info.get('type') == 'company_info':
+            return ChatResult(await self._get_company_info(message), query_info)
+        else:
+            return ChatResult(await self._general_response(message, context), query_info)
     
     async def _analyze_and_correct_query(self, message: str) -> Dict[str, Any]:
         """Use LLM to understand query intent and correct typos"""
+        if self.intent_cache is not None:
+            cached = await self.intent_cache.get(message, self.model)
+            if cached is not None:
+                config.log_debug(f"Intent cache hit for '{message}'")
+                return cached
         
         prompt = f"""Analise a seguinte pergunta sobre produtos da loja Signa. 
-IMPORTANTE: Corrija erros de digitação e entenda a intenção real do usuário.
+Os erros de digitação mais comuns já foram corrigidos; corrija algum que reste e entenda a intenção real do usuário.
 
-Pergunta original: "{message}"
-
-Correções comuns:
-- "bones" ou "bonnes" → "bonés" 
-- "camisa" → pode ser "camisas" ou "t-shirts"
-- "marcador" → "marcadores"
-- "caneca azuis" → "canecas azuis"
-- "mochilla" → "mochila"
-- "porwer bank" → "powerbank"
-- "porta chave" → "porta-chaves"
-- "tshirt" → "t-shirt"
-- "pen drive" → "pen drives"
-- "bolca" → "bolsa"
+Pergunta: "{message}"
 
 Produtos disponíveis na Signa:
 - Canecas, Copos, Garrafas, Termos
@@ -73,7 +90,8 @@ Exemplos:
 """
         
         try:
-            response = openai.chat.completions.create(
+            started = time.perf_counter()
+            response = await self.llm.chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "És um assistente inteligente que corrige erros de digitação e entende intenções."},
@@ -83,7 +101,12 @@ Exemplos:
                 temperature=0.1
             )
             
+            latency = time.perf_counter() - started
+            self.intent_parser.record_llm_latency(latency)
+            
             result = json.loads(response.choices[0].message.content)
+            if self.intent_cache is not None:
+                await self.intent_cache.set(message, self.model, result, latency)
             
             # Log corrections made
             if result.get('corrected_message') and result['corrected_message'] != message:
@@ -100,123 +123,39 @@ Exemplos:
                 'product': message
             }
     
-    async def _handle_product_search(self, message: str, query_info: Dict[str, Any]) -> str:
+    async def _handle_product_search(self, message: str, query_info: Dict[str, Any]) -> ChatResult:
         """Handle product searches with intelligent matching"""
         
         # Get categories from knowledge base
         all_data = await self.knowledge_base.get_all_data()
         
         # Map product types to categories using corrected product name
-        product_type = query_info.get('product', '').lower()
+        product_type = (query_info.get('product') or '').lower()
         color = query_info.get('color')
         
-        # Comprehensive product mappings
-        product_mappings = {
-            # Casa & Lar (30)
-            'caneca': {'cat': 30, 'subcat': 164, 'name': 'canecas'},
-            'canecas': {'cat': 30, 'subcat': 164, 'name': 'canecas'},
-            'copo': {'cat': 30, 'subcat': 165, 'name': 'copos'},
-            'copos': {'cat': 30, 'subcat': 165, 'name': 'copos'},
-            'garrafa': {'cat': 30, 'subcat': 166, 'name': 'garrafas'},
-            'garrafas': {'cat': 30, 'subcat': 166, 'name': 'garrafas'},
-            'termo': {'cat': 30, 'subcat': 167, 'name': 'termos'},
-            'termos': {'cat': 30, 'subcat': 167, 'name': 'termos'},
-            
-            # Escrita & Escritório (35)
-            'caneta': {'cat': 35, 'subcat': 170, 'name': 'canetas'},
-            'canetas': {'cat': 35, 'subcat': 170, 'name': 'canetas'},
-            'lápis': {'cat': 35, 'subcat': 171, 'name': 'lápis'},
-            'marcador': {'cat': 35, 'subcat': 172, 'name': 'marcadores'},
-            'marcadores': {'cat': 35, 'subcat': 172, 'name': 'marcadores'},
-            'caderno': {'cat': 35, 'subcat': 173, 'name': 'cadernos'},
-            'cadernos': {'cat': 35, 'subcat': 173, 'name': 'cadernos'},
-            'bloco': {'cat': 35, 'subcat': 174, 'name': 'blocos de notas'},
-            'blocos': {'cat': 35, 'subcat': 174, 'name': 'blocos de notas'},
-            
-            # Sacos & Mochilas (37)
-            'mochila': {'cat': 37, 'subcat': 159, 'name': 'mochilas'},
-            'mochilas': {'cat': 37, 'subcat': 159, 'name': 'mochilas'},
-            'bolsa': {'cat': 37, 'subcat': 141, 'name': 'bolsas'},
-            'bolsas': {'cat': 37, 'subcat': 141, 'name': 'bolsas'},
-            'saco': {'cat': 37, 'subcat': 180, 'name': 'sacos'},
-            'sacos': {'cat': 37, 'subcat': 180, 'name': 'sacos'},
-            
-            # Tecnologia (41)
-            'powerbank': {'cat': 41, 'subcat': 190, 'name': 'powerbanks'},
-            'powerbanks': {'cat': 41, 'subcat': 190, 'name': 'powerbanks'},
-            'power bank': {'cat': 41, 'subcat': 190, 'name': 'powerbanks'},
-            'pen drive': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
-            'pen drives': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
-            'pendrive': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
-            'pendrives': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
-            'auricular': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
-            'auriculares': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
-            'fone': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
-            'fones': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
-            'coluna': {'cat': 41, 'subcat': 193, 'name': 'colunas'},
-            'colunas': {'cat': 41, 'subcat': 193, 'name': 'colunas'},
-            
-            # Vestuário (31)
-            't-shirt': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
-            't-shirts': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
-            'tshirt': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
-            'tshirts': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
-            'camiseta': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
-            'camisetas': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
-            'camisa': {'cat': 31, 'subcat': 202, 'name': 'camisas'},
-            'camisas': {'cat': 31, 'subcat': 202, 'name': 'camisas'},
-            'polo': {'cat': 31, 'subcat': 201, 'name': 'polos'},
-            'polos': {'cat': 31, 'subcat': 201, 'name': 'polos'},
-            'sweatshirt': {'cat': 31, 'subcat': 203, 'name': 'sweatshirts'},
-            'sweatshirts': {'cat': 31, 'subcat': 203, 'name': 'sweatshirts'},
-            'casaco': {'cat': 31, 'subcat': 204, 'name': 'casacos'},
-            'casacos': {'cat': 31, 'subcat': 204, 'name': 'casacos'},
-            'boné': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
-            'bonés': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
-            'bone': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
-            'bones': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
-            'chapéu': {'cat': 31, 'subcat': 206, 'name': 'chapéus'},
-            'chapéus': {'cat': 31, 'subcat': 206, 'name': 'chapéus'},
-            'chapeu': {'cat': 31, 'subcat': 206, 'name': 'chapéus'},
-            
-            # Identificadores (33)
-            'porta-chaves': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
-            'porta chaves': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
-            'porta chave': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
-            'chaveiro': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
-            'chaveiros': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
-            'lanyard': {'cat': 33, 'subcat': 176, 'name': 'lanyards'},
-            'lanyards': {'cat': 33, 'subcat': 176, 'name': 'lanyards'},
-            'pin': {'cat': 33, 'subcat': 177, 'name': 'pins'},
-            'pins': {'cat': 33, 'subcat': 177, 'name': 'pins'},
-            
-            # Other categories
-            'doce': {'cat': 34, 'name': 'doces'},
-            'doces': {'cat': 34, 'name': 'doces'},
-            'chocolate': {'cat': 34, 'name': 'chocolates'},
-            'chocolates': {'cat': 34, 'name': 'chocolates'},
-            'beleza': {'cat': 44, 'name': 'produtos de beleza'},
-            'saúde': {'cat': 44, 'name': 'produtos de saúde'},
-            'bricolage': {'cat': 32, 'name': 'produtos de bricolage'},
-            'ferramenta': {'cat': 32, 'name': 'ferramentas'},
-            'ferramentas': {'cat': 32, 'name': 'ferramentas'}
-        }
-        
         # Find matching product
         category_id = None
         subcategory_id = None
         category_name = product_type
         
-        for keyword, mapping in product_mappings.items():
-            if keyword in product_type:
-                category_id = mapping['cat']
-                subcategory_id = mapping.get('subcat')
-                category_name = mapping['name']
-                break
+        match = match_product(product_type)
+        if match:
+            mapping = match[1]
+            category_id = mapping['cat']
+            subcategory_id = mapping.get('subcat')
+            category_name = mapping['name']
+        
+        search_query = SearchQuery(
+            text=product_type or message,
+            category=None,
+            color=color,
+            price_min=query_info.get('price_min'),
+            price_max=query_info.get('price_max')
+        )
         
         # Build URL with filters
         if category_id:
-            url = self.crawler.build_filter_url(
+            url = build_filter_url(
                 category_id=category_id,
                 subcategory_id=subcategory_id,
                 color=color,
@@ -234,32 +173,19 @@ Exemplos:
                 response_parts.append(f"Pode encontrar {category_name} {color}s aqui: {url}")
             else:
                 response_parts.append(f"Pode encontrar {category_name} aqui: {url}")
-                
-            return "\n".join(response_parts)
+            
+            # Matching products from the knowledge base go along with the link
+            products = await self.knowledge_base.search_products(search_query.text, self._search_filters(search_query))
+            return ChatResult("\n".join(response_parts), query_info, products, url)
         
         # If no category found, search in knowledge base
-        search_query = SearchQuery(
-            text=product_type or message,
-            category=None,
-            color=color,
-            price_min=query_info.get('price_min'),
-            price_max=query_info.get('price_max')
-        )
-        
         result = await self.search_products(search_query)
-        return result.message
+        return ChatResult(result.message, query_info, result.products, result.filter_url)
     
     async def search_products(self, query: SearchQuery) -> SearchResult:
         """Search products in knowledge base"""
-        filters = {}
-        if query.color:
-            filters['color'] = query.color
-        if query.price_min is not None:
-            filters['price_min'] = query.price_min
-        if query.price_max is not None:
-            filters['price_max'] = query.price_max
-            
-        products = await self.knowledge_base.search_products(query.text, filters)
+        text = await self._correct(query.text) if query.text else query.text
+        products = await self.knowledge_base.search_products(text, self._search_filters(query))
         
         if products:
             message_parts = [f"Encontrei {len(products)} produtos:"]
@@ -277,7 +203,7 @@ Exemplos:
             )
         
         # Try to build a search URL
-        search_url = f"https://www.signa.pt/brindes/pesquisa.asp?q={query.text or ''}"
+        search_url = f"https://www.signa.pt/brindes/pesquisa.asp?q={text or ''}"
         return SearchResult(
             products=[],
             category_url=None,
@@ -285,6 +211,78 @@ Exemplos:
             message=f"Não encontrei produtos específicos. Tente pesquisar aqui: {search_url}"
         )
     
+    @staticmethod
+    def _search_filters(query: SearchQuery) -> Dict[str, Any]:
+        filters = {}
+        if query.color:
+            filters['color'] = query.color
+        if query.price_min is not None:
+            filters['price_min'] = query.price_min
+        if query.price_max is not None:
+            filters['price_max'] = query.price_max
+        return filters
+    
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        if self.intent_cache is None:
+            return {'enabled': False}
+        stats = self.intent_cache.stats()
+        stats['enabled'] = True
+        return stats
+    
+    async def get_intent_stats(self) -> Dict[str, Any]:
+        stats = self.intent_parser.stats()
+        stats['corrector'] = self.corrector.stats() if self.corrector is not None else None
+        return stats
+    
+    async def _correct(self, text: str) -> str:
+        """`text` with typos fixed, or unchanged while no corrector could be built"""
+        corrector = await self._get_corrector()
+        return corrector.correct(text) if corrector is not None else text
+    
+    async def _get_corrector(self) -> Optional[SpellCorrector]:
+        """The corrector for the current catalog; rebuilt in the background when the catalog changes"""
+        data = await self.knowledge_base.get_all_data()
+        version = data.get('catalog_version')
+        if version != self._corrector_version and (self._corrector_build is None or self._corrector_build.done()):
+            self._corrector_version = version
+            self._corrector_build = asyncio.create_task(self._rebuild_corrector(data))
+        if self.corrector is None:
+            # Nothing to correct with yet: the first build is worth waiting for
+            await asyncio.shield(self._corrector_build)
+        return self.corrector
+    
+    async def _rebuild_corrector(self, data: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        try:
+            corrector = await asyncio.to_thread(self._build_corrector, data)
+        except Exception as e:
+            # Try again on the next message instead of waiting for a catalog change
+            self._corrector_version = None
+            config.log_debug(f"Spell corrector build failed: {e}")
+            return
+        previous = self.corrector
+        if previous is not None:
+            corrector.queries, corrector.corrections, corrector.total_time = (
+                previous.queries, previous.corrections, previous.total_time)
+        self.corrector = corrector
+        config.log_debug(f"Spell corrector rebuilt: {len(corrector)} words "
+                         f"in {time.perf_counter() - started:.2f}s")
+    
+    def _build_corrector(self, data: Dict[str, Any]) -> SpellCorrector:
+        """Dictionary of product names, category names and the words the intent parser knows"""
+        texts = [product.get('name') for product in data['products']]
+        for category in list(data['categories']) + list(CATEGORIES_STRUCTURE.values()):
+            texts.append(category.get('name'))
+            texts.extend(sub.get('name') for sub in category.get('subcategories') or [])
+        texts.extend(PRODUCT_MAPPINGS)
+        texts.extend(self.intent_parser.vocabulary())
+        return SpellCorrector.from_texts(texts)
+    
+    async def close(self) -> None:
+        if self.intent_cache is not None:
+            self.intent_cache.close()
+        await self.llm.close()
+    
     async def get_product_by_id(self, product_id: str) -> Optional[dict]:
         all_data = await self.knowledge_base.get_all_data()
         for product in all_data.get('products', []):
@@ -312,7 +310,7 @@ Pergunta do cliente: {message}
 Responde de forma útil, profissional e amigável em português."""
 
         try:
-            response = openai.chat.completions.create(
+            response = await self.llm.chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "És um assistente virtual especializado da Signa."},
@@ -340,7 +338,7 @@ Responde de forma útil, profissional e amigável em português."""
         messages.append({"role": "user", "content": message})
         
         try:
-            response = openai.chat.completions.create(
+            response = await self.llm.chat(
                 model=self.model,
                 messages=messages,
                 temperature=0.7
@@ -1,11 +1,21 @@
+import asyncio
 import json
 import os
+import threading
+from collections import Counter
 from typing import List, Dict, Any, Optional
 from ports.knowledge_base_port import KnowledgeBasePort
+from domain.models import Product, ScoredProduct
 from infrastructure.config import config
 import re
 from fuzzywuzzy import fuzz
-import pickle
+import numpy as np
+from infrastructure.utils.trigram_index import TrigramIndex
+from infrastructure.utils.product_columns import ProductColumns
+from infrastructure.utils.catalog_store import CatalogStore
+from infrastructure.utils.catalog_snapshot import CatalogSnapshot, write_snapshot
+from infrastructure.utils.category_resolver import CategoryResolver
+from infrastructure.utils.ttl_cache import TTLCache
 
 class InMemoryKnowledgeBase(KnowledgeBasePort):
     def __init__(self):
@@ -13,82 +23,189 @@ class InMemoryKnowledgeBase(KnowledgeBasePort):
         self.categories = []
         self.category_map = {}
         self.product_map = {}
-        self.data_file = "knowledge_base.pkl"
+        self.category_resolver = CategoryResolver([])
+        self.data_file = config.data_path("knowledge_base.pkl")
+        self.db_file = config.data_path("knowledge_base.db")
+        self.snapshot_file = config.data_path("knowledge_base.snapshot")
+        self.store = CatalogStore(self.db_file)
+        self._write_lock = asyncio.Lock()
+        self.search_index = TrigramIndex()
+        self.columns = ProductColumns()
+        # Bumped on every catalog change; cached searches from older versions are dropped
+        self.catalog_version = 0
+        self.search_cache = TTLCache(config.search_cache_size, config.cache_ttl)
+        # How often each (sub)category is searched for, to refresh popular ones more often
+        self.category_hits: Counter = Counter()
         self._load_data()
         
     async def store_products(self, products: List[Dict[str, Any]]) -> None:
         config.log_debug(f"Storing {len(products)} products")
         
+        new_products = []
         for product in products:
             if product.get('id') and product['id'] not in self.product_map:
-                self.products.append(product)
-                self.product_map[product['id']] = product
-                
-        self._save_data()
+                record = Product.from_dict(product)
+                self._index_product(len(self.products), record)
+                self.products.append(record)
+                self.product_map[record.id] = record
+                new_products.append(record.to_dict())
+        
+        if new_products:
+            self._bump_catalog_version()
+        await self._persist(self.store.upsert_products, new_products)
+    
+    async def apply_product_diff(self, upserted: List[Dict[str, Any]], removed_ids: List[str]) -> Dict[str, int]:
+        """Add new products, update changed ones and drop removed ones.
+        
+        Updates are merged into the stored product, so fields the listing pages
+        do not carry (e.g. a description) survive a refresh.
+        """
+        config.log_debug(f"Applying product diff: {len(upserted)} upserted, {len(removed_ids)} removed")
+        
+        positions = None
+        added, updated, changed = 0, 0, []
+        for product in upserted:
+            if not product.get('id'):
+                continue
+            product_id = str(product['id'])
+            current = self.product_map.get(product_id)
+            if current is None:
+                record = Product.from_dict(product)
+                self._index_product(len(self.products), record)
+                self.products.append(record)
+                self.product_map[record.id] = record
+                if positions is not None:
+                    positions[record.id] = len(self.products) - 1
+                changed.append(record.to_dict())
+                added += 1
+                continue
+            
+            merged = dict(current)
+            merged.update((key, value) for key, value in product.items() if value is not None)
+            record = Product.from_dict(merged)
+            if record.to_dict() == Product.from_dict(current).to_dict():
+                continue
+            
+            # product_map is kept in list order, so its keys give the positions
+            if positions is None:
+                positions = {key: position for position, key in enumerate(self.product_map)}
+            position = positions[product_id]
+            self.search_index.remove(position, *self._search_texts(current))
+            self.search_index.add(position, *self._search_texts(record))
+            self.columns.set_row(position, record)
+            self.products[position] = record
+            self.product_map[product_id] = record
+            changed.append(record.to_dict())
+            updated += 1
+        
+        removed = [str(product_id) for product_id in removed_ids if str(product_id) in self.product_map]
+        if removed:
+            removed_set = set(removed)
+            self.products = [product for product in self.products if product['id'] not in removed_set]
+            self.product_map = {product['id']: product for product in self.products}
+            self._rebuild_index()
+        
+        if changed or removed:
+            self._bump_catalog_version()
+            await self._persist(self.store.apply_diff, changed, removed)
+        if removed:
+            # Removals come at the end of a crawl; give the freed pages and the WAL back
+            await self._persist(self.store.compact)
+        
+        return {'added': added, 'updated': updated, 'removed': len(removed)}
     
     async def store_categories(self, categories: List[Dict[str, Any]]) -> None:
         config.log_debug(f"Storing {len(categories)} categories")
         
-        self.categories = categories
-        self.category_map = {cat['name'].lower(): cat for cat in categories}
-        
-        for cat in categories:
-            if 'id' in cat:
-                self.category_map[str(cat['id'])] = cat
-                
-        self._save_data()
+        if categories == self.categories:
+            return
+        self._set_categories(categories)
+        self._bump_catalog_version()
+        await self._persist(self.store.replace_categories, categories)
     
     async def search_products(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         config.log_debug(f"Searching products with query: {query}, filters: {filters}")
         
         results = []
-        query_lower = query.lower() if query else ""
+        query_lower = " ".join(query.lower().split()) if query else ""
+        
+        filters = self._normalize_filters(filters or {})
+        
+        cache_key = None
+        if config.cache_enabled:
+            cache_key = (self.catalog_version, query_lower, tuple(sorted(filters.items())))
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                self._count_category_hit(filters, cached)
+                return list(cached)
+        
+        # Fuzzy scoring is restricted to products sharing a trigram with the
+        # query. Scores and order are those of a full scan over these; what a
+        # full scan would add is partial_ratio noise that neither contains the
+        # query nor shares three characters in a row with it ('usb' scoring 67
+        # on 'Pulseira Personalizada'), never a product containing the query
+        candidates = self.search_index.candidates(query_lower) if query_lower else None
         
-        if filters is None:
-            filters = {}
+        # Price/category/color filters resolve to one mask over all products
+        mask = self.columns.filter_mask(filters)
+        if mask is not None:
+            if candidates is None:
+                candidates = np.flatnonzero(mask)
+            else:
+                candidates = [position for position in candidates if mask[position]]
+        elif candidates is None:
+            candidates = range(len(self.products))
         
-        for product in self.products:
+        for position in candidates:
+            product = self.products[position]
             if query_lower:
                 score = self._calculate_match_score(product, query_lower)
             else:
                 score = 100  # If no query, match all
             
             if score > 60:
-                if self._apply_filters(product, filters):
-                    product_copy = product.copy()
-                    product_copy['match_score'] = score
-                    results.append(product_copy)
+                results.append(ScoredProduct(product, score))
         
-        results.sort(key=lambda x: x['match_score'], reverse=True)
+        results.sort(key=lambda x: x.match_score, reverse=True)
+        results = results[:20]
         
-        return results[:20]
+        if cache_key is not None:
+            self.search_cache.set(cache_key, tuple(results))
+        self._count_category_hit(filters, results)
+        return results
     
     async def get_category_info(self, category_name: str) -> Optional[Dict[str, Any]]:
         config.log_debug(f"Getting category info for: {category_name}")
         
-        category_lower = category_name.lower()
-        
-        if category_lower in self.category_map:
-            return self.category_map[category_lower]
-        
-        for name, cat in self.category_map.items():
-            if isinstance(name, str) and fuzz.ratio(category_lower, name) > 80:
-                return cat
-                
-        for cat in self.categories:
-            if fuzz.ratio(category_lower, cat['name'].lower()) > 80:
-                return cat
-                
-        return None
+        return self.category_resolver.resolve(category_name)
     
     async def get_all_data(self) -> Dict[str, Any]:
         return {
             "products": self.products,
             "categories": self.categories,
             "total_products": len(self.products),
-            "total_categories": len(self.categories)
+            "total_categories": len(self.categories),
+            "catalog_version": self.catalog_version
         }
     
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        stats = self.search_cache.stats()
+        stats['enabled'] = config.cache_enabled
+        stats['catalog_version'] = self.catalog_version
+        return stats
+    
+    async def get_category_popularity(self) -> Dict[str, int]:
+        return dict(self.category_hits)
+    
+    def _count_category_hit(self, filters: Dict[str, Any], results) -> None:
+        """Credit the category asked for, or else the one of the best match"""
+        if filters.get('category'):
+            self.category_hits[filters['category']] += 1
+        elif results:
+            for key in ('category', 'subcategory'):
+                if results[0].get(key):
+                    self.category_hits[results[0][key].lower()] += 1
+    
     def _calculate_match_score(self, product: Dict[str, Any], query: str) -> int:
         name_score = fuzz.partial_ratio(query, product['name'].lower())
         
@@ -102,53 +219,125 @@ class InMemoryKnowledgeBase(KnowledgeBasePort):
         
         return max(name_score, category_score) + exact_match_bonus
     
-    def _apply_filters(self, product: Dict[str, Any], filters: Dict[str, Any]) -> bool:
-        if 'color' in filters and filters['color']:
-            if not product.get('colors'):
-                return False
-            color_match = any(fuzz.ratio(filters['color'].lower(), color.lower()) > 70 
-                            for color in product['colors'])
-            if not color_match:
-                return False
-        
-        if 'price_min' in filters and filters['price_min'] is not None:
-            if not product.get('price') or product['price'] < filters['price_min']:
-                return False
-                
-        if 'price_max' in filters and filters['price_max'] is not None:
-            if not product.get('price') or product['price'] > filters['price_max']:
-                return False
-        
-        if 'category' in filters and filters['category']:
-            if not product.get('category'):
-                return False
-            if fuzz.ratio(filters['category'].lower(), product['category'].lower()) < 70:
-                return False
-        
-        return True
-    
-    def _save_data(self):
-        try:
-            with open(self.data_file, 'wb') as f:
-                pickle.dump({
-                    'products': self.products,
-                    'categories': self.categories,
-                    'category_map': self.category_map,
-                    'product_map': self.product_map
-                }, f)
-            config.log_debug(f"Data saved to {self.data_file}")
-        except Exception as e:
-            config.log_debug(f"Error saving data: {e}")
+    def _set_categories(self, categories: List[Dict[str, Any]]) -> None:
+        self.categories = categories
+        self.category_map = {cat['name'].lower(): cat for cat in categories}
+        
+        for cat in categories:
+            if 'id' in cat:
+                self.category_map[str(cat['id'])] = cat
+        
+        self.category_resolver = CategoryResolver(categories)
     
-    def _load_data(self):
-        if os.path.exists(self.data_file):
+    @staticmethod
+    def _normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop empty filters and lowercase text ones, so equivalent searches share a cache entry"""
+        return {
+            key: " ".join(value.lower().split()) if isinstance(value, str) else value
+            for key, value in filters.items() if value is not None and value != ""
+        }
+    
+    def _bump_catalog_version(self) -> None:
+        self.catalog_version += 1
+        self.search_cache.clear()
+    
+    @staticmethod
+    def _search_texts(product: Dict[str, Any]) -> tuple:
+        return product.get('name', ''), product.get('category') or ''
+    
+    @classmethod
+    def build_search_index(cls, products: List[Dict[str, Any]]) -> TrigramIndex:
+        index = TrigramIndex()
+        for position, product in enumerate(products):
+            index.add(position, *cls._search_texts(product))
+        return index
+    
+    def _index_product(self, position: int, product: Dict[str, Any]) -> None:
+        self.search_index.add(position, *self._search_texts(product))
+        self.columns.append(product)
+    
+    def _rebuild_index(self) -> None:
+        self.search_index.clear()
+        self.columns.clear(len(self.products))
+        for position, product in enumerate(self.products):
+            self._index_product(position, product)
+    
+    async def _persist(self, write, *args) -> None:
+        """Run a blocking store write off the event loop, one write at a time.
+
+        A failed write is raised to the caller: a crawl must stop rather than
+        record pages as stored whose products never reached the database.
+        """
+        async with self._write_lock:
             try:
-                with open(self.data_file, 'rb') as f:
-                    data = pickle.load(f)
-                    self.products = data.get('products', [])
-                    self.categories = data.get('categories', [])
-                    self.category_map = data.get('category_map', {})
-                    self.product_map = data.get('product_map', {})
-                config.log_debug(f"Data loaded from {self.data_file}")
+                await asyncio.to_thread(write, *args)
+                config.log_debug(f"Data saved to {self.db_file}")
             except Exception as e:
-                config.log_debug(f"Error loading data: {e}")
\ No newline at end of file
+                config.log_debug(f"Error saving data: {e}")
+                raise
+    
+    def _load_data(self):
+        try:
+            if self.store.is_empty() and self.store.import_pickle(self.data_file):
+                config.log_debug(f"Migrated {self.data_file} into {self.db_file}")
+            
+            self._set_categories(self.store.load_categories())
+            
+            # A snapshot matching the store version is mapped instead of
+            # decoding every row; its products decode fields on access
+            version = self.store.version()
+            snapshot = self._open_snapshot(version)
+            if snapshot is not None:
+                self._load_snapshot(snapshot)
+                config.log_debug(f"Data loaded from {self.snapshot_file}")
+                return
+            
+            for row in self.store.iter_products():
+                product = Product.from_dict(row)
+                self._index_product(len(self.products), product)
+                self.products.append(product)
+                self.product_map[product.id] = product
+            config.log_debug(f"Data loaded from {self.db_file}")
+            
+            if self.products:
+                threading.Thread(
+                    target=self._write_snapshot,
+                    args=(list(self.products), version, self.search_index.to_postings()),
+                    daemon=True
+                ).start()
+        except Exception as e:
+            config.log_debug(f"Error loading data: {e}")
+    
+    def _open_snapshot(self, version: int) -> Optional[CatalogSnapshot]:
+        if not os.path.exists(self.snapshot_file):
+            return None
+        try:
+            snapshot = CatalogSnapshot(self.snapshot_file)
+        except Exception as e:
+            config.log_debug(f"Ignoring unreadable snapshot: {e}")
+            return None
+        if snapshot.catalog_version != version or snapshot.search_index() is None:
+            snapshot.close()
+            return None
+        return snapshot
+    
+    def _load_snapshot(self, snapshot: CatalogSnapshot) -> None:
+        """Adopt a mapped snapshot without decoding its products or rebuilding its index"""
+        self.products = list(snapshot)
+        ids, inverse = snapshot.interned('id')
+        self.product_map = {ids[index]: product for index, product in zip(inverse.tolist(), self.products)}
+        self.search_index = snapshot.search_index(self.search_index.min_overlap)
+        self.columns.clear(len(snapshot))
+        self.columns.extend(
+            snapshot.prices,
+            snapshot.interned('category'),
+            snapshot.interned('subcategory'),
+            snapshot.interned('colors')
+        )
+    
+    def _write_snapshot(self, products: List[Dict[str, Any]], version: int, postings) -> None:
+        try:
+            write_snapshot(self.snapshot_file, products, version, postings)
+            config.log_debug(f"Snapshot written to {self.snapshot_file}")
+        except Exception as e:
+            config.log_debug(f"Error writing snapshot: {e}")
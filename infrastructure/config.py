@@ -6,14 +6,50 @@ load_dotenv()
 
 class Config:
     def __init__(self):
+        # Directory for the catalog, crawl state and caches; the working directory by default
+        self.data_dir = os.getenv("DATA_DIR", "")
+        if self.data_dir:
+            os.makedirs(self.data_dir, exist_ok=True)
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.openai_timeout = float(os.getenv("OPENAI_TIMEOUT", "30"))
+        self.openai_max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        self.openai_max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
         self.debug_mode = os.getenv("DEBUG_MODE", "False").lower() == "true"
         self.crawl_timeout = int(os.getenv("CRAWL_TIMEOUT", "30"))
+        self.crawl_concurrency = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+        self.crawl_rate_limit = float(os.getenv("CRAWL_RATE_LIMIT", "5"))
+        self.crawl_max_rate = float(os.getenv("CRAWL_MAX_RATE", "50"))
+        self.crawl_batch_size = int(os.getenv("CRAWL_BATCH_SIZE", "200"))
+        self.crawl_max_pages = int(os.getenv("CRAWL_MAX_PAGES", "200"))
+        self.parse_workers = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.browser_pool_size = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+        self.crawl_state_file = os.getenv("CRAWL_STATE_FILE", self.data_path("crawl_state.json"))
+        self.crawl_resume_max_age = int(os.getenv("CRAWL_RESUME_MAX_AGE", "86400"))
+        self.enrich_concurrency = int(os.getenv("ENRICH_CONCURRENCY", "2"))
+        self.refresh_enabled = os.getenv("REFRESH_ENABLED", "True").lower() == "true"
+        self.refresh_min_interval = int(os.getenv("REFRESH_MIN_INTERVAL", "3600"))
+        self.refresh_max_interval = int(os.getenv("REFRESH_MAX_INTERVAL", "86400"))
+        self.refresh_jitter = float(os.getenv("REFRESH_JITTER", "0.1"))
+        self.refresh_concurrency = int(os.getenv("REFRESH_CONCURRENCY", "2"))
+        self.refresh_tick = int(os.getenv("REFRESH_TICK", "30"))
+        self.enrich_in_background = os.getenv("ENRICH_IN_BACKGROUND", "False").lower() == "true"
         self.max_retries = int(os.getenv("MAX_RETRIES", "3"))
         self.cache_enabled = os.getenv("CACHE_ENABLED", "True").lower() == "true"
         self.cache_ttl = int(os.getenv("CACHE_TTL", "3600"))
+        self.http_cache_file = os.getenv("HTTP_CACHE_FILE", self.data_path("http_cache.db"))
+        self.search_cache_size = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+        self.intent_cache_file = os.getenv("INTENT_CACHE_FILE", self.data_path("intent_cache.db"))
+        self.intent_cache_size = int(os.getenv("INTENT_CACHE_SIZE", "1024"))
+        self.intent_cache_ttl = int(os.getenv("INTENT_CACHE_TTL", "604800"))
+        self.intent_local_threshold = float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.8"))
+        # Price ceiling, in euros, for "barato"/"económico" with no amount
+        self.intent_cheap_price_max = float(os.getenv("INTENT_CHEAP_PRICE_MAX", "5"))
         
+    def data_path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+    
     def validate(self) -> bool:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required")
@@ -0,0 +1,303 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from infrastructure.utils.trigram_index import TrigramIndex
+
+MAGIC = b'SGNSNAP1'
+FORMAT_VERSION = 1
+
+# Header: magic, format version, catalog version, product count, trigram count,
+# postings count, trigram list (offset, length) in the string table, string table size
+_HEADER = struct.Struct('<8sIqIIIIIQ')
+# String reference offsets: _ABSENT with length _ABSENT means the key is missing,
+# _ABSENT with length 0 means the key is present with a None value
+_ABSENT = 0xFFFFFFFF
+
+# Text fields stored as (offset, length) pairs into the shared string table
+STRING_FIELDS = ('id', 'name', 'url', 'category', 'subcategory', 'reference', 'description')
+_LIST_SEPARATOR = '\x1f'
+_NUMERIC_FIELDS = ('price', 'category_id', 'subcategory_id')
+# Key-presence bits; a present None is stored as NaN/-1/absent colors
+_HAS_PRICE, _HAS_CATEGORY_ID, _HAS_SUBCATEGORY_ID, _HAS_COLORS = 1, 2, 4, 8
+_KNOWN_FIELDS = set(STRING_FIELDS) | set(_NUMERIC_FIELDS) | {'colors'}
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(count: int, gram_count: int, posting_count: int) -> Dict[str, int]:
+    """Byte offsets of every fixed-width section of a snapshot"""
+    offsets = {}
+    position = _align(_HEADER.size)
+    for name, size in (('prices', 8 * count), ('category_ids', 4 * count), ('subcategory_ids', 4 * count),
+                       ('flags', count), ('strings', 8 * (len(STRING_FIELDS) + 2) * count),
+                       ('gram_offsets', 4 * (gram_count + 1)), ('gram_docs', 4 * posting_count)):
+        offsets[name] = position
+        position = _align(position + size)
+    offsets['string_table'] = position
+    return offsets
+
+
+def write_snapshot(path: str, products: Iterable[Dict[str, Any]], catalog_version: int = 0,
+                   search_postings: Optional[Tuple[List[str], np.ndarray, np.ndarray]] = None) -> int:
+    """Write products (and optionally the CSR search index) to `path` atomically"""
+    products = list(products)
+    count = len(products)
+    prices = np.full(count, np.nan, dtype=np.float64)
+    category_ids = np.full(count, -1, dtype=np.int32)
+    subcategory_ids = np.full(count, -1, dtype=np.int32)
+    flags = np.zeros(count, dtype=np.uint8)
+    # One (offset, length) pair per text field, plus colors and a JSON blob with any other fields
+    refs = np.full((count, len(STRING_FIELDS) + 2, 2), _ABSENT, dtype=np.uint32)
+
+    table = bytearray()
+    interned: Dict[str, int] = {}
+
+    def intern(value: str) -> tuple:
+        encoded = value.encode('utf-8')
+        if value not in interned:
+            interned[value] = len(table)
+            table.extend(encoded)
+        return interned[value], len(encoded)
+
+    for row, product in enumerate(products):
+        for column, field in enumerate(STRING_FIELDS):
+            if field in product:
+                value = product[field]
+                refs[row, column] = intern(str(value)) if value is not None else (_ABSENT, 0)
+
+        if 'price' in product:
+            flags[row] |= _HAS_PRICE
+            if product['price'] is not None:
+                prices[row] = float(product['price'])
+        for key, column, bit in (('category_id', category_ids, _HAS_CATEGORY_ID),
+                                 ('subcategory_id', subcategory_ids, _HAS_SUBCATEGORY_ID)):
+            value = product.get(key, -1)
+            if value is None or isinstance(value, int):
+                flags[row] |= bit if key in product else 0
+                column[row] = -1 if value is None else value
+        if 'colors' in product:
+            flags[row] |= _HAS_COLORS
+            if product['colors'] is not None:
+                refs[row, len(STRING_FIELDS)] = intern(_LIST_SEPARATOR.join(product['colors']))
+
+        # Anything without a fixed column (or with an unexpected type) goes to a JSON blob
+        extra = {key: value for key, value in product.items()
+                 if key not in _KNOWN_FIELDS
+                 or (key in ('category_id', 'subcategory_id') and value is not None and not isinstance(value, int))}
+        if extra:
+            refs[row, len(STRING_FIELDS) + 1] = intern(json.dumps(extra, ensure_ascii=False))
+
+    grams, gram_offsets, gram_docs = search_postings or ([], np.zeros(1, dtype=np.uint32), np.zeros(0, dtype=np.uint32))
+    grams_ref = intern(_LIST_SEPARATOR.join(grams))
+
+    offsets = _layout(count, len(grams), len(gram_docs))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, catalog_version, count, len(grams), len(gram_docs),
+                             grams_ref[0], grams_ref[1], len(table)))
+        for name, array in (('prices', prices), ('category_ids', category_ids),
+                            ('subcategory_ids', subcategory_ids), ('flags', flags), ('strings', refs),
+                            ('gram_offsets', gram_offsets.astype(np.uint32)),
+                            ('gram_docs', gram_docs.astype(np.uint32))):
+            f.seek(offsets[name])
+            f.write(array.tobytes())
+        f.seek(offsets['string_table'])
+        f.write(table)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view of a snapshot written by write_snapshot.
+
+    Numeric columns are exposed as NumPy arrays over the mapping and text fields
+    are only decoded when a product field is accessed, so opening a snapshot is
+    O(1) and every process mapping the same file shares its page-cache pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, format_version, self.catalog_version, self.count, self._gram_count,
+         posting_count, grams_offset, grams_length, table_size) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a catalog snapshot (format {FORMAT_VERSION})")
+
+        offsets = _layout(self.count, self._gram_count, posting_count)
+        self._buffer = buffer = memoryview(self._mmap)
+        self.prices = np.frombuffer(buffer, dtype=np.float64, count=self.count, offset=offsets['prices'])
+        self.category_ids = np.frombuffer(buffer, dtype=np.int32, count=self.count, offset=offsets['category_ids'])
+        self.subcategory_ids = np.frombuffer(buffer, dtype=np.int32, count=self.count, offset=offsets['subcategory_ids'])
+        self.flags = np.frombuffer(buffer, dtype=np.uint8, count=self.count, offset=offsets['flags'])
+        self._refs = np.frombuffer(
+            buffer, dtype=np.uint32, count=self.count * (len(STRING_FIELDS) + 2) * 2, offset=offsets['strings']
+        ).reshape(self.count, len(STRING_FIELDS) + 2, 2)
+        self._gram_offsets = np.frombuffer(buffer, dtype=np.uint32, count=self._gram_count + 1,
+                                           offset=offsets['gram_offsets'])
+        self._gram_docs = np.frombuffer(buffer, dtype=np.uint32, count=posting_count, offset=offsets['gram_docs'])
+        self._grams_ref = (grams_offset, grams_length)
+        self._table_offset = offsets['string_table']
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row: int) -> 'SnapshotProduct':
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return SnapshotProduct(self, row)
+
+    def __iter__(self) -> Iterator['SnapshotProduct']:
+        for row in range(self.count):
+            yield SnapshotProduct(self, row)
+
+    def _string(self, row: int, column: int) -> Optional[str]:
+        offset, length = self._refs[row, column]
+        return self._decode(offset, length)
+
+    def _decode(self, offset: int, length: int) -> Optional[str]:
+        if offset == _ABSENT:
+            return None
+        start = self._table_offset + int(offset)
+        return self._mmap[start:start + int(length)].decode('utf-8')
+
+    def interned(self, key: str) -> Tuple[List[Optional[str]], np.ndarray]:
+        """Distinct values of a text field (or joined colors) and each row's index into them.
+
+        Equal strings share one string-table entry, so this decodes every distinct
+        value once instead of once per product.
+        """
+        column = len(STRING_FIELDS) if key == 'colors' else _STRING_COLUMNS[key]
+        offsets = self._refs[:, column, 0]
+        distinct, first_rows, inverse = np.unique(offsets, return_index=True, return_inverse=True)
+        values = [self._string(int(row), column) for row in first_rows]
+        if key == 'colors':
+            values = [value.split(_LIST_SEPARATOR) if value else [] for value in values]
+        return values, inverse
+
+    def search_index(self, min_overlap: float = 0.0) -> Optional[TrigramIndex]:
+        """Trigram index backed by the mapped postings, or None if none was stored"""
+        if not self._gram_count:
+            return None
+        joined = self._decode(*self._grams_ref) or ''
+        return TrigramIndex.from_postings(joined.split(_LIST_SEPARATOR), self._gram_offsets, self._gram_docs,
+                                          self.count, min_overlap)
+
+    def field(self, row: int, key: str) -> Any:
+        if key in _STRING_COLUMNS:
+            return self._string(row, _STRING_COLUMNS[key])
+        flags = int(self.flags[row])
+        if key == 'price' and flags & _HAS_PRICE:
+            price = self.prices[row]
+            return None if np.isnan(price) else float(price)
+        if key == 'category_id' and flags & _HAS_CATEGORY_ID:
+            return int(self.category_ids[row]) if self.category_ids[row] >= 0 else None
+        if key == 'subcategory_id' and flags & _HAS_SUBCATEGORY_ID:
+            return int(self.subcategory_ids[row]) if self.subcategory_ids[row] >= 0 else None
+        if key == 'colors' and flags & _HAS_COLORS:
+            joined = self._string(row, len(STRING_FIELDS))
+            if joined is None:
+                return None
+            return joined.split(_LIST_SEPARATOR) if joined else []
+        return self.extra(row).get(key)
+
+    def extra(self, row: int) -> Dict[str, Any]:
+        blob = self._string(row, len(STRING_FIELDS) + 1)
+        return json.loads(blob) if blob else {}
+
+    def keys(self, row: int) -> List[str]:
+        keys = [field for column, field in enumerate(STRING_FIELDS) if self._refs[row, column, 1] != _ABSENT]
+        flags = int(self.flags[row])
+        if flags & _HAS_PRICE:
+            keys.append('price')
+        if flags & _HAS_CATEGORY_ID:
+            keys.append('category_id')
+        if flags & _HAS_SUBCATEGORY_ID:
+            keys.append('subcategory_id')
+        if flags & _HAS_COLORS:
+            keys.append('colors')
+        keys.extend(self.extra(row))
+        return keys
+
+    def close(self) -> None:
+        # The NumPy views export the buffer, so they have to go before the mapping
+        self.prices = self.category_ids = self.subcategory_ids = self.flags = self._refs = None
+        self._gram_offsets = self._gram_docs = None
+        self._buffer.release()
+        self._mmap.close()
+
+
+_STRING_COLUMNS = {field: column for column, field in enumerate(STRING_FIELDS)}
+
+
+class SnapshotProduct(Mapping):
+    """Lazy product record; each field is decoded from the snapshot on access"""
+
+    __slots__ = ('_snapshot', '_row')
+
+    def __init__(self, snapshot: CatalogSnapshot, row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._snapshot.field(self._row, key)
+        if value is None and key not in self._snapshot.keys(self._row):
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._snapshot.field(self._row, key)
+        if value is None and key not in self._snapshot.keys(self._row):
+            return default
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot.keys(self._row))
+
+    def __len__(self) -> int:
+        return len(self._snapshot.keys(self._row))
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"SnapshotProduct({self.copy()!r})"
+
+
+def convert(source: str, destination: str) -> int:
+    """Build a snapshot from a knowledge_base.db or a legacy knowledge_base.pkl"""
+    from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+    from infrastructure.utils.catalog_store import CatalogStore
+
+    # A pickle is first migrated into the SQLite store next to it, exactly as the
+    # knowledge base would do, so the snapshot is tagged with the store version
+    db_path = os.path.splitext(source)[0] + '.db' if source.endswith('.pkl') else source
+    store = CatalogStore(db_path)
+    try:
+        if source.endswith('.pkl') and store.is_empty():
+            store.import_pickle(source)
+        products = list(store.iter_products())
+        version = store.version()
+    finally:
+        store.close()
+
+    index = InMemoryKnowledgeBase.build_search_index(products)
+    return write_snapshot(destination, products, version, index.to_postings())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m infrastructure.utils.catalog_snapshot <knowledge_base.pkl|.db> <output.snapshot>")
+        sys.exit(1)
+    written = convert(sys.argv[1], sys.argv[2])
+    print(f"Wrote {written} products to {sys.argv[2]}")
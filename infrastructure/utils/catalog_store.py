@@ -0,0 +1,136 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+class CatalogStore:
+    """SQLite (WAL) persistence for the knowledge base.
+
+    Products are upserted row by row, so a batch only writes the products it
+    touches. Every write runs in a single transaction, which makes a crash
+    mid-write roll back instead of leaving a half-written file behind. Methods
+    are blocking; async callers are expected to run them in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS categories (position INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            products = self._conn.execute("SELECT 1 FROM products LIMIT 1").fetchone()
+            categories = self._conn.execute("SELECT 1 FROM categories LIMIT 1").fetchone()
+        return products is None and categories is None
+
+    def iter_products(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield products in insertion order, reading the table in batches"""
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, data FROM products WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last_seq, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for seq, data in rows:
+                yield json.loads(data)
+            last_seq = rows[-1][0]
+
+    def load_categories(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM categories ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def upsert_products(self, products: Iterable[Dict[str, Any]]) -> None:
+        self.apply_diff(products, ())
+    
+    def delete_products(self, product_ids: Iterable[str]) -> None:
+        self.apply_diff((), product_ids)
+    
+    def apply_diff(self, upserts: Iterable[Dict[str, Any]], deleted_ids: Iterable[str]) -> None:
+        """Upsert and delete products in one transaction"""
+        rows = [(str(product['id']), json.dumps(product, ensure_ascii=False)) for product in upserts]
+        deletes = [(str(product_id),) for product_id in deleted_ids]
+        if not rows and not deletes:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO products (id, data) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                rows
+            )
+            self._conn.executemany("DELETE FROM products WHERE id = ?", deletes)
+            self._bump_version()
+    
+    def replace_categories(self, categories: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM categories")
+            self._conn.executemany(
+                "INSERT INTO categories (position, data) VALUES (?, ?)",
+                [(i, json.dumps(cat, ensure_ascii=False)) for i, cat in enumerate(categories)]
+            )
+            self._bump_version()
+
+    def version(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def import_pickle(self, pickle_path: str) -> bool:
+        """One-off migration from the legacy pickle file, which is left untouched.
+
+        Categories and products go in one transaction: a crash midway leaves the
+        store empty, so the next start migrates again.
+        """
+        if not os.path.exists(pickle_path):
+            return False
+        with open(pickle_path, 'rb') as f:
+            data = pickle.load(f)
+        categories = data.get('categories', [])
+        rows = [(str(p['id']), json.dumps(p, ensure_ascii=False)) for p in data.get('products', []) if p.get('id')]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM categories")
+            self._conn.executemany(
+                "INSERT INTO categories (position, data) VALUES (?, ?)",
+                [(i, json.dumps(cat, ensure_ascii=False)) for i, cat in enumerate(categories)]
+            )
+            self._conn.executemany(
+                "INSERT INTO products (id, data) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                rows
+            )
+            self._bump_version()
+        return True
+
+    def compact(self) -> None:
+        """Reclaim free pages and fold the WAL back into the database file"""
+        with self._lock:
+            # VACUUM goes through the WAL too, so the checkpoint comes after it
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _bump_version(self) -> None:
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
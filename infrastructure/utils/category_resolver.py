@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional, Tuple
+from fuzzywuzzy import fuzz
+from Levenshtein import distance as levenshtein_distance
+from infrastructure.utils.text_utils import normalize_text
+
+
+class BKTree:
+    """Burkhard-Keller tree over Levenshtein distance"""
+
+    def __init__(self):
+        self._root: Optional[Tuple[str, Dict[int, Any]]] = None
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            dist = levenshtein_distance(word, node[0])
+            if dist == 0:
+                return
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[Tuple[int, str]]:
+        """All (distance, word) pairs within `radius` edits of `word`"""
+        if self._root is None:
+            return []
+        matches = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            dist = levenshtein_distance(word, node_word)
+            if dist <= radius:
+                matches.append((dist, node_word))
+            for child_dist, child in children.items():
+                if dist - radius <= child_dist <= dist + radius:
+                    stack.append(child)
+        return matches
+
+
+class CategoryResolver:
+    """Resolves free-text category or subcategory names to stored categories.
+
+    Lookups are accent-insensitive. Exact names and ids hit a dict; anything
+    else is looked up in a BK-tree and confirmed with the same fuzz.ratio > 80
+    rule the knowledge base always used.
+    """
+
+    def __init__(self, categories: List[Dict[str, Any]]):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._tree = BKTree()
+
+        # Categories first, so a subcategory never shadows a category name
+        for cat in categories:
+            self._add(cat['name'], cat)
+            if 'id' in cat:
+                self._entries.setdefault(str(cat['id']), cat)
+        for cat in categories:
+            for sub in cat.get('subcategories') or []:
+                if sub.get('name'):
+                    self._add(sub['name'], self._subcategory_entry(cat, sub))
+
+    def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        key = normalize_text(name)
+        if not key:
+            return None
+        if key in self._entries:
+            return self._entries[key]
+
+        # ratio > 80 implies fewer than len(key) / 2 edits, so this radius never
+        # misses a candidate the ratio check would accept
+        best_score, best = 0, None
+        for dist, candidate in sorted(self._tree.search(key, (len(key) - 1) // 2)):
+            score = fuzz.ratio(key, candidate)
+            if score > 80 and score > best_score:
+                best_score, best = score, self._entries[candidate]
+        return best
+
+    def _add(self, name: str, entry: Dict[str, Any]) -> None:
+        key = normalize_text(name)
+        if key and key not in self._entries:
+            self._entries[key] = entry
+            self._tree.add(key)
+
+    def _subcategory_entry(self, cat: Dict[str, Any], sub: Dict[str, Any]) -> Dict[str, Any]:
+        """The parent category, pointed at the subcategory page"""
+        entry = dict(cat)
+        entry['subcategory'] = sub
+        if sub.get('url'):
+            entry['url'] = sub['url']
+        elif 'id' in cat and 'id' in sub:
+            entry['url'] = f"/brindes/categoria.asp?idCategoria={cat['id']}&idSubCategoria={sub['id']}"
+        return entry
@@ -0,0 +1,83 @@
+import re
+from typing import List
+from infrastructure.utils.text_utils import normalize_text
+
+# Portuguese/English color words -> Signa idCorPrincipal filter ids
+COLOR_MAP = {
+    'preto': '72',
+    'preta': '72',
+    'pretos': '72',
+    'pretas': '72',
+    'black': '72',
+    'cinzento': '259',
+    'cinza': '259',
+    'cinzentos': '259',
+    'cinzas': '259',
+    'grey': '259',
+    'gray': '259',
+    'prata': '325',
+    'prateado': '325',
+    'prateada': '325',
+    'prateados': '325',
+    'prateadas': '325',
+    'silver': '325',
+    'roxo': '108',
+    'roxa': '108',
+    'roxos': '108',
+    'roxas': '108',
+    'purple': '108',
+    'violeta': '108',
+    'azul': '117',
+    'azuis': '117',
+    'blue': '117',
+    'rosa': '106',
+    'rosas': '106',
+    'pink': '106',
+    'verde': '96',
+    'verdes': '96',
+    'green': '96',
+    'vermelho': '103',
+    'vermelha': '103',
+    'vermelhos': '103',
+    'vermelhas': '103',
+    'red': '103',
+    'laranja': '87',
+    'laranjas': '87',
+    'orange': '87',
+    'castanho': '91',
+    'castanha': '91',
+    'marrom': '91',
+    'brown': '91',
+    'amarelo': '82',
+    'amarela': '82',
+    'amarelos': '82',
+    'amarelas': '82',
+    'yellow': '82',
+    'bege': '321',
+    'beges': '321',
+    'natural': '321',
+    'branco': '62',
+    'branca': '62',
+    'brancos': '62',
+    'brancas': '62',
+    'white': '62'
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def canonical_color_ids(color: str) -> List[str]:
+    """Signa color ids named by a color string, e.g. 'Azul Marinho' -> ['117'].
+
+    The whole (accent-folded) string is tried first, then each word, so
+    multi-color values like 'Preto/Branco' yield every id they mention.
+    """
+    normalized = normalize_text(color)
+    if normalized in COLOR_MAP:
+        return [COLOR_MAP[normalized]]
+    ids = []
+    for token in _TOKEN_RE.findall(normalized):
+        color_id = COLOR_MAP.get(token)
+        if color_id and color_id not in ids:
+            ids.append(color_id)
+    return ids
@@ -0,0 +1,88 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class CrawlState:
+    """What the last committed crawl saw on each listing page.
+
+    Per page URL it keeps a content hash, the ids of the products taken from
+    that page and the link to the next page, which is enough to skip unchanged
+    pages (and still walk past them) and to tell which products disappeared
+    from the ones that changed. It also holds the checkpoint of a crawl in
+    progress, so an interrupted crawl can resume instead of starting over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.checkpoint: Optional[Dict[str, Any]] = None
+        self._load()
+
+    def page_hash(self, url: str) -> Optional[str]:
+        page = self.pages.get(url)
+        return page['hash'] if page else None
+
+    def product_ids(self, url: str) -> List[str]:
+        page = self.pages.get(url)
+        return list(page['product_ids']) if page else []
+
+    def next_page(self, url: str) -> Optional[str]:
+        page = self.pages.get(url)
+        return page.get('next') if page else None
+
+    def update(self, pages: Dict[str, Dict[str, Any]]) -> None:
+        self.pages.update(pages)
+
+    def forget(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.pages.pop(url, None)
+
+    def start_checkpoint(self, base_url: str, max_age: float) -> Dict[str, Any]:
+        """The unfinished crawl of `base_url` to resume, or a fresh one.
+
+        A checkpoint holds the crawl's frontier: 'visited' maps each page whose
+        products are already stored to what it yielded, 'pending' maps each
+        queued page to its [category id, subcategory id, page number].
+        """
+        checkpoint = self.checkpoint
+        if not self.has_checkpoint(max_age) or checkpoint.get('base_url') != base_url:
+            checkpoint = {'base_url': base_url, 'started_at': time.time(), 'visited': {}, 'pending': {}}
+        self.checkpoint = checkpoint
+        return checkpoint
+
+    def has_checkpoint(self, max_age: float) -> bool:
+        """Whether a crawl started less than `max_age` seconds ago was left unfinished"""
+        checkpoint = self.checkpoint
+        return checkpoint is not None and time.time() - checkpoint.get('started_at', 0) <= max_age
+
+    def clear_checkpoint(self) -> None:
+        self.checkpoint = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the state for `write` to save from another thread while the crawl goes on"""
+        checkpoint = None
+        if self.checkpoint is not None:
+            checkpoint = dict(self.checkpoint, visited=dict(self.checkpoint['visited']),
+                              pending=dict(self.checkpoint['pending']))
+        return {'pages': dict(self.pages), 'checkpoint': checkpoint}
+
+    def save(self) -> None:
+        self.write(self.snapshot())
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.pages = data.get('pages', {})
+            self.checkpoint = data.get('checkpoint')
+        except (OSError, ValueError):
+            self.pages = {}
+            self.checkpoint = None
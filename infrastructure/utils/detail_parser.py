@@ -0,0 +1,141 @@
+import re
+from typing import Any, Dict, List, Optional
+import lxml.html
+from lxml import etree
+from infrastructure.utils.colors import canonical_color_ids
+
+# Module-level like listing_parser, so it can run in the crawler's parse pool
+
+PRICE = re.compile(r'(\d+[.,]\d+)\s*€|€\s*(\d+[.,]\d+)|^\s*(\d+[.,]\d+)\s*$')
+QUANTITY = re.compile(r'^\D{0,12}?(\d[\d.\s]*)\s*(?:un\.?|unid\w*|pcs?\.?|\+)?\s*$', re.IGNORECASE)
+COLORS_LABEL = re.compile(r'\bCor(?:es)?(?:\s+dispon[ií]veis)?\s*:\s*([^\n]+)', re.IGNORECASE)
+COLOR_SEPARATORS = re.compile(r'\s*(?:,|;|/|\||\be\b)\s*')
+WHITESPACE = re.compile(r'\s+')
+DESCRIPTION_HEADING = re.compile(r'^descri[çc][ãa]o(?: do produto)?\s*:?\s*', re.IGNORECASE)
+# A class or id naming a color swatch: "cor", "cores", "cor-azul", "color_swatch"; not "corpo" or "decoration"
+COLOR_NAME = re.compile(r'^(?:cor|cores|colou?rs?)(?:[-_]\S*)?$', re.IGNORECASE)
+
+COLOR_NODES = etree.XPath(
+    "//*[contains(translate(@class, 'COR', 'cor'), 'cor') or contains(translate(@id, 'COR', 'cor'), 'cor')"
+    " or contains(@class, 'color') or contains(@id, 'color')]"
+)
+DESCRIPTION_NODES = etree.XPath(
+    "//*[contains(translate(@class, 'DESCRIÇÃO', 'descrição'), 'descri')"
+    " or contains(translate(@id, 'DESCRIÇÃO', 'descrição'), 'descri') or contains(@class, 'description')]"
+)
+META_DESCRIPTION = etree.XPath(
+    "//meta[@name='description' or @property='og:description']/@content"
+)
+TABLE_ROWS = etree.XPath("//table//tr")
+
+MAX_DESCRIPTION = 2000
+
+
+def parse_product_detail(html: str) -> Dict[str, Any]:
+    """Colors, description and price tiers from a /brindes/brinde.asp?id= page.
+
+    Only fields that were found are returned, so merging the result into a
+    stored product never blanks what the listing pages provided.
+    """
+    if not html:
+        return {}
+    tree = lxml.html.fromstring(html)
+    details: Dict[str, Any] = {}
+
+    colors = _colors(tree)
+    if colors:
+        details['colors'] = colors
+
+    description = _description(tree)
+    if description:
+        details['description'] = description
+
+    tiers = _price_tiers(tree)
+    if tiers:
+        details['price_tiers'] = tiers
+    return details
+
+
+def _colors(tree) -> List[str]:
+    """Color names from color swatches/lists, or a 'Cores: ...' line.
+
+    Only a swatch's own attributes and text count, not those of what it
+    contains, and values are kept only when they name a known Signa color.
+    """
+    candidates = []
+    for element in COLOR_NODES(tree):
+        names = (element.get('class') or '').split() + [element.get('id') or '']
+        if not any(COLOR_NAME.match(name) for name in names):
+            continue
+        for attribute in ('title', 'alt', 'data-cor', 'data-color', 'data-name'):
+            value = element.get(attribute)
+            if value:
+                candidates.append(value)
+        text = _clean(element.text or '')
+        if text:
+            candidates.append(text)
+    colors = [value for value in candidates if canonical_color_ids(value) and len(value) <= 40]
+
+    if not colors:
+        match = COLORS_LABEL.search(tree.text_content())
+        if match:
+            colors = [part for part in COLOR_SEPARATORS.split(match.group(1).strip().rstrip('.')) if part]
+
+    unique = []
+    seen = set()
+    for color in colors:
+        color = _clean(color)
+        key = color.lower()
+        if color and key not in seen:
+            seen.add(key)
+            unique.append(color)
+    return unique
+
+
+def _description(tree) -> Optional[str]:
+    texts = [DESCRIPTION_HEADING.sub('', _clean(' '.join(node.itertext()))) for node in DESCRIPTION_NODES(tree)]
+    texts = [text for text in texts if len(text) > 20]
+    if not texts:
+        texts = [_clean(content) for content in META_DESCRIPTION(tree) if _clean(content)]
+    if not texts:
+        return None
+    # The innermost description block is the shortest one that says anything
+    return min(texts, key=len)[:MAX_DESCRIPTION]
+
+
+def _price_tiers(tree) -> List[Dict[str, Any]]:
+    """Rows pairing a quantity with a unit price, e.g. '100 un. | 1,25 €'"""
+    tiers = {}
+    for row in TABLE_ROWS(tree):
+        cells = [_clean(cell.text_content()) for cell in row if isinstance(cell.tag, str) and cell.tag in ('td', 'th')]
+        if len(cells) < 2:
+            continue
+        quantity = _quantity(cells[0])
+        if quantity is None:
+            continue
+        for cell in cells[1:]:
+            price = _price(cell)
+            if price is not None:
+                tiers.setdefault(quantity, price)
+                break
+    return [{'quantity': quantity, 'price': tiers[quantity]} for quantity in sorted(tiers)]
+
+
+def _quantity(text: str) -> Optional[int]:
+    match = QUANTITY.match(text)
+    if not match:
+        return None
+    digits = re.sub(r'[.\s]', '', match.group(1))
+    return int(digits) if digits.isdigit() and int(digits) > 0 else None
+
+
+def _price(text: str) -> Optional[float]:
+    match = PRICE.search(text)
+    if not match:
+        return None
+    value = next(group for group in match.groups() if group)
+    return float(value.replace(',', '.'))
+
+
+def _clean(text: str) -> str:
+    return WHITESPACE.sub(' ', text).strip()
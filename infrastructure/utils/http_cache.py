@@ -0,0 +1,94 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class HttpCache:
+    """On-disk HTTP response cache keyed by URL.
+
+    Each row holds a response body with the validators (ETag / Last-Modified)
+    needed for a conditional GET, plus what was parsed from that body (its
+    products and next-page link), so a 304 can skip the parser as well as the
+    download. Rows live in a SQLite database in WAL mode: rewriting hundreds of
+    small files per crawl costs a flush each on most filesystems. Methods are
+    blocking; async callers run them in a thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, "
+                "body BLOB NOT NULL, products TEXT, next TEXT)"
+            )
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Stored metadata for `url` ('etag', 'last_modified', 'fetched_at', 'products', 'next') or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fetched_at, products, next FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, fetched_at, products, next_url = row
+        entry = {'url': url, 'etag': etag, 'last_modified': last_modified, 'fetched_at': fetched_at,
+                 'products': json.loads(products) if products is not None else None}
+        if products is not None:
+            entry['next'] = next_url
+        return entry
+
+    def body(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM responses WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Save a full 200 response; what was parsed from a different older body is dropped"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO responses (url, etag, last_modified, fetched_at, body) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                "fetched_at = excluded.fetched_at, body = excluded.body, "
+                "products = CASE WHEN body = excluded.body THEN products END, "
+                "next = CASE WHEN body = excluded.body THEN next END",
+                (url, etag, last_modified, time.time(), body)
+            )
+
+    def revalidated(self, url: str, entry: Dict[str, Any]) -> None:
+        """Record a 304: the stored body is current as of now"""
+        entry['fetched_at'] = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (entry['fetched_at'], url))
+
+    def store_products(self, url: str, products: List[Dict[str, Any]], next_url: Optional[str] = None) -> None:
+        """Keep what was parsed from the stored body: its products and next-page link"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET products = ?, next = ? WHERE url = ?",
+                (json.dumps(products, ensure_ascii=False), next_url, url)
+            )
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any], ttl: float) -> bool:
+        return time.time() - entry.get('fetched_at', 0) < ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from infrastructure.utils.text_utils import normalize_text
+from infrastructure.utils.ttl_cache import TTLCache
+
+
+class IntentCache:
+    """Parsed intents of chat messages, so a repeated question skips the LLM.
+
+    Entries are keyed by the model and the message with accents, case and
+    whitespace folded ("Tem  caneca azul?" and "tem caneca azul?" share one).
+    The first tier is an in-process TTLCache; the second is a SQLite table in
+    WAL mode that survives restarts and refills the first on a hit. Both
+    expire entries `ttl` seconds after the LLM produced them. Each entry keeps
+    how long that LLM call took, which is what a hit saves.
+    """
+
+    def __init__(self, path: Optional[str], maxsize: int = 1024, ttl: float = 7 * 86400):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize, ttl)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_latency = 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS intents ("
+                    "key TEXT PRIMARY KEY, intent TEXT NOT NULL, latency REAL NOT NULL, stored_at REAL NOT NULL)"
+                )
+                self._conn.execute("DELETE FROM intents WHERE stored_at < ?", (time.time() - ttl,))
+
+    @staticmethod
+    def key(message: str, model: str) -> str:
+        return f"{model}\n{normalize_text(message)}"
+
+    async def get(self, message: str, model: str) -> Optional[Dict[str, Any]]:
+        """A copy of the cached intent, or None"""
+        key = self.key(message, model)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory_hits += 1
+        elif self._conn is not None:
+            row = await asyncio.to_thread(self._load, key)
+            if row is not None:
+                self.disk_hits += 1
+                entry, remaining = row
+                self.memory.set(key, entry, remaining)
+        if entry is None:
+            self.misses += 1
+            return None
+        intent, latency = entry
+        self.saved_latency += latency
+        return dict(intent)
+
+    async def set(self, message: str, model: str, intent: Dict[str, Any], latency: float) -> None:
+        key = self.key(message, model)
+        self.memory.set(key, (dict(intent), latency))
+        if self._conn is not None:
+            await asyncio.to_thread(self._store, key, intent, latency)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'hits': hits,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'saved_latency': round(self.saved_latency, 3),
+            'size': len(self.memory),
+            'maxsize': self.memory.maxsize,
+            'ttl': self.ttl
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+    def _load(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT intent, latency, stored_at FROM intents WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        intent, latency, stored_at = row
+        # Back in memory it keeps the expiry it was given on disk
+        remaining = stored_at + self.ttl - time.time()
+        if remaining <= 0:
+            return None
+        return (json.loads(intent), latency), remaining
+
+    def _store(self, key: str, intent: Dict[str, Any], latency: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO intents (key, intent, latency, stored_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(intent, ensure_ascii=False), latency, time.time())
+            )
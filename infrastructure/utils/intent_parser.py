@@ -0,0 +1,181 @@
+import re
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from infrastructure.utils.colors import COLOR_MAP
+from infrastructure.utils.product_mappings import PRODUCT_MAPPINGS
+from infrastructure.utils.text_utils import normalize_text
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)\s*(?:€|eur(?:os?)?)?'
+_PRICE_RANGE_RE = re.compile(r'\bentre\s+' + _NUMBER + r'\s+e\s+' + _NUMBER)
+_PRICE_MAX_RE = re.compile(r'\b(?:ate|menos de|abaixo de|inferior a|no maximo|maximo|max)\s+(?:a\s+)?' + _NUMBER)
+_PRICE_MIN_RE = re.compile(r'\b(?:mais de|acima de|superior a|a partir de|desde|no minimo|minimo)\s+' + _NUMBER)
+_CHEAP_RE = re.compile(r'\b(?:barat[oa]s?|economic[oa]s?|em conta)\b')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+_COMPANY_WORDS = {'signa', 'empresa', 'contacto', 'contactos', 'telefone', 'email', 'morada', 'localizacao',
+                  'horario', 'envio', 'envios', 'entrega', 'entregas', 'amostra', 'amostras', 'mockup',
+                  'mockups', 'personalizacao', 'serigrafia', 'bordado', 'gravacao', 'fundada'}
+_GREETING_WORDS = {'ola', 'bom', 'boa', 'dia', 'tarde', 'noite', 'obrigado', 'obrigada', 'adeus', 'hello',
+                   'hi', 'ajuda', 'tudo', 'bem'}
+# Words that carry no intent of their own
+_STOP_WORDS = {'tem', 'tens', 'ha', 'existe', 'existem', 'quero', 'queria', 'procuro', 'preciso', 'gostaria',
+               'de', 'do', 'da', 'dos', 'das', 'com', 'para', 'em', 'no', 'na', 'nos', 'nas', 'um', 'uma',
+               'uns', 'umas', 'o', 'a', 'os', 'as', 'e', 'ou', 'me', 'mostra', 'mostrar', 'mostre', 'ver',
+               'algum', 'alguma', 'alguns', 'algumas', 'voces', 'vcs', 'produto', 'produtos', 'brinde',
+               'brindes', 'cor', 'cores', 'personalizado', 'personalizada', 'personalizados',
+               'personalizadas', 'por', 'favor', 'pf', 'qual', 'quais', 'que', 'eu', 'sim', 'sao', 'quem',
+               'onde', 'como', 'fazem', 'fazer', 'vender', 'vendem', 'preco', 'precos', 'euros',
+               'euro', 'cerca', 'tipo'}
+
+
+def _price(text: str) -> float:
+    return float(text.replace(',', '.'))
+
+
+class IntentParser:
+    """Deterministic intent parser that answers common queries without the LLM.
+
+    Understands what the code already has a vocabulary for: product words
+    (PRODUCT_MAPPINGS), colors (COLOR_MAP), price phrases ("até 5 euros",
+    "entre 2 e 4€", "baratas") and plain company questions or greetings. It
+    returns the same query_info the LLM analysis does, plus a confidence: the
+    share of the message's words it recognised, so anything it only partly
+    understood (typos, qualifiers it has no filter for) is left to the LLM.
+    So are messages mixing product and company words, which could be either.
+    """
+
+    def __init__(self, threshold: float = 0.8, cheap_price_max: float = 5.0):
+        self.threshold = threshold
+        # The price ceiling "barato" with no amount stands for
+        self.cheap_price_max = cheap_price_max
+        self.messages = 0
+        self.handled = 0
+        self._local_latencies: deque = deque(maxlen=1000)
+        self._llm_latencies: deque = deque(maxlen=1000)
+
+        # Longest keywords first, so "pen drives" wins over "pen drive"
+        self._products = {normalize_text(keyword): mapping for keyword, mapping in PRODUCT_MAPPINGS.items()}
+        keywords = sorted(self._products, key=len, reverse=True)
+        self._product_re = re.compile(r'(?<![a-z0-9])(' + '|'.join(map(re.escape, keywords)) + r')(?![a-z0-9])')
+        # Colors are reported by their first name in COLOR_MAP (singular masculine)
+        names_by_id: Dict[str, str] = {}
+        for name, color_id in COLOR_MAP.items():
+            names_by_id.setdefault(color_id, name)
+        self._colors = {name: names_by_id[color_id] for name, color_id in COLOR_MAP.items()}
+
+    def parse(self, message: str) -> Dict[str, Any]:
+        """query_info for `message` with a 'confidence' in [0, 1]"""
+        started = time.perf_counter()
+        text = normalize_text(message)
+        info: Dict[str, Any] = {
+            'type': 'general',
+            'corrected_message': message,
+            'product': None,
+            'category': None,
+            'color': None,
+            'price_min': None,
+            'price_max': None
+        }
+
+        text = self._parse_prices(text, info)
+        match = self._product_re.search(text)
+        if match:
+            info['product'] = self._products[match.group(1)]['name']
+            text = text[:match.start()] + ' ' + text[match.end():]
+
+        tokens = _TOKEN_RE.findall(text)
+        unknown: List[str] = []
+        company = greeting = False
+        for token in tokens:
+            if token in self._colors:
+                info['color'] = info['color'] or self._colors[token]
+            elif token in _COMPANY_WORDS:
+                company = True
+            elif token in _GREETING_WORDS:
+                greeting = True
+            elif token not in _STOP_WORDS:
+                unknown.append(token)
+
+        # The product phrase counts as one recognised word
+        words = len(tokens) + (1 if match else 0)
+        share = 1 - len(unknown) / words if words else 0.0
+        if info['product'] and company:
+            # "Fazem gravação em canetas?" asks about a service as much as a product
+            info['type'] = 'company_info'
+            confidence = share * 0.5
+        elif info['product']:
+            info['type'] = 'product_search'
+            confidence = share
+        elif company:
+            info['type'] = 'company_info'
+            confidence = share
+        elif greeting and not (info['color'] or info['price_min'] or info['price_max']):
+            confidence = share
+        else:
+            # A color or a price without a product, or nothing recognisable
+            info['type'] = 'product_search'
+            confidence = share * 0.5
+        info['confidence'] = round(confidence, 2)
+        self._local_latencies.append(time.perf_counter() - started)
+        return info
+
+    def vocabulary(self) -> List[str]:
+        """Every word the parser recognises, so a spelling corrector leaves them alone"""
+        words = set(_COMPANY_WORDS) | _GREETING_WORDS | _STOP_WORDS | set(self._colors)
+        for keyword in self._products:
+            words.update(_TOKEN_RE.findall(keyword))
+        return sorted(words)
+
+    def record(self, handled: bool) -> None:
+        """Count one message, answered locally or passed on to the LLM analysis"""
+        self.messages += 1
+        if handled:
+            self.handled += 1
+
+    def record_llm_latency(self, latency: float) -> None:
+        """Time of one LLM intent analysis: what each locally handled message saves"""
+        self._llm_latencies.append(latency)
+
+    def stats(self) -> Dict[str, Any]:
+        local_p50 = self._median(self._local_latencies)
+        llm_p50 = self._median(self._llm_latencies)
+        return {
+            'messages': self.messages,
+            'handled_locally': self.handled,
+            'local_share': self.handled / self.messages if self.messages else 0.0,
+            'threshold': self.threshold,
+            'local_p50_ms': round(local_p50 * 1000, 3) if local_p50 is not None else None,
+            'llm_p50_ms': round(llm_p50 * 1000, 1) if llm_p50 is not None else None,
+            'saved_p50_ms': round((llm_p50 - local_p50) * 1000, 1)
+            if llm_p50 is not None and local_p50 is not None else None
+        }
+
+    @staticmethod
+    def _median(values) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
+
+    def _parse_prices(self, text: str, info: Dict[str, Any]) -> str:
+        """Fill price_min/price_max from price phrases and return the text without them"""
+        match = _PRICE_RANGE_RE.search(text)
+        if match:
+            low, high = sorted((_price(match.group(1)), _price(match.group(2))))
+            info['price_min'], info['price_max'] = low, high
+            return text[:match.start()] + ' ' + text[match.end():]
+        match = _PRICE_MAX_RE.search(text)
+        if match:
+            info['price_max'] = _price(match.group(1))
+            text = text[:match.start()] + ' ' + text[match.end():]
+        match = _PRICE_MIN_RE.search(text)
+        if match:
+            info['price_min'] = _price(match.group(1))
+            text = text[:match.start()] + ' ' + text[match.end():]
+        match = _CHEAP_RE.search(text)
+        if match:
+            if info['price_max'] is None:
+                info['price_max'] = self.cheap_price_max
+            text = text[:match.start()] + ' ' + text[match.end():]
+        return text
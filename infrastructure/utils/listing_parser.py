@@ -0,0 +1,220 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from infrastructure.config import config
+
+# Plain module-level functions returning plain records, so they can run in a
+# process pool worker without pickling the crawler
+
+PRODUCT_LINK = re.compile(r'/brindes/brinde\.asp\?id=\d+')
+PRODUCT_ID = re.compile(r'id=(\d+)')
+PRICE_PATTERNS = [
+    re.compile(r'Desde\s+(\d+[.,]\d+)\s*€'),
+    re.compile(r'(\d+[.,]\d+)\s*€'),
+    re.compile(r'€\s*(\d+[.,]\d+)')
+]
+REFERENCE = re.compile(r'[A-Z]{2,}\d{3,}')
+
+# Fast path: only <li> elements that contain a product link, straight off the lxml tree
+PRODUCT_ITEMS = etree.XPath("//li[.//a[contains(@href, '/brindes/brinde.asp?id=')]]")
+ITEM_LINKS = etree.XPath(".//a[contains(@href, '/brindes/brinde.asp?id=')]")
+NEXT_LINKS = etree.XPath("//a[@href][contains(concat(' ', normalize-space(@rel), ' '), ' next ')]"
+                         " | //link[@href][contains(concat(' ', normalize-space(@rel), ' '), ' next ')]")
+ALL_LINKS = etree.XPath("//a[@href]")
+
+# Link texts that mark the "next page" control of a listing
+NEXT_PAGE_LABELS = {'seguinte', 'próxima', 'proxima', 'próximo', 'proximo', 'next', '›', '»', '>', '>>'}
+
+
+def parse_listing(html: str, url: str, base_url: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Products on a listing page and the url of its next page"""
+    fast = _parse_fast(html, url, base_url)
+    if fast is not None:
+        return fast
+    soup = BeautifulSoup(html, 'lxml')
+    return products_from_soup(soup, base_url), next_page_url(soup, url)
+
+
+def extract_products(html: str, base_url: str) -> List[Dict[str, Any]]:
+    fast = _parse_fast(html, None, base_url)
+    if fast is not None:
+        return fast[0]
+    return products_from_soup(BeautifulSoup(html, 'lxml'), base_url)
+
+
+def _parse_fast(html: str, url: Optional[str], base_url: str) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """XPath extraction on the lxml tree; None means "use the BeautifulSoup path".
+
+    It gives up on anything unexpected, including pages that mention product
+    links but yield no products, so odd markup still gets the tolerant parser.
+    """
+    try:
+        tree = lxml.html.fromstring(html)
+        products = []
+        for item in PRODUCT_ITEMS(tree):
+            product = _product_from_element(item, base_url)
+            if product:
+                products.append(product)
+        if not products and PRODUCT_LINK.search(html):
+            return None
+        next_url = _next_page_from_tree(tree, url) if url else None
+    except Exception as e:
+        config.log_debug(f"Fast extractor failed, falling back: {e}")
+        return None
+    config.log_debug(f"Extracted {len(products)} products from page")
+    return products, next_url
+
+
+def _product_from_element(item, base_url: str) -> Optional[Dict[str, Any]]:
+    """Same fields and rules as extract_product_info, read from an lxml element"""
+    links = [link for link in ITEM_LINKS(item) if PRODUCT_LINK.search(link.get('href', ''))]
+    if not links:
+        return None
+
+    id_match = PRODUCT_ID.search(links[0].get('href', ''))
+    if not id_match:
+        return None
+    product_id = id_match.group(1)
+
+    name_text = ""
+    for link in links:
+        text = ''.join(part.strip() for part in link.itertext())
+        if text and not text.startswith('http'):
+            name_text = text
+            break
+    if not name_text:
+        return None
+
+    item_text = ''.join(item.itertext())
+    price = None
+    for pattern in PRICE_PATTERNS:
+        price_match = pattern.search(item_text)
+        if price_match:
+            price = float(price_match.group(1).replace(',', '.'))
+            break
+
+    ref_match = REFERENCE.search(item_text)
+    return {
+        'id': product_id,
+        'name': name_text,
+        'url': f"{base_url}/brindes/brinde.asp?id={product_id}",
+        'price': price,
+        'reference': ref_match.group(0) if ref_match else None
+    }
+
+
+def _next_page_from_tree(tree, url: str) -> Optional[str]:
+    candidates = NEXT_LINKS(tree)
+    if not candidates:
+        for link in ALL_LINKS(tree):
+            label = (''.join(part.strip() for part in link.itertext())
+                     or link.get('title') or link.get('aria-label') or '').lower()
+            classes = ' '.join((link.get('class') or '').split()).lower()
+            if label in NEXT_PAGE_LABELS or 'next' in classes or 'seguinte' in classes:
+                candidates.append(link)
+    return _same_listing(url, [link.get('href') for link in candidates])
+
+
+def products_from_soup(soup, base_url: str) -> List[Dict[str, Any]]:
+    products = []
+
+    # Look for product items
+    product_items = soup.find_all('li')
+
+    for item in product_items:
+        # Check if this is a product by looking for product link
+        product_link = item.find('a', href=PRODUCT_LINK)
+        if product_link:
+            try:
+                product = extract_product_info(item, base_url)
+                if product:
+                    products.append(product)
+            except Exception as e:
+                config.log_debug(f"Error extracting product: {e}")
+
+    config.log_debug(f"Extracted {len(products)} products from page")
+    return products
+
+
+def extract_product_info(item, base_url: str) -> Optional[Dict[str, Any]]:
+    try:
+        # Find all product links
+        links = item.find_all('a', href=PRODUCT_LINK)
+        if not links:
+            return None
+
+        # Extract product ID
+        href = links[0].get('href', '')
+        id_match = PRODUCT_ID.search(href)
+        if not id_match:
+            return None
+
+        product_id = id_match.group(1)
+
+        # Extract name
+        name_text = ""
+        for link in links:
+            text = link.get_text(strip=True)
+            if text and not text.startswith('http'):
+                name_text = text
+                break
+
+        if not name_text:
+            return None
+
+        # Extract price
+        price = None
+        price_text = item.get_text()
+        for pattern in PRICE_PATTERNS:
+            price_match = pattern.search(price_text)
+            if price_match:
+                price = float(price_match.group(1).replace(',', '.'))
+                break
+
+        # Extract reference
+        ref_match = REFERENCE.search(price_text)
+        reference = ref_match.group(0) if ref_match else None
+
+        return {
+            'id': product_id,
+            'name': name_text,
+            'url': f"{base_url}/brindes/brinde.asp?id={product_id}",
+            'price': price,
+            'reference': reference
+        }
+    except Exception as e:
+        config.log_debug(f"Error extracting product info: {e}")
+        return None
+
+
+def next_page_url(soup, url: str) -> Optional[str]:
+    """Next page of the same listing, from rel="next" or a 'next'-looking link"""
+    candidates = soup.find_all(['a', 'link'], rel='next')
+    if not candidates:
+        for link in soup.find_all('a', href=True):
+            label = (link.get_text(strip=True) or link.get('title') or link.get('aria-label') or '').lower()
+            classes = ' '.join(link.get('class') or []).lower()
+            if label in NEXT_PAGE_LABELS or 'next' in classes or 'seguinte' in classes:
+                candidates.append(link)
+
+    return _same_listing(url, [link.get('href') for link in candidates])
+
+
+def _same_listing(url: str, hrefs: List[Optional[str]]) -> Optional[str]:
+    """First href that is another page of the listing at `url`"""
+    current = urlparse(url)
+    listing = {key: parse_qs(current.query).get(key) for key in ('idCategoria', 'idSubCategoria')}
+    for href in hrefs:
+        if not href:
+            continue
+        candidate = urljoin(url, href)
+        parsed = urlparse(candidate)
+        if candidate == url or parsed.netloc != current.netloc or parsed.path != current.path:
+            continue
+        # Pagination stays inside the listing it started from
+        if all(parse_qs(parsed.query).get(key) == value for key, value in listing.items()):
+            return candidate
+    return None
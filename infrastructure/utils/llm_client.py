@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from openai import AsyncOpenAI
+from infrastructure.config import config
+
+
+class LLMClient:
+    """One AsyncOpenAI client for the whole process.
+
+    Completions are awaited instead of blocking the event loop, so the API keeps
+    serving other chats while one waits on the model. The client is built on
+    first use (a missing API key then fails that call, not the import) and its
+    connection pool is reused by every caller. At most OPENAI_MAX_CONCURRENCY
+    requests are in flight; the rest queue here rather than at the provider.
+    """
+
+    def __init__(self):
+        self._client: Optional[AsyncOpenAI] = None
+        self._slots = asyncio.Semaphore(max(1, config.openai_max_concurrency))
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs: Any):
+        """`chat.completions.create` with the configured model unless one is given"""
+        kwargs.setdefault('model', config.openai_model)
+        self.waiting += 1
+        async with self._slots:
+            self.waiting -= 1
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                return await self._get_client().chat.completions.create(messages=messages, **kwargs)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                self.requests += 1
+                self.total_latency += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'avg_latency': round(self.total_latency / self.requests, 3) if self.requests else None
+        }
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def _get_client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=config.openai_api_key,
+                base_url=config.openai_base_url,
+                timeout=config.openai_timeout,
+                max_retries=config.openai_max_retries
+            )
+        return self._client
+
+
+_shared: Optional[LLMClient] = None
+
+
+def shared_llm_client() -> LLMClient:
+    global _shared
+    if _shared is None:
+        _shared = LLMClient()
+    return _shared
@@ -0,0 +1,61 @@
+# Common Portuguese words, mostly outside the catalog vocabulary. The spelling
+# corrector treats them as correctly spelled and never rewrites them into a
+# catalog word one edit away ("fica" -> "fita", "palha" -> "pilha").
+COMMON_WORDS = frozenset("""
+a à ao aos as às o os um uma uns umas de do da dos das dum duma no na nos nas num numa
+em por pelo pela pelos pelas para pra com sem sob sobre entre até desde contra após perante
+e ou mas nem que se porque pois como quando onde enquanto embora caso logo porém contudo
+também já ainda só apenas mesmo muito muita muitos muitas pouco pouca poucos poucas mais menos
+bem mal sim não nunca sempre talvez aqui ali aí lá cá agora hoje amanhã ontem depois antes
+eu tu ele ela nós vós eles elas você vocês me te se lhe nos vos lhes mim ti si comigo contigo
+meu minha meus minhas teu tua teus tuas seu sua seus suas nosso nossa nossos nossas vosso vossa
+vossos vossas dele dela deles delas este esta estes estas esse essa esses essas aquele aquela
+aqueles aquelas isto isso aquilo qual quais quem quanto quanta quantos quantas cujo outro outra
+outros outras todo toda todos todas tudo nada algo alguém ninguém algum alguma alguns algumas
+nenhum nenhuma cada qualquer quaisquer vários várias tal tais tanto tanta tantos tantas
+ser sou és é somos são era eram foi foram seja sejam será serão seria
+estar estou está estamos estão estava estavam esteve esteja estejam estará
+ter tenho tens tem temos têm tinha tinham teve tenha tenham terá teria
+haver há houve haja haverá havia
+fazer faço faz fazem fazemos fiz fez feito feita feitos feitas faça façam fará faria
+poder posso pode podem podemos pude pôde possa possam poderá poderia poderiam
+querer quero quer querem queremos queria queriam quis queira
+ir vou vai vamos vão ia foi vá
+dar dou dá dão deu dê dado dada
+ver vejo vê veem vi viu veja vejam visto vista
+vir venho vem vêm veio venha
+saber sei sabe sabem sabemos soube saiba
+dizer digo diz dizem disse diga digam
+precisar preciso precisa precisam precisamos precisava
+gostar gosto gosta gostam gostaria gostaríamos
+procurar procuro procura procuram procurava procurando
+encontrar encontro encontra encontram encontrei encontrar
+comprar compro compra compram comprei comprado encomendar encomenda encomendas encomendei
+pedir peço pede pedem pedi pedido pedidos
+falar falo fala falam falei falando contactar ligar liguei enviar envio envia enviam enviei enviado
+receber recebo recebe recebi recebido pagar pago paga pagamento pagamentos
+ficar fico fica ficam ficou fique
+mostrar mostra mostre mostrem mostrou ajudar ajuda ajude ajudem ajudou
+saber conhecer conheço conhece usar uso usa usado usada escolher escolho escolha
+existir existe existem custar custa custam custo custos preço preços valor valores
+obrigado obrigada obrigados muito olá bom boa bons boas dia dias tarde tardes noite noites
+adeus tchau até logo favor desculpa desculpe licença
+loja lojas empresa empresas site página páginas catálogo catálogos morada moradas endereço
+horário horários telefone telemóvel email contacto contactos informação informações
+cliente clientes pessoa pessoas equipa serviço serviços qualidade quantidade quantidades
+unidade unidades peça peças mínimo máximo prazo prazos entrega entregas envio envios portes
+grátis gratuito gratuita desconto descontos orçamento orçamentos proposta fatura factura
+logótipo logotipo logo logos marca marcas nome nomes texto imagem imagens desenho
+gravação gravar gravado gravada laser impressão imprimir impresso impressa estampagem bordado
+bordar bordados serigrafia tampografia sublimação personalização personalizar personalizado
+personalizada personalizados personalizadas amostra amostras modelo modelos tamanho tamanhos
+cor cores material materiais tecido algodão poliéster plástico metal madeira vidro papel
+cartão couro pele bambu cortiça palha borracha silicone alumínio aço inox cerâmica porcelana
+grande grandes pequeno pequena pequenos pequenas médio média novo nova novos novas
+barato barata baratos baratas caro cara caros caras melhor melhores pior
+claro clara escuro escura
+evento eventos feira feiras congresso festa festas casamento natal verão inverno escola
+escritório oficina carro viagem praia desporto
+semana semanas mês meses ano anos hora horas minuto minutos
+portugal lisboa porto braga
+""".split())
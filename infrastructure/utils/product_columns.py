@@ -0,0 +1,173 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from fuzzywuzzy import fuzz
+from infrastructure.utils.colors import canonical_color_ids
+from infrastructure.utils.text_utils import normalize_text
+
+
+class ProductColumns:
+    """Columnar copy of the filterable product fields, row-aligned with the product list.
+
+    Category, subcategory and color strings are interned into small integer codes,
+    so a query filter is fuzzy-matched once against the vocabulary and then applied
+    to every product as a single vectorized mask. Colors known to the Signa color
+    map are stored as canonical color ids ('#117' for every shade of azul/blue),
+    so those filters are plain bitmask membership.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.clear(capacity)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self, capacity: int = 1024) -> None:
+        self._size = 0
+        self._capacity = 0
+        self.prices = np.empty(0, dtype=np.float64)
+        self.category_ids = np.empty(0, dtype=np.int32)
+        self.subcategory_ids = np.empty(0, dtype=np.int32)
+        self.color_masks = np.empty((0, 1), dtype=np.uint64)
+        self.category_codes: Dict[str, int] = {}
+        self.subcategory_codes: Dict[str, int] = {}
+        self.color_bits: Dict[str, int] = {}
+        self._grow(capacity)
+
+    def append(self, product: Dict[str, Any]) -> None:
+        if self._size == self._capacity:
+            self._grow(self._capacity * 2)
+        self._size += 1
+        self.set_row(self._size - 1, product)
+
+    def extend(self, prices: np.ndarray, categories: Tuple[List[Optional[str]], np.ndarray],
+               subcategories: Tuple[List[Optional[str]], np.ndarray],
+               colors: Tuple[List[Optional[List[str]]], np.ndarray]) -> None:
+        """Append a block of rows from already-interned columns.
+
+        Text columns are given as (distinct values, per-row index into them), so
+        every distinct category or color combination is coded only once.
+        """
+        count = len(prices)
+        end = self._size + count
+        if end > self._capacity:
+            self._grow(max(end, self._capacity * 2))
+        rows = slice(self._size, end)
+
+        with np.errstate(invalid='ignore'):
+            self.prices[rows] = np.where(prices == 0, np.nan, prices)
+        for codes, target, (values, inverse) in ((self.category_codes, self.category_ids, categories),
+                                                 (self.subcategory_codes, self.subcategory_ids, subcategories)):
+            distinct = np.array([self._code(codes, value) for value in values], dtype=np.int32)
+            target[rows] = distinct[inverse] if count else []
+
+        values, inverse = colors
+        bits = [[self._color_bit(key) for key in self._color_keys(color_list)] for color_list in values]
+        distinct = np.zeros((len(values), self.color_masks.shape[1]), dtype=np.uint64)
+        for i, color_bits in enumerate(bits):
+            for bit in color_bits:
+                word, offset = divmod(bit, 64)
+                distinct[i, word] |= np.uint64(1 << offset)
+        self.color_masks[rows] = distinct[inverse] if count else 0
+        self._size = end
+
+    def set_row(self, position: int, product: Dict[str, Any]) -> None:
+        price = product.get('price')
+        # Products without a price (or priced at 0) never pass a price filter
+        self.prices[position] = float(price) if price else np.nan
+        self.category_ids[position] = self._code(self.category_codes, product.get('category'))
+        self.subcategory_ids[position] = self._code(self.subcategory_codes, product.get('subcategory'))
+
+        self.color_masks[position] = 0
+        for key in self._color_keys(product.get('colors')):
+            bit = self._color_bit(key)
+            word, offset = divmod(bit, 64)
+            self.color_masks[position, word] |= np.uint64(1 << offset)
+
+    def filter_mask(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Boolean mask of the rows passing every filter, or None when no filter is set"""
+        mask = None
+
+        def combine(current, condition):
+            return condition if current is None else current & condition
+
+        if filters.get('price_min') is not None:
+            with np.errstate(invalid='ignore'):
+                mask = combine(mask, self.prices[:self._size] >= filters['price_min'])
+
+        if filters.get('price_max') is not None:
+            with np.errstate(invalid='ignore'):
+                mask = combine(mask, self.prices[:self._size] <= filters['price_max'])
+
+        if filters.get('category'):
+            codes = self._matching_codes(self.category_codes, filters['category'])
+            mask = combine(mask, np.isin(self.category_ids[:self._size], codes))
+
+        if filters.get('subcategory'):
+            codes = self._matching_codes(self.subcategory_codes, filters['subcategory'])
+            mask = combine(mask, np.isin(self.subcategory_ids[:self._size], codes))
+
+        if filters.get('color'):
+            query_mask = self._matching_color_mask(filters['color'])
+            mask = combine(mask, (self.color_masks[:self._size] & query_mask).any(axis=1))
+
+        return mask
+
+    def _grow(self, capacity: int) -> None:
+        capacity = max(capacity, 1)
+        self.prices = self._resized(self.prices, capacity, np.nan)
+        self.category_ids = self._resized(self.category_ids, capacity, -1)
+        self.subcategory_ids = self._resized(self.subcategory_ids, capacity, -1)
+        self.color_masks = self._resized(self.color_masks, capacity, 0)
+        self._capacity = capacity
+
+    def _resized(self, array: np.ndarray, capacity: int, fill) -> np.ndarray:
+        resized = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+        resized[:self._size] = array[:self._size]
+        return resized
+
+    def _code(self, codes: Dict[str, int], value: Optional[str]) -> int:
+        if not value:
+            return -1
+        key = value.lower()
+        if key not in codes:
+            codes[key] = len(codes)
+        return codes[key]
+
+    def _color_keys(self, colors: Optional[List[str]]) -> List[str]:
+        """Canonical '#<id>' keys for known colors, the folded name for anything else"""
+        keys = []
+        for color in colors or []:
+            color_ids = canonical_color_ids(color)
+            if color_ids:
+                keys.extend(f"#{color_id}" for color_id in color_ids)
+            else:
+                keys.append(normalize_text(color))
+        return keys
+
+    def _color_bit(self, color: str) -> int:
+        if color not in self.color_bits:
+            self.color_bits[color] = len(self.color_bits)
+            words = self.color_masks.shape[1]
+            if len(self.color_bits) > words * 64:
+                extra = np.zeros((self._capacity, 1), dtype=np.uint64)
+                self.color_masks = np.hstack([self.color_masks, extra])
+        return self.color_bits[color]
+
+    def _matching_codes(self, codes: Dict[str, int], value: str) -> List[int]:
+        value_lower = value.lower()
+        return [code for name, code in codes.items() if fuzz.ratio(value_lower, name) >= 70]
+
+    def _matching_color_mask(self, color: str) -> np.ndarray:
+        query_mask = np.zeros(self.color_masks.shape[1], dtype=np.uint64)
+        color_ids = canonical_color_ids(color)
+        if color_ids:
+            bits = [self.color_bits[f"#{color_id}"] for color_id in color_ids if f"#{color_id}" in self.color_bits]
+        else:
+            # Colors outside the Signa map (e.g. 'dourado') still match by name
+            color_name = normalize_text(color)
+            bits = [bit for name, bit in self.color_bits.items()
+                    if not name.startswith('#') and fuzz.ratio(color_name, name) > 70]
+        for bit in bits:
+            word, offset = divmod(bit, 64)
+            query_mask[word] |= np.uint64(1 << offset)
+        return query_mask
@@ -0,0 +1,103 @@
+from typing import Any, Dict, Optional, Tuple
+
+# Product words customers use -> Signa idCategoria / idSubCategoria and the
+# listing name to show; keys are tried in order, as substrings of the product
+PRODUCT_MAPPINGS = {
+    # Casa & Lar (30)
+    'caneca': {'cat': 30, 'subcat': 164, 'name': 'canecas'},
+    'canecas': {'cat': 30, 'subcat': 164, 'name': 'canecas'},
+    'copo': {'cat': 30, 'subcat': 165, 'name': 'copos'},
+    'copos': {'cat': 30, 'subcat': 165, 'name': 'copos'},
+    'garrafa': {'cat': 30, 'subcat': 166, 'name': 'garrafas'},
+    'garrafas': {'cat': 30, 'subcat': 166, 'name': 'garrafas'},
+    'termo': {'cat': 30, 'subcat': 167, 'name': 'termos'},
+    'termos': {'cat': 30, 'subcat': 167, 'name': 'termos'},
+
+    # Escrita & Escritório (35)
+    'caneta': {'cat': 35, 'subcat': 170, 'name': 'canetas'},
+    'canetas': {'cat': 35, 'subcat': 170, 'name': 'canetas'},
+    'lápis': {'cat': 35, 'subcat': 171, 'name': 'lápis'},
+    'marcador': {'cat': 35, 'subcat': 172, 'name': 'marcadores'},
+    'marcadores': {'cat': 35, 'subcat': 172, 'name': 'marcadores'},
+    'caderno': {'cat': 35, 'subcat': 173, 'name': 'cadernos'},
+    'cadernos': {'cat': 35, 'subcat': 173, 'name': 'cadernos'},
+    'bloco': {'cat': 35, 'subcat': 174, 'name': 'blocos de notas'},
+    'blocos': {'cat': 35, 'subcat': 174, 'name': 'blocos de notas'},
+
+    # Sacos & Mochilas (37)
+    'mochila': {'cat': 37, 'subcat': 159, 'name': 'mochilas'},
+    'mochilas': {'cat': 37, 'subcat': 159, 'name': 'mochilas'},
+    'bolsa': {'cat': 37, 'subcat': 141, 'name': 'bolsas'},
+    'bolsas': {'cat': 37, 'subcat': 141, 'name': 'bolsas'},
+    'saco': {'cat': 37, 'subcat': 180, 'name': 'sacos'},
+    'sacos': {'cat': 37, 'subcat': 180, 'name': 'sacos'},
+
+    # Tecnologia (41)
+    'powerbank': {'cat': 41, 'subcat': 190, 'name': 'powerbanks'},
+    'powerbanks': {'cat': 41, 'subcat': 190, 'name': 'powerbanks'},
+    'power bank': {'cat': 41, 'subcat': 190, 'name': 'powerbanks'},
+    'pen drive': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
+    'pen drives': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
+    'pendrive': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
+    'pendrives': {'cat': 41, 'subcat': 191, 'name': 'pen drives'},
+    'auricular': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
+    'auriculares': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
+    'fone': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
+    'fones': {'cat': 41, 'subcat': 192, 'name': 'auriculares'},
+    'coluna': {'cat': 41, 'subcat': 193, 'name': 'colunas'},
+    'colunas': {'cat': 41, 'subcat': 193, 'name': 'colunas'},
+
+    # Vestuário (31)
+    't-shirt': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
+    't-shirts': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
+    'tshirt': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
+    'tshirts': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
+    'camiseta': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
+    'camisetas': {'cat': 31, 'subcat': 200, 'name': 't-shirts'},
+    'camisa': {'cat': 31, 'subcat': 202, 'name': 'camisas'},
+    'camisas': {'cat': 31, 'subcat': 202, 'name': 'camisas'},
+    'polo': {'cat': 31, 'subcat': 201, 'name': 'polos'},
+    'polos': {'cat': 31, 'subcat': 201, 'name': 'polos'},
+    'sweatshirt': {'cat': 31, 'subcat': 203, 'name': 'sweatshirts'},
+    'sweatshirts': {'cat': 31, 'subcat': 203, 'name': 'sweatshirts'},
+    'casaco': {'cat': 31, 'subcat': 204, 'name': 'casacos'},
+    'casacos': {'cat': 31, 'subcat': 204, 'name': 'casacos'},
+    'boné': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
+    'bonés': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
+    'bone': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
+    'bones': {'cat': 31, 'subcat': 205, 'name': 'bonés'},
+    'chapéu': {'cat': 31, 'subcat': 206, 'name': 'chapéus'},
+    'chapéus': {'cat': 31, 'subcat': 206, 'name': 'chapéus'},
+    'chapeu': {'cat': 31, 'subcat': 206, 'name': 'chapéus'},
+
+    # Identificadores (33)
+    'porta-chaves': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
+    'porta chaves': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
+    'porta chave': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
+    'chaveiro': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
+    'chaveiros': {'cat': 33, 'subcat': 175, 'name': 'porta-chaves'},
+    'lanyard': {'cat': 33, 'subcat': 176, 'name': 'lanyards'},
+    'lanyards': {'cat': 33, 'subcat': 176, 'name': 'lanyards'},
+    'pin': {'cat': 33, 'subcat': 177, 'name': 'pins'},
+    'pins': {'cat': 33, 'subcat': 177, 'name': 'pins'},
+
+    # Other categories
+    'doce': {'cat': 34, 'name': 'doces'},
+    'doces': {'cat': 34, 'name': 'doces'},
+    'chocolate': {'cat': 34, 'name': 'chocolates'},
+    'chocolates': {'cat': 34, 'name': 'chocolates'},
+    'beleza': {'cat': 44, 'name': 'produtos de beleza'},
+    'saúde': {'cat': 44, 'name': 'produtos de saúde'},
+    'bricolage': {'cat': 32, 'name': 'produtos de bricolage'},
+    'ferramenta': {'cat': 32, 'name': 'ferramentas'},
+    'ferramentas': {'cat': 32, 'name': 'ferramentas'}
+}
+
+
+def match_product(product: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """First (keyword, mapping) whose keyword occurs in `product`, or None"""
+    product = product.lower()
+    for keyword, mapping in PRODUCT_MAPPINGS.items():
+        if keyword in product:
+            return keyword, mapping
+    return None
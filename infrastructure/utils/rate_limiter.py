@@ -0,0 +1,172 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+
+class RequestOutcome:
+    """Handed to the caller of `AdaptiveRateLimiter.request` to report a failed response"""
+
+    def __init__(self):
+        self.failed = False
+        self.retry_after: Optional[float] = None
+
+    def fail(self, retry_after: Optional[float] = None) -> None:
+        self.failed = True
+        self.retry_after = retry_after
+
+
+class HostLimiter:
+    """Token bucket plus AIMD concurrency window for a single host.
+
+    Like TCP, a host starts in slow start, where every healthy response grows
+    the rate and the concurrency window by one, doubling them each round. After
+    the first congestion signal growth turns additive: roughly one request/s
+    per second and one slot per round trip. A 429, a 5xx or a timeout halves
+    both and pauses the host for a short cooldown, so the crawler settles just
+    under the fastest pace the site tolerates.
+    """
+
+    def __init__(self, rate: float, max_rate: float, max_concurrency: int,
+                 min_rate: float = 0.5, burst: float = 1.0):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(min(2, self.max_concurrency))
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.baseline_latency: Optional[float] = None
+
+        self._tokens = burst
+        self._refilled = time.monotonic()
+        self._cooldown_until = 0.0
+        self._last_decrease = 0.0
+        self._failure_streak = 0
+        self._slow_start = True
+        self._slots = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        # Wait for the token first: a caller cancelled while it waits then holds
+        # no slot, and nothing is awaited between taking the slot and returning
+        delay = self._reserve_token()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float], failed: bool = False,
+                      retry_after: Optional[float] = None) -> None:
+        """Free a slot and learn from the response; `latency` None means there was none"""
+        if latency is None:
+            pass
+        elif failed:
+            self._on_failure(retry_after)
+        else:
+            self._on_success(latency)
+        self.in_flight -= 1
+        # Shielded, so a release run while its task is being cancelled still wakes the waiters
+        await asyncio.shield(self._notify())
+
+    async def _notify(self) -> None:
+        async with self._slots:
+            self._slots.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rate': round(self.rate, 2),
+            'concurrency': int(self.limit),
+            'in_flight': self.in_flight,
+            'successes': self.successes,
+            'failures': self.failures,
+            'baseline_latency': self.baseline_latency
+        }
+
+    def _reserve_token(self) -> float:
+        """Take a token, returning how long the caller must wait for it to exist"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        self._tokens -= 1
+        delay = max(0.0, self._cooldown_until - now)
+        if self._tokens < 0:
+            delay = max(delay, -self._tokens / self.rate)
+        return delay
+
+    def _on_success(self, latency: float) -> None:
+        self.successes += 1
+        self._failure_streak = 0
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+        else:
+            # Drift up slowly, so a server that got slower for good becomes the new normal
+            self.baseline_latency += (latency - self.baseline_latency) * 0.01
+
+        # Responses much slower than usual mean the host is queueing: hold steady
+        if latency <= 2 * self.baseline_latency:
+            rate_step, limit_step = (1.0, 1.0) if self._slow_start else (1.0 / self.rate, 1.0 / self.limit)
+            self.rate = min(self.max_rate, self.rate + rate_step)
+            self.limit = min(self.max_concurrency, self.limit + limit_step)
+
+    def _on_failure(self, retry_after: Optional[float]) -> None:
+        self.failures += 1
+        self._failure_streak += 1
+        self._slow_start = False
+        now = time.monotonic()
+
+        # Requests already in flight fail together; count that as one congestion event
+        if now - self._last_decrease > (self.baseline_latency or 1.0):
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.limit = max(1.0, self.limit / 2)
+            self._last_decrease = now
+
+        backoff = retry_after if retry_after is not None else min(30.0, 0.5 * 2 ** (self._failure_streak - 1))
+        self._cooldown_until = max(self._cooldown_until, now + backoff)
+
+
+class AdaptiveRateLimiter:
+    """Per-host `HostLimiter`s, created on first use"""
+
+    def __init__(self, rate: float, max_rate: float, max_concurrency: int):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self._hosts: Dict[str, HostLimiter] = {}
+
+    @asynccontextmanager
+    async def request(self, url: str) -> AsyncIterator[RequestOutcome]:
+        """Wait for a slot on the url's host and time the request made inside the block.
+
+        Exceptions raised inside the block (timeouts, connection errors) count
+        as failures; HTTP-level failures are reported with `outcome.fail()`.
+        A request cancelled inside the block frees its slot and leaves the
+        rate alone: it says nothing about the host.
+        """
+        host = self._host(url)
+        await host.acquire()
+        outcome = RequestOutcome()
+        started = time.monotonic()
+        latency = None
+        try:
+            yield outcome
+            latency = time.monotonic() - started
+        except Exception:
+            latency = time.monotonic() - started
+            outcome.fail()
+            raise
+        finally:
+            await host.release(latency, outcome.failed, outcome.retry_after)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: host.stats() for name, host in self._hosts.items()}
+
+    def _host(self, url: str) -> HostLimiter:
+        name = urlparse(url).netloc
+        host = self._hosts.get(name)
+        if host is None:
+            host = self._hosts[name] = HostLimiter(self.rate, self.max_rate, self.max_concurrency)
+        return host
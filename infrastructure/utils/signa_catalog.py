@@ -0,0 +1,218 @@
+from typing import Any, Dict, List, Optional
+from infrastructure.utils.colors import canonical_color_ids
+
+# The signa.pt catalog layout: what the crawler walks and what the chatbot links to
+BASE_URL = "https://www.signa.pt"
+
+CATEGORIES_STRUCTURE = {
+    44: {"name": "Beleza & Saúde", "subcategories": [
+        {"id": 359, "name": "Bálsamos Labial"},
+        {"id": 262, "name": "Caixas de Comprimidos"},
+        {"id": 258, "name": "Cuidado Pessoal"},
+        {"id": 360, "name": "Escovas & Escovas de Dentes"},
+        {"id": 263, "name": "Espelhos"},
+        {"id": 265, "name": "Massajadores"}
+    ]},
+    32: {"name": "Bricolage & Auto", "subcategories": [
+        {"id": 201, "name": "Acessórios de Viatura"},
+        {"id": 194, "name": "Canivetes & Navalhas"},
+        {"id": 193, "name": "Ferramentas"},
+        {"id": 195, "name": "Fitas Métricas"},
+        {"id": 199, "name": "Jardinagem"},
+        {"id": 196, "name": "Lanternas & Luzes"},
+        {"id": 202, "name": "Lupas Conta-fios & Escalímetros"},
+        {"id": 323, "name": "Para-Sol para Automóveis"},
+        {"id": 198, "name": "Pilhas & Carregadores"},
+        {"id": 197, "name": "X-actos"}
+    ]},
+    30: {"name": "Casa & Lar", "subcategories": [
+        {"id": 175, "name": "Abre-cápsulas & Saca-rolhas"},
+        {"id": 173, "name": "Acessórios p/ Bebidas"},
+        {"id": 164, "name": "Canecas Personalizadas"},
+        {"id": 171, "name": "Chávenas de Chá & Café"},
+        {"id": 172, "name": "Copos & Pratos"},
+        {"id": 312, "name": "Decorações & Enfeites"},
+        {"id": 168, "name": "Kits Emergência & Sobrevivência"},
+        {"id": 301, "name": "Lancheiras & Frascos"},
+        {"id": 178, "name": "Luvas & Pegas"},
+        {"id": 176, "name": "Mantas"},
+        {"id": 300, "name": "Mealheiros"},
+        {"id": 356, "name": "Tábuas de Servir"},
+        {"id": 307, "name": "Toalhas & Panos"},
+        {"id": 170, "name": "Utilidades"},
+        {"id": 166, "name": "Velas & Ambientadores"}
+    ]},
+    34: {"name": "Doces", "subcategories": [
+        {"id": 215, "name": "Caixinhas & Potes"},
+        {"id": 212, "name": "Chocolates Personalizados"},
+        {"id": 217, "name": "Chupa-chupas"},
+        {"id": 214, "name": "Gomas"},
+        {"id": 213, "name": "Rebuçados & Caramelos"}
+    ]},
+    35: {"name": "Escrita & Escritório", "subcategories": [
+        {"id": 222, "name": "Agendas Personalizadas"},
+        {"id": 221, "name": "Blocos de Notas"},
+        {"id": 313, "name": "Borrachas & Afias"},
+        {"id": 289, "name": "Calculadoras"},
+        {"id": 223, "name": "Calendários & Relógios"},
+        {"id": 304, "name": "Clips & Molas"},
+        {"id": 236, "name": "Conjuntos de Escrita"},
+        {"id": 219, "name": "Esferográficas"},
+        {"id": 232, "name": "Estojos & Porta-Lápis"},
+        {"id": 220, "name": "Lápis & Lapiseiras"},
+        {"id": 225, "name": "Luzes, Lâmpadas & Lasers"},
+        {"id": 306, "name": "Marcadores"},
+        {"id": 233, "name": "Material de Secretária"},
+        {"id": 224, "name": "Notas Adesivas & Lembretes"},
+        {"id": 229, "name": "Pastas & Porta-documentos"},
+        {"id": 243, "name": "Pastas e Mochilas para Portáteis"},
+        {"id": 325, "name": "Réguas"},
+        {"id": 227, "name": "Tapetes de Rato"}
+    ]},
+    33: {"name": "Identificadores", "subcategories": [
+        {"id": 209, "name": "Crachás"},
+        {"id": 207, "name": "Fitas Lanyard"},
+        {"id": 302, "name": "Ímans"},
+        {"id": 208, "name": "Pins Personalizados"},
+        {"id": 206, "name": "Pulseiras Personalizadas"}
+    ]},
+    39: {"name": "Lazer", "subcategories": [
+        {"id": 309, "name": "Animais"},
+        {"id": 299, "name": "Ar Livre"},
+        {"id": 342, "name": "Bolas"},
+        {"id": 361, "name": "Desporto"},
+        {"id": 177, "name": "Garrafas Personalizadas"},
+        {"id": 275, "name": "Insufláveis"},
+        {"id": 269, "name": "Jogos & Puzzles"},
+        {"id": 297, "name": "Leques"},
+        {"id": 358, "name": "Mundo da Criança"},
+        {"id": 328, "name": "Peluches"},
+        {"id": 272, "name": "Verão & Praia"},
+        {"id": 357, "name": "Viagens"}
+    ]},
+    38: {"name": "Pessoais", "subcategories": [
+        {"id": 260, "name": "Anti-stress"},
+        {"id": 261, "name": "Carteiras & Porta-Cartões"},
+        {"id": 256, "name": "Isqueiros"},
+        {"id": 324, "name": "Medalhas & Troféus"},
+        {"id": 242, "name": "Necessaires"},
+        {"id": 257, "name": "Óculos"},
+        {"id": 255, "name": "Porta-Chaves Personalizados"},
+        {"id": 259, "name": "Relógios"}
+    ]},
+    37: {"name": "Sacos & Mochilas", "subcategories": [
+        {"id": 238, "name": "Bolsas"},
+        {"id": 253, "name": "Caixas"},
+        {"id": 254, "name": "Carrinhos de Compras"},
+        {"id": 237, "name": "Malas & Trolleys"},
+        {"id": 241, "name": "Mochilas"},
+        {"id": 349, "name": "Sacos de Algodão"},
+        {"id": 251, "name": "Sacos de Compras"},
+        {"id": 250, "name": "Sacos de Pano"},
+        {"id": 248, "name": "Sacos de Papel"},
+        {"id": 244, "name": "Sacos Desporto"},
+        {"id": 239, "name": "Sacos Dobráveis"},
+        {"id": 298, "name": "Sacos e Lancheiras Térmicas"},
+        {"id": 315, "name": "Sacos em Non Woven"},
+        {"id": 362, "name": "Sacos para Garrafas"},
+        {"id": 350, "name": "Sacos Tipo Mochila"}
+    ]},
+    40: {"name": "Suportes Publicitários", "subcategories": [
+        {"id": 284, "name": "Acrílicos Porta-Folhas"},
+        {"id": 278, "name": "Balcões"},
+        {"id": 277, "name": "Bandeiras de Publicidade"},
+        {"id": 281, "name": "Banners"},
+        {"id": 347, "name": "Cartões de Visita, Flyers & Outros"},
+        {"id": 285, "name": "Cavaletes & Expositores de Exterior"},
+        {"id": 288, "name": "Gestores de Fila"},
+        {"id": 282, "name": "Muros Pop-Up e Tecido"},
+        {"id": 348, "name": "Packs Promocionais"},
+        {"id": 286, "name": "Porta-catálogos"},
+        {"id": 283, "name": "Roll-Ups"},
+        {"id": 346, "name": "Snap Frames"},
+        {"id": 279, "name": "Tendas"}
+    ]},
+    41: {"name": "Tecnologia", "subcategories": [
+        {"id": 234, "name": "Acessórios p/ Telemóveis & Tabletes"},
+        {"id": 296, "name": "Adaptadores"},
+        {"id": 351, "name": "Carregadores & Powerbanks"},
+        {"id": 294, "name": "Cartões de Memórias"},
+        {"id": 345, "name": "Colunas & Auriculares"},
+        {"id": 226, "name": "Extensões & Acessórios USB"},
+        {"id": 310, "name": "Máquinas Fotográficas"},
+        {"id": 293, "name": "Pens USB Personalizadas"},
+        {"id": 316, "name": "Ratos"},
+        {"id": 290, "name": "Web Cam"}
+    ]},
+    31: {"name": "Vestuário", "subcategories": [
+        {"id": 191, "name": "Acessórios"},
+        {"id": 188, "name": "Aventais"},
+        {"id": 179, "name": "Bonés, Chapéus & Panamás"},
+        {"id": 318, "name": "Calçado"},
+        {"id": 185, "name": "Calças e Calções"},
+        {"id": 334, "name": "Camisas"},
+        {"id": 184, "name": "Camisolas & Sweatshirts"},
+        {"id": 190, "name": "Capas & Ponchos"},
+        {"id": 187, "name": "Casacos & Blusões"},
+        {"id": 192, "name": "Chinelos Personalizados"},
+        {"id": 183, "name": "Coletes"},
+        {"id": 333, "name": "Fatos Treino"},
+        {"id": 343, "name": "Gorros e Luvas"},
+        {"id": 180, "name": "Gravatas, Lenços & Cachecóis"},
+        {"id": 189, "name": "Guarda-chuvas"},
+        {"id": 332, "name": "Polares"},
+        {"id": 182, "name": "Polos Personalizados"},
+        {"id": 247, "name": "Porta-fatos e gravatas"},
+        {"id": 181, "name": "T-Shirts Personalizadas"},
+        {"id": 321, "name": "Vestuário de Alta Visibilidade"},
+        {"id": 186, "name": "Vestuário de Trabalho"}
+    ]}
+}
+
+
+def categories() -> List[Dict[str, Any]]:
+    """Each category with its listing url and subcategories"""
+    return [
+        {
+            "id": cat_id,
+            "name": cat_info["name"],
+            "url": f"/brindes/categoria.asp?idCategoria={cat_id}",
+            "subcategories": cat_info["subcategories"]
+        }
+        for cat_id, cat_info in CATEGORIES_STRUCTURE.items()
+    ]
+
+
+def build_filter_url(category_id: int, subcategory_id: Optional[int] = None,
+                     color: Optional[str] = None, price_min: Optional[float] = None,
+                     price_max: Optional[float] = None, search_query: Optional[str] = None,
+                     base_url: str = BASE_URL) -> str:
+    """Build a proper filter URL for Signa website"""
+    params = {
+        'q': search_query or '',
+        't': '',
+        'idCategoria': str(category_id),
+        'idSubCategoria': str(subcategory_id) if subcategory_id else '',
+        'idOcasiao': '',
+        'idSector': '',
+        'idCorPrincipal': '',
+        'precoDe': str(price_min) if price_min else '',
+        'precoAte': str(price_max) if price_max else '',
+        'idMaterial': '',
+        'idDimensao': '',
+        'idGramagem': '',
+        'idCapacidade': '',
+        'idCapacidadePB': '',
+        'corDaEscrita': '',
+        'order': '',
+        'prodPorPagina': '25'
+    }
+
+    # Map color name to ID
+    if color:
+        color_ids = canonical_color_ids(color)
+        if color_ids:
+            params['idCorPrincipal'] = color_ids[0]
+
+    query_string = '&'.join(f"{k}={v}" for k, v in params.items())
+    return f"{base_url}/brindes/categoria.asp?{query_string}"
@@ -0,0 +1,168 @@
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from Levenshtein import distance as levenshtein_distance
+from infrastructure.utils.portuguese_words import COMMON_WORDS
+from infrastructure.utils.text_utils import fold_accents
+
+_WORD_RE = re.compile(r'[^\W\d_]+(?:-[^\W\d_]+)*')
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance, except that swapping two adjacent letters costs one edit"""
+    dist = levenshtein_distance(a, b)
+    if dist == 2 and len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]:
+            return 1
+    return dist
+
+
+class SpellCorrector:
+    """Symmetric-delete (SymSpell) spelling corrector over the catalog vocabulary.
+
+    Every dictionary word is indexed under all the strings obtained by
+    deleting up to `max_distance` characters from its first `prefix_length`
+    characters. A query word generates its own deletes the same way, and any
+    word sharing one is a candidate within that edit distance, confirmed with
+    Levenshtein (an adjacent transposition counts as one edit). There is no
+    candidate generation over the alphabet, so a lookup is a few dozen dict
+    probes. Words are compared accent-folded and lowercase, and corrected to
+    the spelling they most often have in the catalog ("bonnes" -> "bonés").
+
+    Only unknown words are touched: dictionary words and `known_words`
+    (common Portuguese by default) are left as written, since the catalog
+    vocabulary alone would turn ordinary words into product words one edit
+    away. Two adjacent unknown words are also tried joined, which fixes split
+    compounds ("porwer bank" -> "powerbank").
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7,
+                 known_words: Iterable[str] = COMMON_WORDS):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.known = {fold_accents(word).lower() for word in known_words}
+        self.counts: Counter = Counter()
+        self._spellings: Dict[str, Counter] = {}
+        self._deletes: Dict[str, List[str]] = {}
+        self.corrections = 0
+        self.queries = 0
+        self.total_time = 0.0
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], **kwargs: Any) -> 'SpellCorrector':
+        corrector = cls(**kwargs)
+        for text in texts:
+            for word in _WORD_RE.findall(text or ''):
+                corrector.add_word(word)
+        return corrector
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add_word(self, word: str, count: int = 1) -> None:
+        key = fold_accents(word).lower()
+        if len(key) < 2:
+            return
+        spellings = self._spellings.setdefault(key, Counter())
+        spellings[word.lower()] += count
+        if key in self.counts:
+            self.counts[key] += count
+            return
+        self.counts[key] = count
+        for variant in self._edits(key[:self.prefix_length]):
+            self._deletes.setdefault(variant, []).append(key)
+
+    def is_known(self, word: str) -> bool:
+        key = fold_accents(word).lower()
+        return key in self.counts or key in self.known
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """(dictionary word, edit distance) closest to `word`, or None if nothing is close enough"""
+        key = fold_accents(word).lower()
+        if key in self.counts or key in self.known:
+            return key, 0
+        limit = self._allowed_distance(key)
+        if not limit:
+            return None
+        best: Optional[Tuple[int, int, int, str]] = None
+        seen = set()
+        for variant in self._edits(key[:self.prefix_length], limit):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if abs(len(candidate) - len(key)) > limit:
+                    continue
+                dist = _edit_distance(key, candidate)
+                if dist <= limit:
+                    # On equal distance prefer substitutions (c/s, ss/s) to dropped letters
+                    rank = (dist, abs(len(candidate) - len(key)), -self.counts[candidate], candidate)
+                    if best is None or rank < best:
+                        best = rank
+        return (best[3], best[0]) if best else None
+
+    def correct(self, text: str) -> str:
+        """`text` with unknown words replaced by their closest dictionary words"""
+        started = time.perf_counter()
+        self.queries += 1
+        matches = list(_WORD_RE.finditer(text))
+        replacements: List[Tuple[int, int, str]] = []
+        i = 0
+        while i < len(matches):
+            word = matches[i].group()
+            if self.is_known(word):
+                i += 1
+                continue
+            single = self.lookup(word)
+            # Two unknown words in a row may be a compound split in two
+            following = matches[i + 1].group() if i + 1 < len(matches) else None
+            if following is not None and not self.is_known(following):
+                joined = self.lookup(word + following)
+                second = self.lookup(following)
+                split_cost = ((single[1] if single else self.max_distance + 1)
+                              + (second[1] if second else self.max_distance + 1))
+                if joined is not None and joined[1] <= split_cost:
+                    replacements.append((matches[i].start(), matches[i + 1].end(), self.spelling(joined[0])))
+                    i += 2
+                    continue
+            if single is not None:
+                replacements.append((matches[i].start(), matches[i].end(), self.spelling(single[0])))
+            i += 1
+
+        for start, end, replacement in reversed(replacements):
+            text = text[:start] + replacement + text[end:]
+        self.corrections += bool(replacements)
+        self.total_time += time.perf_counter() - started
+        return text
+
+    def spelling(self, key: str) -> str:
+        """How the catalog most often writes the dictionary word `key`; accented on ties"""
+        return max(self._spellings[key].items(), key=lambda item: (item[1], item[0] != key))[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'words': len(self.counts),
+            'queries': self.queries,
+            'corrected': self.corrections,
+            'avg_us': round(self.total_time / self.queries * 1e6, 1) if self.queries else None
+        }
+
+    def _allowed_distance(self, key: str) -> int:
+        # Short words are mostly stop words; one edit already turns them into others
+        if len(key) < 4:
+            return 0
+        if len(key) < 7:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def _edits(self, word: str, distance: Optional[int] = None) -> set:
+        """`word` and every string with up to `distance` characters deleted from it"""
+        distance = self.max_distance if distance is None else distance
+        edits = {word}
+        frontier = {word}
+        for _ in range(distance):
+            frontier = {item[:i] + item[i + 1:] for item in frontier if len(item) > 1 for i in range(len(item))}
+            edits |= frontier
+        return edits
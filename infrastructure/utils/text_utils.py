@@ -0,0 +1,31 @@
+import re
+import unicodedata
+from typing import List
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fold_accents(text: str) -> str:
+    """Remove diacritics so 'Bonés' and 'bones' compare equal"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace"""
+    if not text:
+        return ""
+    return _WHITESPACE_RE.sub(' ', fold_accents(text).lower()).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    """Character trigrams of the normalized text, without duplicates"""
+    normalized = normalize_text(text)
+    seen = set()
+    grams = []
+    for i in range(len(normalized) - 2):
+        gram = normalized[i:i + 3]
+        if gram not in seen:
+            seen.add(gram)
+            grams.append(gram)
+    return grams
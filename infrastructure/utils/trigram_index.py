@@ -0,0 +1,105 @@
+import math
+from array import array
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from infrastructure.utils.text_utils import trigrams
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to document positions.
+
+    Postings live in compact uint32 arrays. An index can start from a frozen
+    CSR base (e.g. memory-mapped from a catalog snapshot); documents added
+    afterwards go to per-trigram arrays and removed base documents are masked.
+    """
+
+    def __init__(self, min_overlap: float = 0.0):
+        self.min_overlap = min_overlap
+        self._postings: Dict[str, array] = {}
+        self._base_grams: Dict[str, int] = {}
+        self._base_offsets = np.zeros(1, dtype=np.uint32)
+        self._base_docs = np.zeros(0, dtype=np.uint32)
+        self._base_count = 0
+        self._base_removed = set()
+
+    @classmethod
+    def from_postings(cls, grams: List[str], offsets: np.ndarray, docs: np.ndarray,
+                      doc_count: int, min_overlap: float = 0.0) -> 'TrigramIndex':
+        index = cls(min_overlap)
+        index._base_grams = {gram: i for i, gram in enumerate(grams)}
+        index._base_offsets = offsets
+        index._base_docs = docs
+        index._base_count = doc_count
+        return index
+
+    def add(self, doc_id: int, *texts: str) -> None:
+        for gram in self._grams(texts):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('I')
+            postings.append(doc_id)
+
+    def remove(self, doc_id: int, *texts: str) -> None:
+        """Remove a document; `texts` must be the ones it was added with"""
+        if doc_id < self._base_count:
+            self._base_removed.add(doc_id)
+        for gram in self._grams(texts):
+            postings = self._postings.get(gram)
+            if postings is not None and doc_id in postings:
+                postings.remove(doc_id)
+
+    def clear(self) -> None:
+        self.__init__(self.min_overlap)
+
+    def candidates(self, query: str) -> Optional[List[int]]:
+        """Positions sharing enough trigrams with the query, in ascending order.
+
+        Returns None when the query is too short to have trigrams, meaning the
+        caller has to fall back to scanning every document.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return None
+
+        parts = [self._postings_for(gram) for gram in query_grams]
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return []
+
+        doc_ids, counts = np.unique(np.concatenate(parts), return_counts=True)
+        required = max(1, math.ceil(len(query_grams) * self.min_overlap))
+        return doc_ids[counts >= required].tolist()
+
+    def to_postings(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """CSR form of the whole index: sorted grams, offsets and doc ids"""
+        grams = sorted(set(self._base_grams) | set(self._postings))
+        offsets = np.zeros(len(grams) + 1, dtype=np.uint32)
+        parts = []
+        for i, gram in enumerate(grams):
+            part = self._postings_for(gram)
+            parts.append(part)
+            offsets[i + 1] = offsets[i] + len(part)
+        docs = np.concatenate(parts).astype(np.uint32) if parts else np.zeros(0, dtype=np.uint32)
+        return grams, offsets, docs
+
+    def _postings_for(self, gram: str) -> np.ndarray:
+        parts = []
+        base_position = self._base_grams.get(gram)
+        if base_position is not None:
+            base = self._base_docs[self._base_offsets[base_position]:self._base_offsets[base_position + 1]]
+            if self._base_removed:
+                base = base[~np.isin(base, list(self._base_removed))]
+            parts.append(base)
+        postings = self._postings.get(gram)
+        if postings:
+            parts.append(np.array(postings, dtype=np.uint32))
+        if not parts:
+            return np.zeros(0, dtype=np.uint32)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _grams(self, texts) -> set:
+        grams = set()
+        for text in texts:
+            if text:
+                grams.update(trigrams(text))
+        return grams
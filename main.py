@@ -35,21 +35,38 @@ class SignaChatbotCLI:
         else:
             print(f"{Fore.GREEN}Base de conhecimento carregada: {data['total_products']} produtos, {data['total_categories']} categorias{Style.RESET_ALL}")
     
-    async def crawl_site(self):
+    async def crawl_site(self, incremental: bool = False):
         print(f"{Fore.YELLOW}Crawling do site Signa em progresso...{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Isto pode demorar alguns minutos...{Style.RESET_ALL}")
         
         try:
-            stats = await self.crawler_service.crawl_and_index()
+            stats = await self.crawler_service.crawl_and_index(incremental=incremental)
             print(f"{Fore.GREEN}Crawling concluído!{Style.RESET_ALL}")
+            if stats.get('pages_resumed'):
+                print(f"{Fore.GREEN}Retomado do último checkpoint: {stats['pages_resumed']} páginas já guardadas{Style.RESET_ALL}")
             print(f"{Fore.GREEN}Categorias: {stats['categories_crawled']}{Style.RESET_ALL}")
             print(f"{Fore.GREEN}Produtos: {stats['products_crawled']}{Style.RESET_ALL}")
+            print(f"{Fore.GREEN}Novos: {stats['products_added']}, atualizados: {stats['products_updated']}, "
+                  f"removidos: {stats['products_removed']}, páginas sem alterações: {stats['pages_unchanged']}{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}Erro durante o crawling: {e}{Style.RESET_ALL}")
             if config.debug_mode:
                 import traceback
                 traceback.print_exc()
     
+    async def enrich_products(self):
+        print(f"{Fore.YELLOW}A obter detalhes dos produtos (cores, descrição, preços por quantidade)...{Style.RESET_ALL}")
+        
+        try:
+            stats = await self.crawler_service.enrich_products()
+            print(f"{Fore.GREEN}Detalhes obtidos: {stats['products_enriched']} de {stats['products_pending']} produtos, "
+                  f"falhados: {stats['products_failed']}{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}Erro ao obter detalhes: {e}{Style.RESET_ALL}")
+            if config.debug_mode:
+                import traceback
+                traceback.print_exc()
+    
     async def run(self):
         await self.initialize()
         
@@ -73,13 +90,19 @@ class SignaChatbotCLI:
                 elif user_input.lower() == 'crawl':
                     await self.crawl_site()
                     
+                elif user_input.lower() == 'atualizar':
+                    await self.crawl_site(incremental=True)
+                    
+                elif user_input.lower() == 'enriquecer':
+                    await self.enrich_products()
+                    
                 elif user_input.lower() == 'limpar':
                     self.chatbot_service.clear_history()
                     print(f"{Fore.YELLOW}Histórico de conversa limpo.{Style.RESET_ALL}")
                     
                 else:
                     response = await self.chatbot_service.chat(user_input)
-                    print(f"\n{Fore.BLUE}Assistente: {Style.RESET_ALL}{response}\n")
+                    print(f"\n{Fore.BLUE}Assistente: {Style.RESET_ALL}{response.text}\n")
                     
             except KeyboardInterrupt:
                 print(f"\n{Fore.YELLOW}Interrompido pelo usuário. Até logo!{Style.RESET_ALL}")
@@ -104,6 +127,8 @@ class SignaChatbotCLI:
 - ajuda - Mostra esta mensagem
 - stats - Mostra estatísticas da base de dados
 - crawl - Atualiza a base de dados (crawl completo)
+- atualizar - Atualização incremental (só páginas alteradas)
+- enriquecer - Obtém os detalhes dos produtos ainda sem eles (retoma onde parou)
 - limpar - Limpa o histórico de conversa
 - sair - Termina o programa
 
@@ -120,11 +145,33 @@ class SignaChatbotCLI:
         print(f"\n{Fore.CYAN}=== Estatísticas ==={Style.RESET_ALL}")
         print(f"Total de produtos: {stats['total_products']}")
         print(f"Total de categorias: {stats['total_categories']}")
-        print(f"Mensagens na conversa: {stats['conversation_length']}\n")
+        print(f"Mensagens na conversa: {stats['conversation_length']}")
+        cache = stats['search_cache']
+        print(f"Cache de pesquisa: {cache['hits']} hits / {cache['misses']} misses "
+              f"({cache['hit_rate']:.0%}), {cache['size']}/{cache['maxsize']} entradas")
+        intents = stats['intent_cache']
+        if intents['enabled']:
+            print(f"Cache de intenções: {intents['hits']} hits ({intents['disk_hits']} do disco) / "
+                  f"{intents['misses']} misses ({intents['hit_rate']:.0%}), "
+                  f"{intents['saved_latency']:.1f}s de LLM poupados")
+        parser = stats['intent_parser']
+        if parser['messages']:
+            saved = f", ~{parser['saved_p50_ms']:.0f} ms poupados por mensagem (p50)" if parser['saved_p50_ms'] else ""
+            print(f"Intenções sem LLM: {parser['handled_locally']}/{parser['messages']} "
+                  f"({parser['local_share']:.0%}){saved}")
+        corrector = parser['corrector']
+        if corrector and corrector['queries']:
+            print(f"Corretor ortográfico: {corrector['words']} palavras, {corrector['corrected']}/"
+                  f"{corrector['queries']} mensagens corrigidas, {corrector['avg_us']:.0f} µs por mensagem")
+        print()
 
 async def main():
     cli = SignaChatbotCLI()
-    await cli.run()
+    try:
+        await cli.run()
+    finally:
+        await cli.crawler.close()
+        await cli.chatbot.close()
 
 if __name__ == "__main__":
     try:
@@ -1,10 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from domain.models import ChatMessage, SearchResult, SearchQuery
+from typing import Any, Dict, List, Optional
+from domain.models import ChatMessage, ChatResult, SearchResult, SearchQuery
 
 class ChatbotPort(ABC):
     @abstractmethod
-    async def process_message(self, message: str, context: Optional[List[ChatMessage]] = None) -> str:
+    async def process_message(self, message: str, context: Optional[List[ChatMessage]] = None) -> ChatResult:
         pass
     
     @abstractmethod
@@ -13,4 +13,12 @@ class ChatbotPort(ABC):
     
     @abstractmethod
     async def get_product_by_id(self, product_id: str) -> Optional[dict]:
+        pass
+    
+    @abstractmethod
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        pass
+    
+    @abstractmethod
+    async def get_intent_stats(self) -> Dict[str, Any]:
         pass
\ No newline at end of file
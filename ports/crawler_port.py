@@ -1,11 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable, Tuple
 
 class CrawlerPort(ABC):
     @abstractmethod
-    async def crawl_site(self, base_url: str) -> Dict[str, Any]:
+    async def crawl_site(self, base_url: str, incremental: bool = False,
+                         on_batch: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+                         listings: Optional[Iterable[Tuple[int, Optional[int]]]] = None
+                         ) -> Dict[str, Any]:
         pass
     
+    @abstractmethod
+    async def commit_crawl(self, crawl_result: Dict[str, Any]) -> None:
+        pass
+    
+    @abstractmethod
+    async def enrich_products(self, product_ids: Iterable[str],
+                              on_batch: Callable[[List[Dict[str, Any]]], Awaitable[None]]) -> Dict[str, Any]:
+        pass
+    
+    def has_unfinished_crawl(self) -> bool:
+        """Whether a crawl was interrupted recently enough to be resumed"""
+        return False
+    
     @abstractmethod
     async def crawl_page(self, url: str) -> str:
         pass
@@ -16,4 +32,8 @@ class CrawlerPort(ABC):
     
     @abstractmethod
     async def extract_categories(self, html: str) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def close(self) -> None:
         pass
\ No newline at end of file
@@ -6,6 +6,10 @@ class KnowledgeBasePort(ABC):
     async def store_products(self, products: List[Dict[str, Any]]) -> None:
         pass
     
+    @abstractmethod
+    async def apply_product_diff(self, upserted: List[Dict[str, Any]], removed_ids: List[str]) -> Dict[str, int]:
+        pass
+    
     @abstractmethod
     async def store_categories(self, categories: List[Dict[str, Any]]) -> None:
         pass
@@ -20,4 +24,12 @@ class KnowledgeBasePort(ABC):
     
     @abstractmethod
     async def get_all_data(self) -> Dict[str, Any]:
+        pass
+    
+    @abstractmethod
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        pass
+    
+    @abstractmethod
+    async def get_category_popularity(self) -> Dict[str, int]:
         pass
\ No newline at end of file
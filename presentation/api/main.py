@@ -14,6 +14,7 @@ from presentation.api.models import (
     ChatRequest, ChatResponse, HealthResponse, ErrorResponse
 )
 from application.api_service import SignaChatbotService
+from application.refresh_scheduler import RefreshScheduler
 from infrastructure.adapters.intelligent_chatbot_adapter import IntelligentChatbotAdapter
 from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
 from infrastructure.adapters.comprehensive_crawler import ComprehensiveCrawlerAdapter
@@ -34,9 +35,19 @@ async def lifespan(app: FastAPI):
     
     app.state.chatbot_service = SignaChatbotService(chatbot_adapter, knowledge_base, crawler)
     await app.state.chatbot_service.initialize()
+    if config.enrich_in_background:
+        app.state.chatbot_service.crawler_service.start_enrichment()
+    
+    app.state.refresh_scheduler = RefreshScheduler(app.state.chatbot_service.crawler_service, knowledge_base)
+    if config.refresh_enabled:
+        app.state.refresh_scheduler.start()
     
     yield
     logger.info("Encerrando aplicação...")
+    await app.state.refresh_scheduler.stop()
+    await app.state.chatbot_service.crawler_service.stop_enrichment()
+    await crawler.close()
+    await chatbot_adapter.close()
 
 
 app = FastAPI(
@@ -62,28 +73,26 @@ async def chat(request: ChatRequest):
         
         response = await app.state.chatbot_service.process_query_text(request.query)
         
-        products_data = []
-        if hasattr(response, 'products') and response.products:
-            products_data = [
-                {
-                    "name": product.get('name', ''),
-                    "price": product.get('price', 0),
-                    "url": product.get('url', ''),
-                    "colors": product.get('colors', [])
-                }
-                for product in response.products[:5]
-            ]
+        products_data = [
+            {
+                "name": product.get('name', ''),
+                "price": product.get('price', 0),
+                "url": product.get('url', ''),
+                "colors": list(product.get('colors') or [])
+            }
+            for product in response.products[:5]
+        ]
         
-        search_link = None
-        if hasattr(response, 'metadata') and response.metadata:
-            search_link = response.metadata.get('search_link')
+        metadata = {'intent': response.intent.get('type')}
+        if response.filter_url:
+            metadata['search_link'] = response.filter_url
         
         return ChatResponse(
             answer=response.text,
             products=products_data,
-            search_link=search_link,
+            search_link=response.filter_url,
             confidence=1.0,
-            metadata=getattr(response, 'metadata', {})
+            metadata=metadata
         )
         
     except Exception as e:
@@ -151,8 +151,8 @@ goto END
 echo.
 echo [AVISO] Isto ira remover:
 echo - Ambiente virtual (venv)
-echo - Cache do crawler
-echo - Base de conhecimento local
+echo - Cache do crawler e cache de intencoes
+echo - Base de conhecimento local e estado do crawl
 echo.
 
 set /p confirm="Tem certeza? (S/N): "
@@ -166,9 +166,9 @@ if exist "venv" (
     rmdir /s /q venv
 )
 
-if exist "knowledge_base.pkl" (
-    echo [INFO] Removendo base de conhecimento...
-    del /q knowledge_base.pkl
+echo [INFO] Removendo base de conhecimento, estado do crawl e caches...
+for %%F in (knowledge_base.pkl knowledge_base.db knowledge_base.db-wal knowledge_base.db-shm knowledge_base.snapshot crawl_state.json http_cache.db http_cache.db-wal http_cache.db-shm intent_cache.db intent_cache.db-wal intent_cache.db-shm) do (
+    if exist "%%F" del /q "%%F"
 )
 
 if exist "__pycache__" (
@@ -413,12 +413,17 @@ if exist "venv" (
 
 echo.
 echo Base de Conhecimento:
-if exist "knowledge_base.pkl" (
+if exist "knowledge_base.db" (
     echo   [OK] Base de dados existe
-    for %%A in (knowledge_base.pkl) do echo   Tamanho: %%~zA bytes
+    for %%A in (knowledge_base.db) do echo   Tamanho: %%~zA bytes
+) else if exist "knowledge_base.pkl" (
+    echo   [AVISO] Apenas knowledge_base.pkl antigo; sera importado na proxima execucao
 ) else (
     echo   [AVISO] Base de dados nao encontrada
 )
+for %%F in (knowledge_base.snapshot crawl_state.json http_cache.db intent_cache.db) do (
+    if exist "%%F" echo   [OK] %%F: %%~zF bytes
+)
 
 echo.
 echo Arquivo .env:
@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from application.api_service import SignaChatbotService
+from domain.models import ChatResult, Product
+from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+from ports.chatbot_port import ChatbotPort
+from presentation.api.main import app
+
+PRODUCT = {'id': '1', 'name': 'Caneca Cerâmica', 'category': 'Casa & Lar', 'price': 2.5,
+           'url': 'https://www.signa.pt/brindes/brinde.asp?id=1', 'colors': ['Azul']}
+SEARCH_LINK = 'https://www.signa.pt/brindes/pesquisa.asp?cor=azul'
+
+
+class AnsweringChatbot(ChatbotPort):
+    """Answers every message with one product search result"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def process_message(self, message, context=None):
+        self.messages.append(message)
+        return ChatResult(text="Temos esta caneca.", intent={'type': 'product_search'},
+                          products=[Product.from_dict(PRODUCT)], filter_url=SEARCH_LINK)
+
+    async def search_products(self, query):
+        raise AssertionError("the chat endpoint must use the products of the chat result")
+
+    async def get_product_by_id(self, product_id):
+        return None
+
+    async def get_cache_stats(self):
+        return {}
+
+    async def get_intent_stats(self):
+        return {}
+
+
+def test_chat_answers_from_a_single_chat_result():
+    knowledge_base = InMemoryKnowledgeBase()
+    asyncio.run(knowledge_base.store_products([PRODUCT]))
+    chatbot = AnsweringChatbot()
+    # Built by hand instead of by the lifespan, which would crawl the live site
+    app.state.chatbot_service = SignaChatbotService(chatbot, knowledge_base, None)
+    app.state.chatbot_service.crawler_service.has_unfinished_crawl = lambda: False
+
+    response = TestClient(app).post('/chat', json={'query': 'caneca azul'})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert chatbot.messages == ['caneca azul']
+    assert body['answer'] == "Temos esta caneca."
+    assert body['products'] == [{'name': 'Caneca Cerâmica', 'price': 2.5, 'url': PRODUCT['url'], 'colors': ['Azul']}]
+    assert body['search_link'] == SEARCH_LINK
+    assert body['metadata'] == {'intent': 'product_search', 'search_link': SEARCH_LINK}
@@ -0,0 +1,37 @@
+import asyncio
+
+from application.api_service import SignaChatbotService
+from infrastructure.adapters.comprehensive_crawler import ComprehensiveCrawlerAdapter
+from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+
+PRODUCTS = [{'id': '1', 'name': 'Caneca Cerâmica', 'category': 'Casa & Lar', 'price': 2.5}]
+
+
+def start(interrupted: bool):
+    knowledge_base = InMemoryKnowledgeBase()
+    crawler = ComprehensiveCrawlerAdapter()
+    if interrupted:
+        crawler.crawl_state.start_checkpoint("https://www.signa.pt", 3600)
+    service = SignaChatbotService(None, knowledge_base, crawler)
+    crawls = []
+
+    async def crawl_and_index(*args, **kwargs):
+        crawls.append(kwargs)
+
+    service.crawler_service.crawl_and_index = crawl_and_index
+
+    async def scenario():
+        await knowledge_base.store_products(PRODUCTS)
+        await service.initialize()
+        await crawler.close()
+
+    asyncio.run(scenario())
+    return crawls
+
+
+def test_initialize_resumes_an_interrupted_crawl():
+    assert len(start(interrupted=True)) == 1
+
+
+def test_initialize_leaves_a_finished_catalog_alone():
+    assert start(interrupted=False) == []
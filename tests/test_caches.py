@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from infrastructure.utils.http_cache import HttpCache
+from infrastructure.utils.intent_cache import IntentCache
+from infrastructure.utils.ttl_cache import TTLCache
+
+URL = "https://www.signa.pt/brindes/categoria.asp?idCategoria=30"
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expired():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    cache.set('d', 4, ttl=-1)
+    assert cache.get('d') is None
+
+
+def test_http_cache_keeps_parsed_products_only_for_the_same_body():
+    cache = HttpCache('http_cache.db')
+    cache.store(URL, b'<html>1</html>', '"v1"', None)
+    cache.store_products(URL, [{'id': '1'}], URL + '&pagina=2')
+    entry = cache.get(URL)
+    assert entry['products'] == [{'id': '1'}] and entry['next'] == URL + '&pagina=2'
+    assert HttpCache.conditional_headers(entry) == {'If-None-Match': '"v1"'}
+
+    cache.store(URL, b'<html>1</html>', '"v1"', None)
+    assert cache.get(URL)['products'] == [{'id': '1'}]
+    cache.store(URL, b'<html>2</html>', '"v2"', None)
+    assert cache.get(URL)['products'] is None
+    assert cache.body(URL) == b'<html>2</html>'
+    cache.close()
+
+
+def test_intent_cache_survives_a_restart_and_folds_the_message():
+    async def scenario():
+        cache = IntentCache('intents.db')
+        await cache.set("Tem  Caneca azul?", 'model', {'type': 'product_search'}, 0.5)
+        cache.close()
+        reopened = IntentCache('intents.db')
+        hit = await reopened.get("tem caneca azul?", 'model')
+        other_model = await reopened.get("tem caneca azul?", 'other')
+        stats = reopened.stats()
+        reopened.close()
+        return hit, other_model, stats
+
+    hit, other_model, stats = asyncio.run(scenario())
+    assert hit == {'type': 'product_search'}
+    assert other_model is None
+    assert stats['disk_hits'] == 1 and stats['saved_latency'] == 0.5
+
+
+def test_intent_cache_drops_expired_entries():
+    async def scenario():
+        cache = IntentCache('intents.db', ttl=0.05)
+        await cache.set("olá", 'model', {'type': 'general'}, 0.1)
+        time.sleep(0.1)
+        return await cache.get("olá", 'model')
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,55 @@
+import pytest
+
+from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+from infrastructure.utils.catalog_snapshot import CatalogSnapshot, write_snapshot
+
+PRODUCTS = [
+    {'id': '1', 'name': 'Caneca Cerâmica', 'category': 'Casa & Lar', 'price': 2.5, 'colors': ['Azul', 'Branco'],
+     'category_id': 30, 'subcategory_id': 164, 'url': 'https://www.signa.pt/brindes/brinde.asp?id=1'},
+    {'id': '2', 'name': 'Boné Algodão', 'category': 'Vestuário', 'price': None, 'colors': [],
+     'reference': 'BN1234', 'enriched_at': 1700000000.0, 'price_tiers': [{'quantity': 100, 'price': 1.2}]},
+    {'id': '3', 'name': 'Caneca Térmica', 'category': 'Casa & Lar', 'category_id': 'x'},
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    index = InMemoryKnowledgeBase.build_search_index(PRODUCTS)
+    path = str(tmp_path / 'catalog.snapshot')
+    assert write_snapshot(path, PRODUCTS, catalog_version=7, search_postings=index.to_postings()) == 3
+    snapshot = CatalogSnapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_products_read_back_as_written(snapshot):
+    assert snapshot.catalog_version == 7
+    assert len(snapshot) == 3
+    assert [product.copy() for product in snapshot] == PRODUCTS
+
+
+def test_present_none_differs_from_a_missing_key(snapshot):
+    product = snapshot[1]
+    assert 'price' in product and product['price'] is None
+    assert 'category_id' not in product
+    assert product.get('category_id', 'missing') == 'missing'
+    with pytest.raises(KeyError):
+        product['description']
+
+
+def test_interned_columns_share_values(snapshot):
+    values, rows = snapshot.interned('category')
+    assert [values[row] for row in rows] == ['Casa & Lar', 'Vestuário', 'Casa & Lar']
+    assert len(values) == 2
+
+
+def test_search_index_is_read_from_the_mapping(snapshot):
+    index = snapshot.search_index()
+    assert index.candidates('caneca') == [0, 2]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-snapshot'
+    path.write_bytes(b'\0' * 128)
+    with pytest.raises(ValueError):
+        CatalogSnapshot(str(path))
@@ -0,0 +1,52 @@
+import os
+import pickle
+import sqlite3
+
+import pytest
+
+from infrastructure.utils.catalog_store import CatalogStore
+
+CATEGORIES = [{'id': 30, 'name': 'Casa & Lar'}]
+PRODUCTS = [{'id': str(i), 'name': f'Caneca {i}', 'description': 'x' * 2000} for i in range(200)]
+
+
+def write_pickle(path):
+    with open(path, 'wb') as f:
+        pickle.dump({'categories': CATEGORIES, 'products': PRODUCTS + [{'name': 'sem id'}]}, f)
+
+
+def test_import_pickle_migrates_everything():
+    write_pickle('knowledge_base.pkl')
+    store = CatalogStore('knowledge_base.db')
+    assert store.import_pickle('knowledge_base.pkl')
+    assert store.load_categories() == CATEGORIES
+    assert [product['id'] for product in store.iter_products()] == [product['id'] for product in PRODUCTS]
+    assert store.version() == 1
+    assert not store.import_pickle('missing.pkl')
+
+
+def test_failed_import_leaves_the_store_empty(monkeypatch):
+    write_pickle('knowledge_base.pkl')
+    store = CatalogStore('knowledge_base.db')
+    original = store._bump_version
+
+    def crash():
+        original()
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(store, '_bump_version', crash)
+    with pytest.raises(sqlite3.OperationalError):
+        store.import_pickle('knowledge_base.pkl')
+    # Nothing half-migrated: the next start sees an empty store and imports again
+    assert store.is_empty()
+
+
+def test_compact_reclaims_deleted_rows():
+    store = CatalogStore('knowledge_base.db')
+    store.upsert_products(PRODUCTS)
+    store.delete_products(product['id'] for product in PRODUCTS[:150])
+    store.compact()
+    assert os.path.getsize('knowledge_base.db-wal') == 0
+    size = os.path.getsize('knowledge_base.db')
+    assert size < 150 * 2000
+    assert len(list(store.iter_products())) == 50
@@ -0,0 +1,35 @@
+import random
+
+from Levenshtein import distance
+
+from infrastructure.utils.category_resolver import BKTree, CategoryResolver
+from infrastructure.utils.signa_catalog import categories
+
+
+def test_bk_tree_finds_what_a_scan_finds():
+    rnd = random.Random(3)
+    words = {''.join(rnd.choice('abcde') for _ in range(rnd.randint(3, 8))) for _ in range(300)}
+    tree = BKTree()
+    for word in words:
+        tree.add(word)
+    for query in ('abcd', 'eeeee', 'badcab'):
+        for radius in (0, 1, 2):
+            expected = sorted((distance(query, word), word) for word in words if distance(query, word) <= radius)
+            assert sorted(tree.search(query, radius)) == expected
+
+
+def test_resolves_names_ids_accents_and_typos():
+    resolver = CategoryResolver(categories())
+    assert resolver.resolve('Vestuário')['id'] == 31
+    assert resolver.resolve('31')['name'] == 'Vestuário'
+    assert resolver.resolve('vestuario')['id'] == 31
+    assert resolver.resolve('vesturio')['id'] == 31
+    assert resolver.resolve('xyz') is None
+    assert resolver.resolve('') is None
+
+
+def test_subcategory_points_at_its_own_page():
+    entry = CategoryResolver(categories()).resolve('Mochilas')
+    assert entry['name'] == 'Sacos & Mochilas'
+    assert entry['subcategory']['id'] == 241
+    assert entry['url'] == '/brindes/categoria.asp?idCategoria=37&idSubCategoria=241'
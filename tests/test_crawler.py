@@ -0,0 +1,282 @@
+import asyncio
+import os
+import socket
+import sqlite3
+
+import pytest
+from aiohttp import web
+
+from benchmarks.standin_server import StandinCatalog, make_app, start_server
+from infrastructure.adapters.comprehensive_crawler import ComprehensiveCrawlerAdapter
+from infrastructure.config import config
+
+
+@pytest.fixture(autouse=True)
+def _fast_crawl(monkeypatch):
+    monkeypatch.setattr(config, 'parse_workers', 0)
+    monkeypatch.setattr(config, 'crawl_rate_limit', 1000.0)
+    monkeypatch.setattr(config, 'crawl_max_rate', 1000.0)
+    monkeypatch.setattr(config, 'max_retries', 1)
+    monkeypatch.setattr(config, 'cache_enabled', True)
+    # Every fetch goes to the server, revalidating what the cache holds
+    monkeypatch.setattr(config, 'cache_ttl', 0)
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return StandinCatalog(product_count=120, per_page=10)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def forbidding(paths):
+    """Middleware answering 403 for the listing urls in `paths` (path?query)"""
+    @web.middleware
+    async def middleware(request, handler):
+        if request.path_qs in paths:
+            raise web.HTTPForbidden()
+        return await handler(request)
+    return middleware
+
+
+async def serve(app: web.Application, port: int = 0):
+    port = port or free_port()
+    runner = await start_server(app, port=port)
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_fetch_treats_client_errors_as_failed_loads(catalog):
+    async def scenario():
+        runner, base_url = await serve(make_app(catalog))
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            missing, _ = await crawler._fetch(f"{base_url}/brindes/brinde.asp?id=no-such-product")
+            found, _ = await crawler._fetch(f"{base_url}/brindes/brinde.asp?id={next(iter(catalog.products))}")
+            return missing, found
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    missing, found = asyncio.run(scenario())
+    assert missing == ""
+    assert "<h1>" in found
+
+
+def test_forbidden_listing_keeps_its_products_on_recrawl(catalog):
+    (cat_id, sub_id), products = next((key, items) for key, items in catalog.listings.items() if items)
+    path = f"/brindes/categoria.asp?idCategoria={cat_id}&idSubCategoria={sub_id}"
+    # Both crawls must see the same urls
+    port = free_port()
+
+    async def crawl(app):
+        runner, base_url = await serve(app, port)
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            result = await crawler.crawl_site(base_url)
+            await crawler.commit_crawl(result)
+            return result
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    first = asyncio.run(crawl(make_app(catalog)))
+    assert first['products_crawled'] == len(catalog.products)
+
+    app = make_app(catalog)
+    app.middlewares.append(forbidding({path}))
+    second = asyncio.run(crawl(app))
+    assert str(products[0]['id']) not in second['removed_ids']
+    assert second['removed_ids'] == []
+
+
+def test_store_failure_ends_the_crawl_without_recording_its_pages(catalog, monkeypatch):
+    from application.crawler_service import CrawlerService
+    from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+
+    knowledge_base = InMemoryKnowledgeBase()
+
+    def disk_full(*args):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    monkeypatch.setattr(knowledge_base.store, 'apply_diff', disk_full)
+
+    async def scenario():
+        runner, base_url = await serve(make_app(catalog))
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                await CrawlerService(crawler, knowledge_base).crawl_and_index(base_url)
+            return crawler.crawl_state
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    state = asyncio.run(scenario())
+    assert state.pages == {}
+    assert state.checkpoint['visited'] == {}
+
+
+def test_enrichment_leaves_detail_pages_out_of_the_http_cache(catalog):
+    product_ids = list(catalog.products)[:5]
+
+    async def scenario():
+        runner, base_url = await serve(make_app(catalog))
+        crawler = ComprehensiveCrawlerAdapter()
+        crawler.base_url = base_url
+        records = []
+
+        async def on_batch(batch):
+            records.extend(batch)
+
+        try:
+            totals = await crawler.enrich_products(product_ids, on_batch)
+            cached = [crawler.http_cache.get(f"{base_url}/brindes/brinde.asp?id={product_id}")
+                      for product_id in product_ids]
+            return totals, records, cached
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    totals, records, cached = asyncio.run(scenario())
+    assert totals['enriched'] == len(product_ids)
+    assert all(record['description'] for record in records)
+    assert cached == [None] * len(product_ids)
+
+
+def test_building_the_crawler_opens_no_files():
+    crawler = ComprehensiveCrawlerAdapter()
+    assert crawler._http_cache is None and crawler._crawl_state is None
+    assert not os.path.exists(config.http_cache_file)
+    assert crawler.http_cache is not None
+    assert os.path.exists(config.http_cache_file)
+    asyncio.run(crawler.close())
+
+
+def test_crawl_finds_every_product_once(catalog):
+    async def scenario():
+        runner, base_url = await serve(make_app(catalog))
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            return await crawler.crawl_site(base_url)
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    result = asyncio.run(scenario())
+    ids = [product['id'] for product in result['products']]
+    assert sorted(ids) == sorted(catalog.products)
+    by_id = {product['id']: product for product in result['products']}
+    for product_id, product in catalog.products.items():
+        assert by_id[product_id]['subcategory_id'] == product['subcategory_id']
+        assert by_id[product_id]['name'] == product['name']
+    assert result['pages'] and result['removed_ids'] == []
+
+
+def test_interrupted_crawl_resumes_from_its_checkpoint(catalog, monkeypatch):
+    monkeypatch.setattr(config, 'crawl_batch_size', 20)
+    port = free_port()
+    stored = []
+
+    async def crawl(fail_after=None):
+        runner, base_url = await serve(make_app(catalog), port)
+        crawler = ComprehensiveCrawlerAdapter()
+        batches = 0
+
+        async def on_batch(batch):
+            nonlocal batches
+            if fail_after is not None and batches == fail_after:
+                raise RuntimeError("store went away")
+            batches += 1
+            stored.extend(product['id'] for product in batch)
+
+        try:
+            return await crawler.crawl_site(base_url, on_batch=on_batch)
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(crawl(fail_after=2))
+    stored_before = len(stored)
+    assert 0 < stored_before < len(catalog.products)
+
+    result = asyncio.run(crawl())
+    assert result['resumed_pages'] > 0
+    # Only the batch in flight when the store failed is fetched again
+    assert set(stored) == set(catalog.products)
+    assert len(stored) - len(catalog.products) < config.crawl_batch_size + catalog.per_page
+
+
+def test_incremental_recrawl_skips_unchanged_pages(catalog):
+    port = free_port()
+
+    async def crawl(incremental):
+        runner, base_url = await serve(make_app(catalog), port)
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            result = await crawler.crawl_site(base_url, incremental=incremental)
+            await crawler.commit_crawl(result)
+            return result
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    first = asyncio.run(crawl(False))
+    second = asyncio.run(crawl(True))
+    assert second['unchanged_pages'] == len(first['pages'])
+    assert second['products'] == [] and second['removed_ids'] == []
+
+
+def test_products_of_a_vanished_listing_page_are_removed():
+    shrunk = StandinCatalog(product_count=120, per_page=3)
+    key, products = next((key, items) for key, items in shrunk.listings.items() if len(items) > shrunk.per_page)
+    port = free_port()
+
+    async def crawl(catalog):
+        runner, base_url = await serve(make_app(catalog), port)
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            result = await crawler.crawl_site(base_url)
+            await crawler.commit_crawl(result)
+            return result, crawler.crawl_state
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    asyncio.run(crawl(StandinCatalog(product_count=120, per_page=3)))
+
+    # The listing now fits on one page, so nothing links to its page 2 any more
+    dropped = products[shrunk.per_page:]
+    del products[shrunk.per_page:]
+    for product in dropped:
+        del shrunk.products[product['id']]
+
+    result, state = asyncio.run(crawl(shrunk))
+    assert result['removed_ids'] == sorted(product['id'] for product in dropped)
+    assert len(result['vanished_pages']) == -(-len(dropped) // shrunk.per_page)
+    assert not set(result['vanished_pages']) & set(state.pages)
+
+
+def test_parse_pool_yields_the_same_products_as_in_process_parsing(catalog, monkeypatch):
+    monkeypatch.setattr(config, 'parse_workers', 2)
+
+    async def scenario():
+        runner, base_url = await serve(make_app(catalog))
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            result = await crawler.crawl_site(base_url)
+            return result, crawler._parse_pool
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    result, pool = asyncio.run(scenario())
+    assert pool is not None and pool._max_workers == 2
+    by_id = {product['id']: product for product in result['products']}
+    assert sorted(by_id) == sorted(catalog.products)
+    for product_id, product in catalog.products.items():
+        assert by_id[product_id]['name'] == product['name']
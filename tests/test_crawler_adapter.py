@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('crawl4ai')
+
+from benchmarks.standin_server import make_detail_page
+from infrastructure.adapters import crawler_adapter
+from infrastructure.adapters.crawler_adapter import SignaCrawlerAdapter
+from infrastructure.config import config
+
+PRODUCT = {'name': 'Caneca Cerâmica', 'reference': 'CN-01', 'subcategory': 'Canecas Personalizadas',
+           'colors': ['Azul'], 'price': 2.0}
+
+
+class FakeBrowser:
+    """Stands in for AsyncWebCrawler, answering each url with `pages[url]`"""
+
+    started = 0
+
+    def __init__(self, config=None, pages=None, redirects=None):
+        self.pages = pages or {}
+        self.redirects = redirects or {}
+        self.dispatchers = []
+
+    async def start(self):
+        FakeBrowser.started += 1
+        await asyncio.sleep(0)
+
+    async def close(self):
+        pass
+
+    async def arun_many(self, urls, config=None, dispatcher=None):
+        self.dispatchers.append(dispatcher)
+
+        async def results():
+            for url in urls:
+                # A redirect reports the page it ended on
+                final = self.redirects.get(url, url)
+                html = self.pages.get(url)
+                yield SimpleNamespace(url=final, redirected_url=final, success=html is not None,
+                                      html=html, error_message='not found')
+        return results()
+
+
+def test_the_browser_is_started_once_and_pages_share_its_pool(monkeypatch):
+    monkeypatch.setattr(config, 'browser_pool_size', 3)
+    monkeypatch.setattr(crawler_adapter, 'AsyncWebCrawler', FakeBrowser)
+    FakeBrowser.started = 0
+    crawler = SignaCrawlerAdapter()
+
+    async def scenario():
+        browsers = await asyncio.gather(*(crawler._get_crawler() for _ in range(5)))
+        [page async for page in crawler._crawl_many(['https://www.signa.pt/a'])]
+        await crawler.close()
+        return browsers
+
+    browsers = asyncio.run(scenario())
+    assert FakeBrowser.started == 1
+    assert all(browser is browsers[0] for browser in browsers)
+    assert browsers[0].dispatchers[0].max_session_permit == 3
+
+
+def test_enrichment_survives_redirected_pages_and_parses_off_the_loop(monkeypatch):
+    requested = [f"https://www.signa.pt/brindes/brinde.asp?id={product_id}" for product_id in ('1', '2', '3')]
+    browser = FakeBrowser(
+        pages={requested[0]: make_detail_page(PRODUCT), requested[1]: make_detail_page(PRODUCT)},
+        redirects={requested[1]: "https://www.signa.pt/brindes/caneca-ceramica"}
+    )
+    parse_threads = []
+    parse = crawler_adapter.parse_product_detail
+
+    def recording_parse(html):
+        parse_threads.append(threading.current_thread())
+        return parse(html)
+
+    monkeypatch.setattr(crawler_adapter, 'parse_product_detail', recording_parse)
+    crawler = SignaCrawlerAdapter()
+    crawler._crawler = browser
+    records = []
+
+    async def on_batch(batch):
+        records.extend(batch)
+
+    totals = asyncio.run(crawler.enrich_products(['1', '2', '3'], on_batch))
+    # A page whose result names only where it was redirected to counts as failed
+    assert totals == {'requested': 3, 'enriched': 1, 'failed': 2}
+    assert [record['id'] for record in records] == ['1']
+    assert records[0]['colors'] == ['Azul']
+    assert parse_threads and threading.main_thread() not in parse_threads
@@ -0,0 +1,32 @@
+from benchmarks.standin_server import make_detail_page
+from infrastructure.utils.detail_parser import parse_product_detail
+
+
+def test_reads_colors_description_and_price_tiers():
+    product = {'name': 'Caneca Cerâmica', 'reference': 'CN-01', 'subcategory': 'Canecas Personalizadas',
+               'colors': ['Azul', 'Vermelho'], 'price': 2.0}
+    details = parse_product_detail(make_detail_page(product))
+    assert details['colors'] == ['Azul', 'Vermelho']
+    assert details['description'].startswith('Caneca Cerâmica, referência CN-01')
+    assert details['price_tiers'][0] == {'quantity': 100, 'price': 2.0}
+    assert [tier['quantity'] for tier in details['price_tiers']] == [100, 250, 500, 1000]
+
+
+def test_colors_ignore_elements_that_only_contain_cor():
+    html = (
+        '<html><body>'
+        '<div class="corpo"><p>Azul</p><span title="Verde">Verde</span></div>'
+        '<div id="decoration" title="Preto">Preto</div>'
+        '<div class="cores"><span class="cor" title="Branco"></span><p>Amarelo</p></div>'
+        '</body></html>'
+    )
+    assert parse_product_detail(html)['colors'] == ['Branco']
+
+
+def test_colors_fall_back_to_a_colors_line():
+    html = '<html><body><p>Cores disponíveis: Azul, Verde e Preto.</p></body></html>'
+    assert parse_product_detail(html)['colors'] == ['Azul', 'Verde', 'Preto']
+
+
+def test_empty_page_has_no_details():
+    assert parse_product_detail('') == {}
@@ -0,0 +1,42 @@
+import pytest
+
+from infrastructure.utils.intent_parser import IntentParser
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return IntentParser()
+
+
+def test_product_color_and_price(parser):
+    info = parser.parse("Quero canetas azuis até 5 euros")
+    assert info['type'] == 'product_search'
+    assert info['product'] == 'canetas'
+    assert info['color'] == 'azul'
+    assert info['price_max'] == 5.0
+    assert info['confidence'] >= parser.threshold
+
+
+def test_price_range_and_cheap(parser):
+    info = parser.parse("bonés entre 4 e 2€")
+    assert (info['price_min'], info['price_max']) == (2.0, 4.0)
+    assert parser.parse("mochilas baratas")['price_max'] == 5.0
+    assert IntentParser(cheap_price_max=12.5).parse("mochilas baratas")['price_max'] == 12.5
+    # An explicit amount wins over "barato"
+    assert parser.parse("mochilas baratas até 3 euros")['price_max'] == 3.0
+
+
+def test_company_question(parser):
+    info = parser.parse("Qual o vosso telefone?")
+    assert info['type'] == 'company_info'
+    assert info['product'] is None
+
+
+def test_company_words_with_a_product_are_left_to_the_llm(parser):
+    info = parser.parse("Vocês fazem gravação laser em canetas?")
+    assert info['type'] == 'company_info'
+    assert info['confidence'] < parser.threshold
+
+
+def test_unknown_words_lower_the_confidence(parser):
+    assert parser.parse("canetas ergonómicas recarregáveis")['confidence'] < parser.threshold
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import time
+
+from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+
+PRODUCTS = [
+    {'id': '1', 'name': 'Caneca Cerâmica', 'category': 'Casa & Lar', 'price': 2.5, 'colors': ['Azul']},
+    {'id': '2', 'name': 'Caneca Térmica', 'category': 'Casa & Lar', 'price': 6.0, 'colors': ['Preto']},
+    {'id': '3', 'name': 'Boné Algodão', 'category': 'Vestuário', 'price': 1.5, 'colors': ['Azul']},
+]
+
+
+def ids(results):
+    return sorted(product['id'] for product in results)
+
+
+def test_search_with_filters_and_diffs():
+    async def scenario():
+        knowledge_base = InMemoryKnowledgeBase()
+        await knowledge_base.apply_product_diff(PRODUCTS, [])
+        found = {
+            'caneca': ids(await knowledge_base.search_products('caneca')),
+            'azul': ids(await knowledge_base.search_products('', {'color': 'azul'})),
+            'cheap': ids(await knowledge_base.search_products('caneca', {'price_max': 5})),
+        }
+        diff = await knowledge_base.apply_product_diff([{'id': '2', 'price': 4.0}], ['3'])
+        found['after'] = ids(await knowledge_base.search_products('caneca', {'price_max': 5}))
+        found['removed'] = ids(await knowledge_base.search_products('boné'))
+        return found, diff, knowledge_base.product_map['2']
+
+    found, diff, updated = asyncio.run(scenario())
+    assert found['caneca'] == ['1', '2']
+    assert found['azul'] == ['1', '3']
+    assert found['cheap'] == ['1']
+    assert diff == {'added': 0, 'updated': 1, 'removed': 1}
+    assert found['after'] == ['1', '2']
+    assert found['removed'] == []
+    # Fields the update did not carry are kept
+    assert updated['colors'] == ('Preto',) and updated['name'] == 'Caneca Térmica'
+
+
+def test_reloads_from_the_store_and_from_a_matching_snapshot():
+    asyncio.run(InMemoryKnowledgeBase().apply_product_diff(PRODUCTS, []))
+
+    from_store = InMemoryKnowledgeBase()
+    assert ids(from_store.products) == ['1', '2', '3']
+
+    # Loading from the store writes a snapshot in the background for the next start
+    deadline = time.monotonic() + 5
+    while not os.path.exists(from_store.snapshot_file) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    from_snapshot = InMemoryKnowledgeBase()
+    assert type(from_snapshot.products[0]).__name__ == 'SnapshotProduct'
+    assert ids(asyncio.run(from_snapshot.search_products('caneca', {'color': 'preto'}))) == ['2']
+
+
+def test_files_live_in_the_data_directory(tmp_path, monkeypatch):
+    from infrastructure.config import config
+
+    monkeypatch.setattr(config, 'data_dir', str(tmp_path / 'data'))
+    os.makedirs(config.data_dir)
+    knowledge_base = InMemoryKnowledgeBase()
+    asyncio.run(knowledge_base.apply_product_diff(PRODUCTS, []))
+    assert os.path.exists(os.path.join(config.data_dir, 'knowledge_base.db'))
+    assert not os.path.exists('knowledge_base.db')
+
+
+def test_diff_adding_and_updating_the_same_new_product():
+    knowledge_base = InMemoryKnowledgeBase()
+    product = {'id': 'p1', 'name': 'Caneta azul', 'category': 'Escrita', 'price': 1.5}
+
+    async def scenario():
+        await knowledge_base.store_products(PRODUCTS)
+        # An update first, then a product listed on two pages of one batch,
+        # the second time with a new price
+        changed = dict(PRODUCTS[0], price=3.0)
+        return await knowledge_base.apply_product_diff([changed, product, dict(product, price=2.0)], [])
+
+    totals = asyncio.run(scenario())
+    assert totals == {'added': 1, 'updated': 2, 'removed': 0}
+    assert knowledge_base.product_map['p1']['price'] == 2.0
+    assert [p['id'] for p in knowledge_base.products] == ['1', '2', '3', 'p1']
+
+
+def test_search_cache_counts_hits_and_is_dropped_on_catalog_changes(monkeypatch):
+    from infrastructure.config import config
+
+    monkeypatch.setattr(config, 'cache_enabled', True)
+
+    async def scenario():
+        knowledge_base = InMemoryKnowledgeBase()
+        await knowledge_base.apply_product_diff(PRODUCTS, [])
+        await knowledge_base.search_products('caneca', {'color': 'Azul'})
+        # Same search once normalized: served from the cache
+        cached = await knowledge_base.search_products('  Caneca ', {'color': 'azul', 'category': ''})
+        before = await knowledge_base.get_cache_stats()
+        await knowledge_base.apply_product_diff([{'id': '4', 'name': 'Caneca Vidro', 'colors': ['Azul']}], [])
+        fresh = await knowledge_base.search_products('caneca', {'color': 'azul'})
+        # An unchanged diff keeps the version and the cached result
+        await knowledge_base.apply_product_diff([PRODUCTS[0]], [])
+        await knowledge_base.search_products('caneca', {'color': 'azul'})
+        return ids(cached), ids(fresh), before, await knowledge_base.get_cache_stats()
+
+    cached, fresh, before, after = asyncio.run(scenario())
+    assert cached == ['1']
+    assert before['hits'] == 1 and before['misses'] == 1 and before['size'] == 1
+    assert fresh == ['1', '4']
+    assert after['catalog_version'] == before['catalog_version'] + 1
+    assert after['hits'] == 2 and after['misses'] == 2 and after['size'] == 1
+
+
+def test_trigram_pruning_only_drops_matches_sharing_no_trigram_with_the_query(monkeypatch):
+    from benchmarks.synthetic_catalog import make_products
+    from infrastructure.config import config
+    from infrastructure.utils.text_utils import trigrams
+
+    monkeypatch.setattr(config, 'cache_enabled', False)
+    knowledge_base = InMemoryKnowledgeBase()
+    asyncio.run(knowledge_base.apply_product_diff(make_products(1000), []))
+    queries = ['caneca', 'canecas azuis', 'caneta azul', 'canca', 'cneca', 'garafa', 'mochla', 'boné', 'bone',
+               'lapis', 'lápis', 'porta chaves', 'porta-chave', 'guarda chuva', 'usb', 'saco', 'eco', 'mini',
+               'térmica', 'termica', 'bambu', '5041', 'xyz']
+
+    for query in queries:
+        query_grams = set(trigrams(query))
+        scored = []
+        for product in knowledge_base.products:
+            score = knowledge_base._calculate_match_score(product, query)
+            if score > 60:
+                scored.append((product, score))
+        full_scan = sorted(scored, key=lambda item: item[1], reverse=True)[:20]
+        reachable = [(product, score) for product, score in scored
+                     if query_grams & (set(trigrams(product['name'])) | set(trigrams(product['category'] or '')))]
+        expected = sorted(reachable, key=lambda item: item[1], reverse=True)[:20]
+
+        results = asyncio.run(knowledge_base.search_products(query))
+        # Same scores and order as a full scan over the products sharing a trigram
+        assert [(product['id'], product.match_score) for product in results] == \
+            [(product['id'], score) for product, score in expected], query
+        # What the full scan found besides those is fuzzy noise: never a product
+        # containing the query, never an exact-match score
+        kept = {product['id'] for product in results}
+        for product, score in full_scan:
+            if product['id'] not in kept:
+                assert query not in product['name'].lower() and score < 100, (query, product['name'])
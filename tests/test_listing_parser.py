@@ -0,0 +1,34 @@
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic_catalog import make_listing_page, make_products
+from infrastructure.utils import listing_parser
+
+BASE_URL = "https://www.signa.pt"
+URL = f"{BASE_URL}/brindes/categoria.asp?idCategoria=30&idSubCategoria=164"
+
+
+def test_reads_products_and_next_page():
+    products = make_products(5, seed=1)
+    html = make_listing_page(products, "/brindes/categoria.asp?idCategoria=30&idSubCategoria=164&pagina=2")
+    parsed, next_url = listing_parser.parse_listing(html, URL, BASE_URL)
+    assert [product['id'] for product in parsed] == [product['id'] for product in products]
+    assert parsed[0]['name'] == products[0]['name']
+    assert parsed[0]['reference'] == products[0]['reference']
+    assert next_url == URL + "&pagina=2"
+
+
+def test_fast_and_tolerant_parsers_agree():
+    html = make_listing_page(make_products(8, seed=2), "?idCategoria=30&idSubCategoria=164&pagina=2")
+    soup = BeautifulSoup(html, 'lxml')
+    fast = listing_parser.parse_listing(html, URL, BASE_URL)
+    assert fast == (listing_parser.products_from_soup(soup, BASE_URL), listing_parser.next_page_url(soup, URL))
+
+
+def test_next_link_to_another_listing_is_ignored():
+    html = make_listing_page(make_products(2, seed=3), "/brindes/categoria.asp?idCategoria=31&pagina=2")
+    assert listing_parser.parse_listing(html, URL, BASE_URL)[1] is None
+
+
+def test_page_without_products():
+    products, next_url = listing_parser.parse_listing(make_listing_page([]), URL, BASE_URL)
+    assert products == [] and next_url is None
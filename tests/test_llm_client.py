@@ -0,0 +1,36 @@
+import asyncio
+
+from benchmarks.llm_load_test import STATS, make_llm_app
+from infrastructure.config import config
+from infrastructure.utils.llm_client import LLMClient, shared_llm_client
+from tests.test_crawler import serve
+
+
+def test_every_caller_shares_one_client():
+    assert shared_llm_client() is shared_llm_client()
+
+
+def test_requests_beyond_the_limit_wait_for_a_slot(monkeypatch):
+    monkeypatch.setattr(config, 'openai_max_concurrency', 2)
+    monkeypatch.setattr(config, 'openai_api_key', 'test')
+    app = make_llm_app(latency=0.05)
+
+    async def scenario():
+        runner, base_url = await serve(app)
+        monkeypatch.setattr(config, 'openai_base_url', f"{base_url}/v1")
+        client = LLMClient()
+        try:
+            replies = await asyncio.gather(*(
+                client.chat([{'role': 'user', 'content': f"olá {i}"}]) for i in range(6)
+            ))
+            return replies, client.stats()
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    replies, stats = asyncio.run(scenario())
+    assert all(reply.choices[0].message.content for reply in replies)
+    assert app[STATS]['requests'] == 6
+    assert app[STATS]['peak_in_flight'] == 2
+    assert stats['requests'] == 6 and stats['errors'] == 0
+    assert stats['in_flight'] == 0 and stats['waiting'] == 0
@@ -0,0 +1,62 @@
+import asyncio
+
+from infrastructure.utils.rate_limiter import AdaptiveRateLimiter, HostLimiter
+
+URL = "https://www.signa.pt/brindes/categoria.asp"
+
+
+def test_cancelled_while_waiting_for_a_token_holds_no_slot():
+    async def scenario():
+        host = HostLimiter(rate=0.5, max_rate=1, max_concurrency=2, burst=1)
+        await host.acquire()
+        # No token left: this caller sleeps about two seconds and is cancelled meanwhile
+        waiter = asyncio.create_task(host.acquire())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return host.in_flight
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_cancelled_request_frees_its_slot_for_the_next_one():
+    async def scenario():
+        limiter = AdaptiveRateLimiter(rate=100, max_rate=100, max_concurrency=1)
+        limiter._host(URL).limit = 1.0
+
+        async def fetch(hold: float):
+            async with limiter.request(URL):
+                await asyncio.sleep(hold)
+
+        running = asyncio.create_task(fetch(10))
+        queued = asyncio.create_task(fetch(0))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        await asyncio.wait_for(fetch(0), timeout=1)
+        return limiter.stats()['www.signa.pt']['in_flight']
+
+    assert asyncio.run(scenario()) == 0
+
+
+
+def test_cancelled_request_leaves_the_rate_alone():
+    async def scenario():
+        limiter = AdaptiveRateLimiter(rate=5, max_rate=100, max_concurrency=4)
+
+        async def fetch():
+            async with limiter.request(URL):
+                await asyncio.sleep(10)
+
+        request = asyncio.create_task(fetch())
+        await asyncio.sleep(0.05)
+        before = limiter.stats()['www.signa.pt']
+        request.cancel()
+        await asyncio.gather(request, return_exceptions=True)
+        return before, limiter.stats()['www.signa.pt']
+
+    before, after = asyncio.run(scenario())
+    assert after['in_flight'] == 0
+    assert (after['rate'], after['concurrency']) == (before['rate'], before['concurrency'])
+    assert after['successes'] == after['failures'] == 0
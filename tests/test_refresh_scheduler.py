@@ -0,0 +1,175 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from application.crawler_service import CrawlerService
+from application.refresh_scheduler import RefreshScheduler
+from benchmarks.standin_server import StandinCatalog, make_app
+from infrastructure.adapters.comprehensive_crawler import ComprehensiveCrawlerAdapter
+from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+from infrastructure.config import config
+from infrastructure.utils import signa_catalog
+from tests.test_crawler import free_port, serve
+
+CATEGORIES = [
+    {'name': 'Escrita', 'subcategories': [{'name': 'Canetas'}, {'name': 'Lápis'}]},
+    {'name': 'Casa & Lar', 'subcategories': []},
+]
+
+
+@pytest.fixture(autouse=True)
+def _intervals(monkeypatch):
+    monkeypatch.setattr(config, 'refresh_min_interval', 100)
+    monkeypatch.setattr(config, 'refresh_max_interval', 1000)
+    monkeypatch.setattr(config, 'refresh_jitter', 0.1)
+    monkeypatch.setattr(config, 'refresh_tick', 0)
+    monkeypatch.setattr(config, 'parse_workers', 0)
+    monkeypatch.setattr(config, 'crawl_rate_limit', 1000.0)
+    monkeypatch.setattr(config, 'crawl_max_rate', 1000.0)
+    monkeypatch.setattr(config, 'cache_ttl', 0)
+
+
+class Catalog:
+    def __init__(self, popularity=None):
+        self.popularity = popularity or {}
+
+    async def get_all_data(self):
+        return {'categories': CATEGORIES}
+
+    async def get_category_popularity(self):
+        return self.popularity
+
+
+class Refreshes:
+    """Records the listings refreshed; with `hold`, each refresh waits on it"""
+
+    def __init__(self, hold=None):
+        self.names = []
+        self.cancelled = []
+        self.hold = hold
+
+    async def update_category(self, name):
+        self.names.append(name)
+        try:
+            if self.hold is not None:
+                await self.hold.wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        return {'products_added': 0, 'products_updated': 0, 'products_removed': 0}
+
+
+def test_searched_listings_are_due_sooner():
+    scheduler = RefreshScheduler(Refreshes(), Catalog({'canetas': 6, 'escrita': 2, 'lápis': 4}))
+    assert scheduler._interval(8, 8) == 100
+    assert scheduler._interval(0, 8) == 1000
+    assert scheduler._interval(4, 8) == 550
+
+    random.seed(1)
+    now = time.time()
+    asyncio.run(scheduler._schedule_due())
+    # The first round is spread over each listing's whole interval
+    assert set(scheduler._due) == {'Canetas', 'Lápis', 'Casa & Lar'}
+    assert now <= scheduler._due['Canetas'] <= time.time() + 100
+    assert now <= scheduler._due['Casa & Lar'] <= time.time() + 1000
+
+
+def test_due_listings_refresh_and_are_rescheduled_with_jitter():
+    refreshes = Refreshes()
+    scheduler = RefreshScheduler(refreshes, Catalog({'canetas': 1}))
+
+    async def scenario():
+        await scheduler._schedule_due()
+        offsets = []
+        for _ in range(50):
+            scheduler._due['Canetas'] = 0
+            now = time.time()
+            await scheduler._schedule_due()
+            offsets.append(scheduler._due['Canetas'] - now)
+            await asyncio.gather(*scheduler._running.values())
+        return offsets
+
+    offsets = asyncio.run(scenario())
+    assert refreshes.names == ['Canetas'] * 50
+    assert scheduler.refreshed == 50 and scheduler.failed == 0
+    assert all(90 - 1 <= offset <= 110 + 1 for offset in offsets)
+    # Listings drift apart instead of all coming due after exactly one interval
+    assert len({round(offset, 3) for offset in offsets}) > 1
+
+
+def test_a_listing_that_became_popular_is_not_left_waiting():
+    catalog = Catalog()
+    scheduler = RefreshScheduler(Refreshes(), catalog)
+
+    async def scenario():
+        await scheduler._schedule_due()
+        scheduler._due['Lápis'] = time.time() + 1000
+        catalog.popularity = {'lápis': 5}
+        await scheduler._schedule_due()
+
+    asyncio.run(scenario())
+    assert scheduler._due['Lápis'] - time.time() <= 110
+
+
+def test_stop_cancels_the_loop_and_running_refreshes():
+    refreshes = Refreshes(hold=asyncio.Event())
+    scheduler = RefreshScheduler(refreshes, Catalog())
+
+    async def scenario():
+        await scheduler._schedule_due()
+        for name in scheduler._due:
+            scheduler._due[name] = 0
+        scheduler.start()
+        deadline = time.monotonic() + 5
+        while len(refreshes.names) < config.refresh_concurrency and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        running = scheduler.stats()['running']
+        await scheduler.stop()
+        return running
+
+    running = asyncio.run(scenario())
+    # Every listing was due: REFRESH_CONCURRENCY refreshes were cancelled
+    # midway, the other one while it waited for a slot
+    assert running == 3
+    assert refreshes.names == refreshes.cancelled and len(refreshes.names) == config.refresh_concurrency
+    assert scheduler._task is None and scheduler.stats()['running'] == 0
+
+
+def test_refresh_walks_every_page_and_changes_the_catalog_only_when_it_changed():
+    catalog = StandinCatalog(product_count=120, per_page=3)
+    (cat_id, sub_id), products = max(catalog.listings.items(), key=lambda item: len(item[1]))
+    name = next(sub['name'] for category in signa_catalog.categories() if category['id'] == cat_id
+                for sub in category['subcategories'] if sub['id'] == sub_id)
+    knowledge_base = InMemoryKnowledgeBase()
+    port = free_port()
+
+    async def run(step):
+        runner, base_url = await serve(make_app(catalog), port)
+        crawler = ComprehensiveCrawlerAdapter()
+        try:
+            service = CrawlerService(crawler, knowledge_base)
+            if step == 'crawl':
+                return await service.crawl_and_index(base_url)
+            return await service.update_category(name, base_url)
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    asyncio.run(run('crawl'))
+    version = knowledge_base.catalog_version
+    quiet = asyncio.run(run('refresh'))
+    assert quiet['products_added'] == quiet['products_updated'] == quiet['products_removed'] == 0
+    assert quiet['pages_unchanged'] == -(-len(products) // catalog.per_page)
+    assert knowledge_base.catalog_version == version
+
+    # A product renamed on the last page and one dropped from the listing
+    last, dropped = products[-1], products.pop(0)
+    last['name'] = 'Caneta Renomeada'
+    del catalog.products[dropped['id']]
+    changed = asyncio.run(run('refresh'))
+    assert changed['products_updated'] == 1 and changed['products_removed'] == 1
+    assert knowledge_base.product_map[last['id']]['name'] == 'Caneta Renomeada'
+    assert dropped['id'] not in knowledge_base.product_map
+    assert knowledge_base.catalog_version == version + 1
@@ -0,0 +1,22 @@
+from urllib.parse import parse_qs, urlparse
+
+from infrastructure.utils.signa_catalog import BASE_URL, CATEGORIES_STRUCTURE, build_filter_url, categories
+
+
+def test_categories_carry_their_listing_url():
+    listed = categories()
+    assert len(listed) == len(CATEGORIES_STRUCTURE)
+    vestuario = next(category for category in listed if category['name'] == 'Vestuário')
+    assert vestuario['url'] == f"/brindes/categoria.asp?idCategoria={vestuario['id']}"
+    assert vestuario['subcategories']
+
+
+def test_filter_url_maps_color_and_prices():
+    url = build_filter_url(31, 179, color='azuis', price_max=5.0)
+    assert url.startswith(f"{BASE_URL}/brindes/categoria.asp?")
+    query = parse_qs(urlparse(url).query)
+    assert query['idCategoria'] == ['31']
+    assert query['idSubCategoria'] == ['179']
+    assert query['idCorPrincipal'] == ['117']
+    assert query['precoAte'] == ['5.0']
+    assert 'precoDe' not in query
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.synthetic_catalog import make_products, subcategories
+from infrastructure.utils.intent_parser import IntentParser
+from infrastructure.utils.product_mappings import PRODUCT_MAPPINGS
+from infrastructure.utils.spell_corrector import SpellCorrector
+
+
+@pytest.fixture(scope='module')
+def corrector():
+    # The same sources the chatbot adapter builds its dictionary from
+    texts = [product['name'] for product in make_products(2000, seed=7)]
+    for _, cat_name, _, sub_name in subcategories():
+        texts += [cat_name, sub_name]
+    texts += list(PRODUCT_MAPPINGS)
+    texts += IntentParser().vocabulary()
+    return SpellCorrector.from_texts(texts)
+
+
+@pytest.mark.parametrize('typo, fixed', [
+    ("tem bonnes azuis?", "tem bonés azuis?"),
+    ("mochilla vermelha", "mochila vermelha"),
+    ("bolca preta", "bolsa preta"),
+    ("qeuro canetas", "quero canetas"),
+])
+def test_fixes_typos(corrector, typo, fixed):
+    assert corrector.correct(typo) == fixed
+
+
+def test_joins_a_compound_split_in_two_unknown_words(corrector):
+    assert corrector.correct("quero um porwer bamk") == "quero um powerbank"
+
+
+@pytest.mark.parametrize('text', [
+    "Onde fica a vossa loja?",
+    "obrigado pela ajuda",
+    "chapeus de palha",
+    "gravação laser",
+    "quero falar com alguém",
+    "Qual é o horário",
+    "Qual é o horário de funcionamento?",
+])
+def test_leaves_correct_portuguese_alone(corrector, text):
+    assert corrector.correct(text) == text
+
+
+def test_does_not_join_a_known_word_with_its_neighbour(corrector):
+    assert corrector.correct("canecs de cerâmica") == "caneca de cerâmica"
+
+
+def test_unknown_word_without_close_match_is_kept(corrector):
+    assert corrector.correct("xyzzyq") == "xyzzyq"
+
+
+class _FakeLLM:
+    async def chat(self, messages, **kwargs):
+        content = json.dumps({'type': 'general'}) if kwargs.get('response_format') else "Olá"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def close(self):
+        pass
+
+
+def test_failed_build_passes_messages_through_and_is_retried(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    from infrastructure.adapters.intelligent_chatbot_adapter import IntelligentChatbotAdapter
+    from infrastructure.adapters.knowledge_base_adapter import InMemoryKnowledgeBase
+
+    async def scenario():
+        adapter = IntelligentChatbotAdapter(InMemoryKnowledgeBase())
+        adapter.llm = _FakeLLM()
+        build = adapter._build_corrector
+        failures = []
+
+        def flaky_build(data):
+            if not failures:
+                failures.append(1)
+                raise RuntimeError("transient")
+            return build(data)
+
+        adapter._build_corrector = flaky_build
+        try:
+            first = await adapter.process_message("tem bonnes azuis?")
+            second = await adapter.process_message("tem bonnes azuis?")
+        finally:
+            await adapter.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    # Uncorrected, the typo leaves the message to the LLM; once rebuilt it parses locally
+    assert first.intent['type'] == 'general'
+    assert second.intent['corrected_message'] == "tem bonés azuis?"
+    assert second.intent['product'] == 'bonés'